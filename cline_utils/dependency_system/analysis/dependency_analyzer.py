@@ -7,6 +7,7 @@ Parses files to identify imports, function calls, and other dependency indicator
 
 import os
 import ast
+import bisect
 import re
 import logging
 from typing import Dict, List, Tuple, Set, Optional, Any
@@ -19,6 +20,7 @@ import uuid
 from cline_utils.dependency_system.utils.path_utils import normalize_path, is_subpath, get_file_type as util_get_file_type, get_project_root
 from cline_utils.dependency_system.utils.config_manager import ConfigManager
 from cline_utils.dependency_system.utils.cache_manager import cached, invalidate_dependent_entries
+from cline_utils.dependency_system.utils.file_content_cache import get_file_content
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +34,16 @@ HTML_SCRIPT_SRC_PATTERN = re.compile(r'<script\s+(?:[^>]*?\s+)?src=(["\'])(?P<ur
 HTML_LINK_HREF_PATTERN = re.compile(r'<link\s+(?:[^>]*?\s+)?href=(["\'])(?P<url>[^"\']+?)\1', re.IGNORECASE) # General link, check rel later
 HTML_IMG_SRC_PATTERN = re.compile(r'<img\s+(?:[^>]*?\s+)?src=(["\'])(?P<url>[^"\']+?)\1', re.IGNORECASE)
 CSS_IMPORT_PATTERN = re.compile(r'@import\s+(?:url\s*\(\s*)?["\']?([^"\')\s]+[^"\')]*?)["\']?(?:\s*\))?;', re.IGNORECASE)
+JS_FUNCTION_PATTERN = re.compile(r'(?:async\s+)?function\s*\*?\s*([a-zA-Z_$][\w$]*)\s*\([^)]*\)')
+JS_ARROW_FUNCTION_PATTERN = re.compile(r'(?:const|let|var)\s+([a-zA-Z_$][\w$]*)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>')
+JS_CLASS_PATTERN = re.compile(r'class\s+([a-zA-Z_$][\w$]*)')
+MARKDOWN_CODE_BLOCK_PATTERN = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
+HTML_LINK_TAG_PATTERN = re.compile(r'<link([^>]+)>', re.IGNORECASE)
+HTML_HREF_ATTR_PATTERN = re.compile(r'href=(["\'])(?P<url>[^"\']+?)\1', re.IGNORECASE)
+HTML_REL_STYLESHEET_PATTERN = re.compile(r'rel=(["\'])stylesheet\1', re.IGNORECASE)
+# Kept as one literal-prefixed pattern per resource kind: CPython's re only uses its fast literal search for
+# single-prefix patterns, so a combined alternation scans each file more slowly than these separate passes.
+HTML_RESOURCE_PATTERNS = (("links", HTML_A_HREF_PATTERN), ("scripts", HTML_SCRIPT_SRC_PATTERN), ("images", HTML_IMG_SRC_PATTERN))
 
 # --- Main Analysis Function ---
 @cached("file_analysis",
@@ -61,18 +73,19 @@ def analyze_file(file_path: str, force: bool = False) -> Dict[str, Any]:
     try:
         file_type = util_get_file_type(norm_file_path)
         analysis_result: Dict[str, Any] = {"file_path": norm_file_path, "file_type": file_type, "imports": [], "links": []}
-        try:
-            with open(norm_file_path, 'r', encoding='utf-8') as f: content = f.read()
-        except FileNotFoundError: return {"error": "File disappeared during analysis"}
-        except UnicodeDecodeError as e: return {"error": "Encoding error", "details": str(e)}
-        except Exception as e: logger.error(f"Error reading file {norm_file_path}: {e}", exc_info=True); return {"error": "File read error", "details": str(e)}
+        file_content = get_file_content(norm_file_path) # Shared with the embedder within one analysis run
+        if isinstance(file_content.error, FileNotFoundError): return {"error": "File disappeared during analysis"}
+        if isinstance(file_content.error, UnicodeDecodeError): return {"error": "Encoding error", "details": str(file_content.error)}
+        if file_content.error is not None: logger.error(f"Error reading file {norm_file_path}: {file_content.error}"); return {"error": "File read error", "details": str(file_content.error)}
+        content = file_content.text
 
+        line_index = LineIndex(content) # Built lazily, shared by the regex analyzers
         if file_type == "py": _analyze_python_file(norm_file_path, content, analysis_result)
-        elif file_type == "js": _analyze_javascript_file(norm_file_path, content, analysis_result)
-        elif file_type == "md": _analyze_markdown_file(norm_file_path, content, analysis_result)
-        elif file_type == "html": _analyze_html_file(norm_file_path, content, analysis_result)
-        elif file_type == "css": _analyze_css_file(norm_file_path, content, analysis_result)
-        analysis_result["size"] = os.path.getsize(norm_file_path)
+        elif file_type == "js": _analyze_javascript_file(norm_file_path, content, analysis_result, line_index)
+        elif file_type == "md": _analyze_markdown_file(norm_file_path, content, analysis_result, line_index)
+        elif file_type == "html": _analyze_html_file(norm_file_path, content, analysis_result, line_index)
+        elif file_type == "css": _analyze_css_file(norm_file_path, content, analysis_result, line_index)
+        analysis_result["size"] = file_content.size
         return analysis_result
     except Exception as e:
         logger.exception(f"Unexpected error analyzing {norm_file_path}: {e}")
@@ -80,133 +93,226 @@ def analyze_file(file_path: str, force: bool = False) -> Dict[str, Any]:
 
 # --- Analysis Helper Functions ---
 
+class LineIndex:
+    """
+    Newline-offset table for one file's content. Maps a character offset to its 1-based
+    line number with a bisect lookup, replacing content[:pos].count('\\n') + 1 per match.
+    The table is built on first use, so files without matches never pay for it.
+    """
+    __slots__ = ("_content", "_newlines")
+
+    def __init__(self, content: str):
+        self._content = content
+        self._newlines: Optional[List[int]] = None
+
+    def _build(self) -> List[int]:
+        content = self._content; newlines = []; append = newlines.append
+        pos = content.find('\n')
+        while pos != -1: append(pos); pos = content.find('\n', pos + 1)
+        self._newlines = newlines; self._content = None # Offsets are all we need from here on
+        return newlines
+
+    def line_of(self, offset: int) -> int:
+        """Returns the 1-based line number containing the character at 'offset'."""
+        newlines = self._newlines if self._newlines is not None else self._build()
+        return bisect.bisect_left(newlines, offset) + 1
+
+def _get_full_name_str(node: ast.AST) -> Optional[str]:
+    """Returns a dotted/indexed name for Name/Attribute/Subscript/Call/Constant chains, or None."""
+    if isinstance(node, ast.Name): return node.id
+    if isinstance(node, ast.Attribute):
+        # Recursively get the base part
+        base = _get_full_name_str(node.value)
+        return f"{base}.{node.attr}" if base else node.attr
+    if isinstance(node, ast.Subscript):
+        base = _get_full_name_str(node.value)
+        index_repr = "..."
+        if isinstance(node.slice, ast.Constant):
+            index_repr = repr(node.slice.value)
+        elif isinstance(node.slice, ast.Name):
+            index_repr = node.slice.id
+        elif isinstance(node.slice, ast.Slice):
+             lower = _get_full_name_str(node.slice.lower) if node.slice.lower else ""
+             upper = _get_full_name_str(node.slice.upper) if node.slice.upper else ""
+             step = _get_full_name_str(node.slice.step) if node.slice.step else ""
+             index_repr = f"{lower}:{upper}:{step}".rstrip(":")
+        return f"{base}[{index_repr}]" if base else f"[{index_repr}]"
+    # <<< *** ADDED handling for Call node if needed in name chain *** >>>
+    if isinstance(node, ast.Call):
+         base = _get_full_name_str(node.func)
+         return f"{base}()" if base else "()"
+    if isinstance(node, ast.Constant):
+         return repr(node.value)
+    return None # Unhandled complex types
+
+def _get_source_object_str(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Attribute): return _get_full_name_str(node.value)
+    if isinstance(node, ast.Call): return _get_full_name_str(node.func)
+    if isinstance(node, ast.Subscript): return _get_full_name_str(node.value)
+    return None
+
+class _PythonAnalysisVisitor(ast.NodeVisitor):
+    """
+    Single traversal of a Python AST collecting everything the analyzer, the suggester
+    (import map) and embedding preprocessing (definition spans) need.
+    """
+    def __init__(self, result: Dict[str, Any]):
+        self.result = result
+        self.depth = 0 # AST depth; definitions are later ordered by it (breadth-first, like ast.walk)
+
+    def visit(self, node: ast.AST) -> Any:
+        self.depth += 1
+        try: return super().visit(node)
+        finally: self.depth -= 1
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.result["imports"].append(alias.name)
+            self.result["import_details"].append({"module": alias.name, "name": None, "alias": alias.asname, "level": 0, "line": node.lineno})
+            self.result["import_map"][alias.asname or alias.name] = {"module": alias.name, "level": 0, "is_from": False}
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module_name = node.module or ""; relative_prefix = "." * node.level
+        self.result["imports"].append(f"{relative_prefix}{module_name}")
+        for alias in node.names:
+            self.result["import_details"].append({"module": module_name, "name": alias.name, "alias": alias.asname, "level": node.level, "line": node.lineno})
+            # Imported names map to the module they come from
+            self.result["import_map"][alias.asname or alias.name] = {"module": module_name, "level": node.level, "is_from": True}
+        self.generic_visit(node)
+
+    def _add_definition(self, node: ast.AST, def_type: str) -> None:
+        self.result["definitions"].append({"name": node.name, "type": def_type, "line": node.lineno, "col": node.col_offset,
+                                           "end_line": getattr(node, "end_lineno", None), "end_col": getattr(node, "end_col_offset", None), "depth": self.depth})
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self.result["functions"].append({ "name": node.name, "line": node.lineno })
+        self._add_definition(node, "function"); self.generic_visit(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self.result["functions"].append({ "name": node.name, "line": node.lineno, "async": True })
+        self._add_definition(node, "async_function"); self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.result["classes"].append({ "name": node.name, "line": node.lineno })
+        self._add_definition(node, "class")
+        # Inheritance
+        for base in node.bases:
+            base_full_name = _get_full_name_str(base)
+            if base_full_name: self.result["inheritance"].append({"class_name": node.name, "base_class_name": base_full_name, "potential_source": base_full_name, "line": getattr(base, 'lineno', node.lineno)})
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        target_full_name = _get_full_name_str(node.func); potential_source = _get_source_object_str(node.func)
+        if target_full_name: self.result["calls"].append({"target_name": target_full_name, "potential_source": potential_source, "line": node.lineno})
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        if isinstance(node.ctx, ast.Load):
+            potential_source = _get_full_name_str(node.value)
+            if potential_source: self.result["attribute_accesses"].append({"target_name": node.attr, "potential_source": potential_source, "line": node.lineno})
+        self.generic_visit(node)
+
 def _analyze_python_file(file_path: str, content: str, result: Dict[str, Any]) -> None:
-    """Analyzes Python file content using AST."""
+    """
+    Analyzes Python file content with one ast.parse and one visitor pass.
+    Besides imports/functions/classes/calls/attributes/inheritance, stores:
+      - import_details: per imported name, with module, alias and relative level
+      - import_map: bound name -> {"module", "level", "is_from"} (used by the suggester)
+      - definitions: function/class source spans (used by embedding preprocessing)
+    """
     result["imports"] = [] # Reset imports, AST is primary source now
+    result["import_details"] = []
+    result["import_map"] = {}
     result["functions"] = []
     result["classes"] = []
+    result["definitions"] = []
     result["calls"] = []
     result["attribute_accesses"] = []
     result["inheritance"] = []
-    # result["references"] = [] # Keep optional general references if needed
-
-    def _get_full_name_str(node: ast.AST) -> Optional[str]:
-        if isinstance(node, ast.Name): return node.id
-        if isinstance(node, ast.Attribute):
-            # Recursively get the base part
-            base = _get_full_name_str(node.value)
-            return f"{base}.{node.attr}" if base else node.attr
-        if isinstance(node, ast.Subscript):
-            base = _get_full_name_str(node.value)
-            index_repr = "..."
-            if isinstance(node.slice, ast.Constant):
-                index_repr = repr(node.slice.value)
-            elif isinstance(node.slice, ast.Name):
-                index_repr = node.slice.id
-            elif isinstance(node.slice, ast.Slice):
-                 lower = _get_full_name_str(node.slice.lower) if node.slice.lower else ""
-                 upper = _get_full_name_str(node.slice.upper) if node.slice.upper else ""
-                 step = _get_full_name_str(node.slice.step) if node.slice.step else ""
-                 index_repr = f"{lower}:{upper}:{step}".rstrip(":")
-            return f"{base}[{index_repr}]" if base else f"[{index_repr}]"
-        # <<< *** ADDED handling for Call node if needed in name chain *** >>>
-        if isinstance(node, ast.Call):
-             base = _get_full_name_str(node.func)
-             return f"{base}()" if base else "()"
-        if isinstance(node, ast.Constant):
-             return repr(node.value)
-
-        # logger.debug(f"Unhandled node type in _get_full_name_str: {type(node)}")
-        return None # Unhandled complex types
-
-    def _get_source_object_str(node: ast.AST) -> Optional[str]:
-        if isinstance(node, ast.Attribute): return _get_full_name_str(node.value)
-        if isinstance(node, ast.Call): return _get_full_name_str(node.func)
-        if isinstance(node, ast.Subscript): return _get_full_name_str(node.value)
-        return None
+    result["content_length"] = len(content) # Lets consumers check spans still match the content they hold
     try:
         tree = ast.parse(content, filename=file_path)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names: result["imports"].append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                 module_name = node.module or ""; relative_prefix = "." * node.level
-                 full_import_source = f"{relative_prefix}{module_name}"; result["imports"].append(full_import_source)
-            elif isinstance(node, ast.FunctionDef): result["functions"].append({ "name": node.name, "line": node.lineno })
-            elif isinstance(node, ast.AsyncFunctionDef): result["functions"].append({ "name": node.name, "line": node.lineno, "async": True })
-            elif isinstance(node, ast.ClassDef):
-                result["classes"].append({ "name": node.name, "line": node.lineno })
-                # Inheritance
-                for base in node.bases:
-                    base_full_name = _get_full_name_str(base)
-                    if base_full_name: result["inheritance"].append({"class_name": node.name, "base_class_name": base_full_name, "potential_source": base_full_name, "line": getattr(base, 'lineno', node.lineno)})
-            elif isinstance(node, ast.Call):
-                target_full_name = _get_full_name_str(node.func); potential_source = _get_source_object_str(node.func)
-                if target_full_name: result["calls"].append({"target_name": target_full_name, "potential_source": potential_source, "line": node.lineno})
-            elif isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Load):
-                 attribute_name = node.attr; potential_source = _get_full_name_str(node.value)
-                 if potential_source: result["attribute_accesses"].append({"target_name": attribute_name, "potential_source": potential_source, "line": node.lineno})
+        _PythonAnalysisVisitor(result).visit(tree)
     except SyntaxError as e: logger.warning(f"AST Syntax Error in {file_path}: {e}. Analysis may be incomplete."); result["error"] = f"AST Syntax Error: {e}"
     except Exception as e: logger.exception(f"Unexpected AST analysis error in {file_path}: {e}"); result["error"] = f"Unexpected AST analysis error: {e}"
 
-def _analyze_javascript_file(file_path: str, content: str, result: Dict[str, Any]) -> None:
+_SOURCE_LINE_PATTERN = re.compile(r'[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$')
+
+def get_definition_segments(content: str, definitions: List[Dict[str, Any]]) -> List[str]:
+    """
+    Returns the source text of each definition span (same result as ast.get_source_segment),
+    ordered breadth-first like ast.walk. Spans without end positions are skipped.
+    """
+    lines = _SOURCE_LINE_PATTERN.findall(content); segments = []
+    for span in sorted(definitions, key=lambda d: d.get("depth", 0)):
+        start, end, col, end_col = span.get("line"), span.get("end_line"), span.get("col"), span.get("end_col")
+        if None in (start, end, col, end_col) or end > len(lines): continue
+        start -= 1; end -= 1
+        if start == end: segment = lines[start].encode()[col:end_col].decode()
+        else: segment = lines[start].encode()[col:].decode() + "".join(lines[start + 1:end]) + lines[end].encode()[:end_col].decode()
+        if segment: segments.append(segment)
+    return segments
+
+def _analyze_javascript_file(file_path: str, content: str, result: Dict[str, Any], line_index: Optional[LineIndex] = None) -> None:
     """Analyzes JavaScript file content using regex."""
+    line_index = line_index or LineIndex(content)
     import_matches = JAVASCRIPT_IMPORT_PATTERN.finditer(content); result["imports"] = [m.group(1) or m.group(2) or m.group(3) for m in import_matches if m]
     result["functions"] = []; result["classes"] = []
-    try: # Function/Class regex
-        func_pattern = re.compile(r'(?:async\s+)?function\s*\*?\s*([a-zA-Z_$][\w$]*)\s*\([^)]*\)'); arrow_pattern = re.compile(r'(?:const|let|var)\s+([a-zA-Z_$][\w$]*)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>')
-        for match in func_pattern.finditer(content): result["functions"].append({"name": match.group(1), "line": content[:match.start()].count('\n') + 1})
-        for match in arrow_pattern.finditer(content): result["functions"].append({"name": match.group(1), "line": content[:match.start()].count('\n') + 1, "type": "arrow"})
-        class_pattern = re.compile(r'class\s+([a-zA-Z_$][\w$]*)')
-        for match in class_pattern.finditer(content): result["classes"].append({"name": match.group(1), "line": content[:match.start()].count('\n') + 1})
+    try: # Function/Class regex (compiled at module import)
+        for match in JS_FUNCTION_PATTERN.finditer(content): result["functions"].append({"name": match.group(1), "line": line_index.line_of(match.start())})
+        for match in JS_ARROW_FUNCTION_PATTERN.finditer(content): result["functions"].append({"name": match.group(1), "line": line_index.line_of(match.start()), "type": "arrow"})
+        for match in JS_CLASS_PATTERN.finditer(content): result["classes"].append({"name": match.group(1), "line": line_index.line_of(match.start())})
     except Exception as e: logger.warning(f"Regex error during JS analysis in {file_path}: {e}")
 
-def _analyze_markdown_file(file_path: str, content: str, result: Dict[str, Any]) -> None:
+def _analyze_markdown_file(file_path: str, content: str, result: Dict[str, Any], line_index: Optional[LineIndex] = None) -> None:
     """Analyzes Markdown file content using regex."""
+    line_index = line_index or LineIndex(content)
     result["links"] = []; result["code_blocks"] = []
     try: # Links
         for match in MARKDOWN_LINK_PATTERN.finditer(content):
             url = match.group(1);
-            if not url.startswith(('#', 'http:', 'https:', 'mailto:', 'tel:')): result["links"].append({"url": url, "line": content[:match.start()].count('\n') + 1})
+            if not url.startswith(('#', 'http:', 'https:', 'mailto:', 'tel:')): result["links"].append({"url": url, "line": line_index.line_of(match.start())})
     except Exception as e: logger.warning(f"Regex error during MD link analysis in {file_path}: {e}")
     try: # Code blocks
-        code_block_pattern = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
-        for match in code_block_pattern.finditer(content):
+        for match in MARKDOWN_CODE_BLOCK_PATTERN.finditer(content):
              lang = match.group(1) or "text"; block_content = match.group(2)
-             result["code_blocks"].append({"language": lang.lower(), "line": content[:match.start()].count('\n') + 1})
+             result["code_blocks"].append({"language": lang.lower(), "line": line_index.line_of(match.start())})
     except Exception as e: logger.warning(f"Regex error during MD code block analysis in {file_path}: {e}")
 
-def _analyze_html_file(file_path: str, content: str, result: Dict[str, Any]) -> None:
+def _analyze_html_file(file_path: str, content: str, result: Dict[str, Any], line_index: Optional[LineIndex] = None) -> None:
     """Analyzes HTML file content using regex."""
+    line_index = line_index or LineIndex(content)
     result["links"] = [] # For <a> tags
     result["scripts"] = [] # For <script src="...">
     result["stylesheets"] = [] # For <link rel="stylesheet" href="...">
     result["images"] = [] # For <img src="...">
 
-    def find_resources(pattern, type_list):
+    excluded_prefixes = ('#', 'http:', 'https:', 'mailto:', 'tel:', 'data:')
+    for resource_kind, pattern in HTML_RESOURCE_PATTERNS:
         try:
+            type_list = result[resource_kind]
             for match in pattern.finditer(content):
                 url = match.group("url")
-                if url and not url.startswith(('#', 'http:', 'https:', 'mailto:', 'tel:', 'data:')): type_list.append({"url": url, "line": content[:match.start()].count('\n') + 1})
-        except Exception as e: logger.warning(f"Regex error during HTML {type(type_list).__name__} analysis in {file_path}: {e}")
-    find_resources(HTML_A_HREF_PATTERN, result["links"]); find_resources(HTML_SCRIPT_SRC_PATTERN, result["scripts"]); find_resources(HTML_IMG_SRC_PATTERN, result["images"])
+                if url and not url.startswith(excluded_prefixes): type_list.append({"url": url, "line": line_index.line_of(match.start())})
+        except Exception as e: logger.warning(f"Regex error during HTML {resource_kind} analysis in {file_path}: {e}")
     try: # Stylesheets
-        link_tag_pattern = re.compile(r'<link([^>]+)>', re.IGNORECASE); href_pattern = re.compile(r'href=(["\'])(?P<url>[^"\']+?)\1', re.IGNORECASE); rel_pattern = re.compile(r'rel=(["\'])stylesheet\1', re.IGNORECASE)
-        for link_match in link_tag_pattern.finditer(content):
-            tag_content = link_match.group(1); href_match = href_pattern.search(tag_content); rel_match = rel_pattern.search(tag_content)
+        for link_match in HTML_LINK_TAG_PATTERN.finditer(content):
+            tag_content = link_match.group(1); href_match = HTML_HREF_ATTR_PATTERN.search(tag_content); rel_match = HTML_REL_STYLESHEET_PATTERN.search(tag_content)
             if href_match and rel_match:
                 url = href_match.group("url")
-                if url and not url.startswith(('#', 'http:', 'https:', 'mailto:', 'tel:', 'data:')): result["stylesheets"].append({"url": url, "line": content[:link_match.start()].count('\n') + 1})
+                if url and not url.startswith(excluded_prefixes): result["stylesheets"].append({"url": url, "line": line_index.line_of(link_match.start())})
     except Exception as e: logger.warning(f"Regex error during HTML stylesheet analysis in {file_path}: {e}")
 
-def _analyze_css_file(file_path: str, content: str, result: Dict[str, Any]) -> None:
+def _analyze_css_file(file_path: str, content: str, result: Dict[str, Any], line_index: Optional[LineIndex] = None) -> None:
     """Analyzes CSS file content using regex."""
+    line_index = line_index or LineIndex(content)
     result["imports"] = [] # For @import rules
 
     try:
         for match in CSS_IMPORT_PATTERN.finditer(content):
              url = match.group(1)
-             if url and not url.startswith(('#', 'http:', 'https:', 'data:')): result["imports"].append({"url": url.strip(), "line": content[:match.start()].count('\n') + 1})
+             if url and not url.startswith(('#', 'http:', 'https:', 'data:')): result["imports"].append({"url": url.strip(), "line": line_index.line_of(match.start())})
     except Exception as e: logger.warning(f"Regex error during CSS import analysis in {file_path}: {e}")
 
 # --- End of dependency_analyzer.py ---
\ No newline at end of file
@@ -11,7 +11,6 @@ import json
 import re
 import os
 from typing import Dict, List, Tuple, Optional, Any
-import importlib.util
 import ast
 
 # Import only from lower-level modules
@@ -23,6 +22,8 @@ from cline_utils.dependency_system.core.key_manager import (
 from cline_utils.dependency_system.utils.path_utils import get_file_type, normalize_path, resolve_relative_path, is_subpath, get_project_root
 from cline_utils.dependency_system.utils.config_manager import ConfigManager
 from cline_utils.dependency_system.utils.cache_manager import cached, clear_all_caches
+from cline_utils.dependency_system.analysis.module_resolver import get_python_module_index, get_javascript_module_index
+from cline_utils.dependency_system.analysis.similarity_index import get_semantic_neighbour_index
 # NOTE: Avoid importing analyze_file here to prevent circular dependency if analyzer calls suggester
 
 # Logger setup (assuming it's configured elsewhere)
@@ -87,7 +88,7 @@ def suggest_dependencies(file_path: str,
     # Pass path_to_key_info down
     if file_ext == '.py':
         return suggest_python_dependencies(norm_path, path_to_key_info, project_root, file_analysis_results, threshold)
-    elif file_ext in ('.js', '.ts'):
+    elif file_ext in ('.js', '.ts', '.jsx', '.tsx'): # Same extensions get_file_type analyzes as 'js'
         return suggest_javascript_dependencies(norm_path, path_to_key_info, project_root, file_analysis_results, threshold)
     elif file_ext in ('.md', '.rst'):
         config = ConfigManager()
@@ -119,42 +120,18 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
     source_dir = os.path.dirname(source_path)
     # <<< *** REMOVED path_to_key *** >>>
 
-    # --- Import map building (unchanged logic, resolves to paths) ---
-    import_map_cache = {}
-    def _build_import_map(current_source_path: str) -> Dict[str, str]:
-        """ Parses a Python file and builds a map of imported names to their resolved module paths. """
-        norm_source_path = normalize_path(current_source_path)
-        if norm_source_path in import_map_cache: return import_map_cache[norm_source_path]
+    # --- Import map: bound names come from analyze_file's single AST pass, resolved via the module index ---
+    module_index = get_python_module_index(path_to_key_info, project_root)
+    def _build_import_map() -> Dict[str, str]:
+        """ Resolves the analysis 'import_map' (name -> module/level) to absolute module paths. """
         local_import_map: Dict[str, str] = {} # name -> absolute_module_path
-        try:
-            with open(norm_source_path, 'r', encoding='utf-8') as f: content = f.read()
-            tree = ast.parse(content, filename=norm_source_path)
-            current_source_dir = os.path.dirname(norm_source_path)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        module_name = alias.name; imported_name = alias.asname or module_name
-                        possible_paths = _convert_python_import_to_paths(module_name, current_source_dir, project_root)
-                        if possible_paths: local_import_map[imported_name] = normalize_path(possible_paths[0])
-                elif isinstance(node, ast.ImportFrom):
-                    module_name = node.module or ""; level = node.level
-                    base_dir_for_relative = current_source_dir
-                    if level > 0:
-                        for _ in range(level - 1): base_dir_for_relative = os.path.dirname(base_dir_for_relative)
-                    full_module_name_for_path = module_name if level == 0 else (module_name or "")
-                    resolve_from_dir = base_dir_for_relative if level > 0 else current_source_dir
-                    possible_base_paths = _convert_python_import_to_paths(full_module_name_for_path, resolve_from_dir, project_root, is_from_import=True, relative_level=level)
-                    if possible_base_paths:
-                        resolved_base_path = normalize_path(possible_base_paths[0])
-                        for alias in node.names:
-                            original_name = alias.name; imported_name = alias.asname or original_name
-                            local_import_map[imported_name] = resolved_base_path
-        except Exception as e: logger.error(f"Error building import map for {norm_source_path}: {e}", exc_info=True)
-        import_map_cache[norm_source_path] = local_import_map
+        for imported_name, import_info in source_analysis.get("import_map", {}).items():
+            resolved_path = module_index.resolve(import_info.get("module", ""), source_dir, import_info.get("level", 0))
+            if resolved_path: local_import_map[imported_name] = resolved_path
         return local_import_map
 
     # Build the import map for the current source file
-    import_map = _build_import_map(source_path)
+    import_map = _build_import_map()
 
     # --- Updated helper to resolve potential source name to key string ---
     resolved_cache = {}
@@ -339,47 +316,25 @@ def suggest_semantic_dependencies(file_path: str,
     source_key_string = source_key_info.key_string
 
     suggested_dependencies = []
-    # Iterate through all KeyInfo objects to find potential targets (files only)
-    target_key_infos = [info for info in path_to_key_info.values() if not info.is_directory and info.key_string != source_key_string]
-
-    # Get necessary context for calculate_similarity (unchanged)
-    code_roots = config.get_code_root_directories()
-    doc_roots = config.get_doc_directories()
-    try: from .embedding_manager import calculate_similarity # Local import
-    except ImportError: logger.error("Could not import calculate_similarity. Semantic suggestions disabled."); return []
-
-    for target_key_info in target_key_infos:
+    # Neighbours at or above doc_similarity come from the configured backend (exact blocked top-k or ANN)
+    try: neighbour_index = get_semantic_neighbour_index(path_to_key_info, project_root)
+    except Exception as e: logger.error(f"Could not build semantic neighbour index: {e}. Semantic suggestions disabled."); return []
+
+    # --- Read thresholds from config ---
+    # Neighbours already passed the semantic policy threshold of their space pair (code/doc);
+    # code_similarity separates strong ('S') from weak ('s') suggestions
+    threshold_S_strong = config.get_threshold("code_similarity")
+
+    for target_path, confidence in neighbour_index.neighbours(file_path):
+        target_key_info = path_to_key_info.get(target_path)
+        if not target_key_info or target_key_info.key_string == source_key_string: continue
         target_key_string = target_key_info.key_string
-        # calculate_similarity likely needs key strings and potentially paths or config
-        # Assuming calculate_similarity is adapted or accepts strings and handles lookup if needed
-        try:
-            # Pass necessary info to calculate_similarity.
-            # If it needs paths, look them up: source_path = file_path, target_path = target_key_info.norm_path
-            # If it needs key_map-like structure, we might need to build a temporary one for it.
-            # For now, assume it primarily needs key strings and embeddings_dir.
-            # *** We might need to adapt calculate_similarity later ***
-            confidence = calculate_similarity(
-                source_key_string,
-                target_key_string,
-                embeddings_dir,
-                path_to_key_info, # Pass the full map in case it needs context
-                project_root,
-                code_roots,
-                doc_roots
-            )
-        except Exception as e:
-             logger.warning(f"Error calculating similarity between {source_key_string} and {target_key_string}: {e}")
-             confidence = 0.0
-
-        # --- Read thresholds from config ---
-        threshold_S_strong = config.get_threshold("code_similarity")
-        threshold_s_weak = config.get_threshold("doc_similarity")
         logger.debug(f"Raw confidence {source_key_string} -> {target_key_string}: {confidence:.4f}")
 
         # Determine character based on config thresholds
         assigned_char = None
         if confidence >= threshold_S_strong: assigned_char = 'S'; logger.debug(f"Suggesting {source_key_string} -> {target_key_string} ('S')...")
-        elif confidence >= threshold_s_weak: assigned_char = 's'; logger.debug(f"Suggesting {source_key_string} -> {target_key_string} ('s')...")
+        else: assigned_char = 's'; logger.debug(f"Suggesting {source_key_string} -> {target_key_string} ('s')...")
 
         if assigned_char:
             suggested_dependencies.append((target_key_string, assigned_char))
@@ -426,96 +381,36 @@ def _identify_python_dependencies(source_path: str, source_analysis: Dict[str, A
                                  project_root: str,
                                  path_to_key_info: Dict[str, KeyInfo] # Changed
                                  ) -> List[Tuple[str, str]]:
-    """ Identifies Python import dependencies. Returns (abs_path, '>'). """
+    """ Identifies Python import dependencies (absolute and relative). Returns (abs_path, '>'). """
     dependencies = []
-    imports = source_analysis.get("imports", [])
     source_dir = os.path.dirname(source_path)
-    # <<< *** Use path_to_key_info keys for lookup *** >>>
-    norm_file_analysis_keys = {normalize_path(k) for k in file_analysis_results.keys()} # Paths from analysis results
-    tracked_paths_set = set(path_to_key_info.keys()) # Paths tracked by key manager
-
-    for import_name_or_path in imports:
-         possible_paths_abs = _convert_python_import_to_paths(import_name_or_path, source_dir, project_root)
-         found = False
-         for path_abs in possible_paths_abs:
-             norm_path_abs = normalize_path(path_abs)
-             # Check if the resolved path is tracked by the key manager
-             if norm_path_abs in tracked_paths_set:
-                 dependencies.append((norm_path_abs, ">"))
-                 found = True
-                 break
-         # if not found: logger.debug(f"Could not resolve Python import '{import_name_or_path}' in {source_path} to a tracked file.")
+    module_index = get_python_module_index(path_to_key_info, project_root)
+    # import_details carries relative levels; plain 'imports' strings are the fallback for older analysis results
+    import_details = source_analysis.get("import_details")
+    if import_details is None: import_specs = [(name, 0) for name in source_analysis.get("imports", [])]
+    else: import_specs = {(detail.get("module", ""), detail.get("level", 0)) for detail in import_details}
+
+    for module_name, level in import_specs:
+         resolved_path = module_index.resolve(module_name, source_dir, level) # Index holds tracked files only
+         if resolved_path: dependencies.append((resolved_path, ">"))
+         # else: logger.debug(f"Could not resolve Python import '{module_name}' in {source_path} to a tracked file.")
     return list(set(dependencies))
 
 
-def _convert_python_import_to_paths(import_name: str, source_dir: str, project_root: str, is_from_import: bool = False, relative_level: int = 0) -> List[str]:
-    """
-    Converts a Python import statement/module name to potential absolute file paths.
-    Handles relative imports based on level.
-    """
-    potential_paths_abs = []
-    normalized_project_root = normalize_path(project_root)
-    normalized_source_dir = normalize_path(source_dir)
-
-    # --- Handle Relative Imports ---
-    if relative_level > 0:
-        relative_module_part = import_name; level = relative_level; current_dir = normalized_source_dir
-        for _ in range(level - 1):
-            parent_dir = os.path.dirname(current_dir)
-            if not parent_dir or parent_dir == current_dir or not parent_dir.startswith(normalized_project_root): current_dir = None; break
-            current_dir = parent_dir
-        if current_dir:
-            if relative_module_part:
-                module_path_part = relative_module_part.replace('.', os.sep); base_path = normalize_path(os.path.join(current_dir, module_path_part))
-                potential_paths_abs.append(f"{base_path}.py"); potential_paths_abs.append(normalize_path(os.path.join(base_path, "__init__.py")))
-            else: potential_paths_abs.append(normalize_path(os.path.join(current_dir, "__init__.py")))
-    elif relative_level == 0 and import_name and not import_name.startswith('.'):
-        module_path_part = import_name.replace('.', os.sep)
-        # Check relative to project root(s) - consider multiple source roots if necessary?
-        # For now, assume single project_root acts as the main source root.
-        # TODO: Potentially check against all configured code_roots?
-        base_path_in_proj = normalize_path(os.path.join(normalized_project_root, module_path_part))
-        potential_paths_abs.append(f"{base_path_in_proj}.py"); potential_paths_abs.append(normalize_path(os.path.join(base_path_in_proj, "__init__.py")))
-        try:
-             spec = importlib.util.find_spec(import_name)
-             if spec and spec.origin and spec.origin not in ('namespace', 'built-in', None):
-                  origin_path = normalize_path(spec.origin)
-                  if origin_path.endswith("__init__.py") or origin_path.endswith(".py"): potential_paths_abs.append(origin_path)
-                  elif os.path.isdir(origin_path): potential_paths_abs.append(normalize_path(os.path.join(origin_path, "__init__.py")))
-        except (ImportError, ValueError, ModuleNotFoundError, AttributeError): pass
-    final_paths = [p_abs for p_abs in potential_paths_abs if p_abs.startswith(normalized_project_root)]
-    return final_paths
-
-
 def _identify_javascript_dependencies(source_path: str, source_analysis: Dict[str, Any],
                                     file_analyses: Dict[str, Dict[str, Any]], # Expects absolute paths as keys
                                     project_root: str,
                                     path_to_key_info: Dict[str, KeyInfo] # Changed
                                     ) -> List[Tuple[str, str]]:
-    """ Identifies JS/TS import dependencies. Returns (abs_path, '>'). """
+    """ Identifies JS/TS import dependencies (relative, tsconfig aliases, baseUrl). Returns (abs_path, '>'). """
     dependencies = []; imports = source_analysis.get("imports", []); source_dir = os.path.dirname(source_path)
-    js_extensions = ['.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs']
-    # <<< *** Use path_to_key_info keys for lookup *** >>>
-    tracked_paths_set = set(path_to_key_info.keys())
+    module_index = get_javascript_module_index(path_to_key_info, project_root)
 
     for import_path_str in imports:
-        if not import_path_str or not (import_path_str.startswith('.') or import_path_str.startswith('/')) or \
-           import_path_str.startswith('http:') or import_path_str.startswith('https:'): continue
         try:
-            resolved_base = normalize_path(os.path.join(source_dir, import_path_str))
-            possible_targets = []
-            has_extension = any(import_path_str.lower().endswith(ext) for ext in js_extensions)
-            if has_extension: possible_targets.append(resolved_base)
-            else:
-                 for ext in js_extensions: possible_targets.append(f"{resolved_base}{ext}")
-                 for ext in js_extensions: possible_targets.append(normalize_path(os.path.join(resolved_base, f"index{ext}")))
-            found = False
-            for target_path_abs in possible_targets:
-                norm_target_path = normalize_path(target_path_abs)
-                # Check if tracked
-                if norm_target_path in tracked_paths_set:
-                    dependencies.append((norm_target_path, ">")); found = True; break # Found the dependency
-            # if not found: logger.debug(f"Could not resolve JS/TS import '{import_path_str}' in {source_path} to a tracked file. Tried: {possible_targets}")
+            resolved_path = module_index.resolve(import_path_str, source_dir) # Index holds tracked files only
+            if resolved_path: dependencies.append((resolved_path, ">"))
+            # else: logger.debug(f"Could not resolve JS/TS import '{import_path_str}' in {source_path} to a tracked file.")
         except Exception as e: logger.error(f"Error resolving JS import '{import_path_str}' in {source_path}: {e}")
     return list(set(dependencies))
 
@@ -3,12 +3,17 @@
 """
 Module for managing embeddings generation and similarity calculations using contextual keys.
 Handles embedding creation from project files and cosine similarity between embeddings.
+torch and sentence_transformers are imported only when the model is loaded, so importing this
+module (and every CLI command that does) stays cheap.
 """
 import sys
-import torch
 import os
 import json
-from typing import List, Dict, Optional, Tuple, Any
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 import numpy as np
 import ast
 
@@ -17,6 +22,13 @@ import ast
 from cline_utils.dependency_system.utils.path_utils import is_subpath, normalize_path, is_valid_project_path, get_project_root
 from cline_utils.dependency_system.utils.config_manager import ConfigManager
 from cline_utils.dependency_system.utils.cache_manager import cached, invalidate_dependent_entries
+from cline_utils.dependency_system.utils.file_content_cache import get_file_content
+from cline_utils.dependency_system.analysis.dependency_analyzer import get_definition_segments
+from cline_utils.dependency_system.analysis.similarity_index import invalidate_semantic_neighbour_index
+from cline_utils.dependency_system.analysis.embedding_store import CHUNKS_SUFFIX, get_embedding_dtype, load_embedding, load_embedding_models, save_embedding
+from cline_utils.dependency_system.analysis.model_registry import (
+    DEFAULT_MODEL_ID, MODEL_TYPES, configured_model_ids, embedding_model_id, get_doc_dirs, model_type_for_path, prepare_model, resolve_model
+)
 from cline_utils.dependency_system.core.key_manager import (
     KeyInfo, # Added
     validate_key,
@@ -29,12 +41,14 @@ import logging
 logger = logging.getLogger(__name__)
 
 # Default model configuration
-DEFAULT_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
-MODEL_INSTANCE = None
+DEFAULT_MODEL_NAME = DEFAULT_MODEL_ID
+MODEL_INSTANCES: Dict[Tuple[str, str, str], Any] = {} # (source, backend, device) -> loaded model, once per process
+_model_lock = threading.Lock()
 SELECTED_DEVICE = None
 
 def _get_best_device() -> str:
     """Automatically determines the best available torch device."""
+    import torch # Deferred: only needed once embeddings are generated
     # 1. Check CUDA
     if torch.cuda.is_available(): logger.info("CUDA is available. Using CUDA."); return "cuda"
     # 2. Check MPS (Apple Silicon GPU) - Requires PyTorch 1.12+ and macOS 12.3+
@@ -47,6 +61,7 @@ def _select_device() -> str:
     """Selects device based on config override or automatic detection."""
     global SELECTED_DEVICE
     if SELECTED_DEVICE is None:
+        import torch # Deferred: only needed once embeddings are generated
         config_manager = ConfigManager(); config_device = config_manager.config.get("compute", {}).get("embedding_device", "auto").lower()
         if config_device in ["cuda", "mps", "cpu"]:
             # Validate configured device choice
@@ -57,21 +72,93 @@ def _select_device() -> str:
         else: logger.warning(f"Invalid device '{config_device}'. Auto-detecting."); SELECTED_DEVICE = _get_best_device()
     return SELECTED_DEVICE
 
-def _load_model():
-    """Loads the sentence transformer model if not already loaded, using the selected device."""
-    global MODEL_INSTANCE
-    if MODEL_INSTANCE is None:
-        device = _select_device()
+EMBEDDING_BACKENDS = ("torch", "torch-quantized", "onnx")
+
+def _get_backend_settings(config_manager: Optional[ConfigManager] = None) -> Dict[str, Any]:
+    """
+    Inference backend settings from the compute config:
+      embedding_backend:    "torch" (default), "torch-quantized" (dynamic int8 Linear layers, CPU) or "onnx" (onnxruntime, CPU)
+      embedding_threads:    intra-op CPU threads (0 = library default)
+    Which model is loaded comes from the model registry (models section).
+    """
+    config_manager = config_manager or ConfigManager()
+    backend = str(config_manager.get_compute_setting("embedding_backend", "torch")).lower()
+    if backend not in EMBEDDING_BACKENDS: logger.warning(f"Unknown embedding_backend '{backend}', using torch."); backend = "torch"
+    return {"backend": backend, "threads": max(0, int(config_manager.get_compute_setting("embedding_threads", 0) or 0))}
+
+def _create_model(backend: str, model_source: str, device: str, threads: int = 0, local_only: bool = False):
+    """
+    Builds a SentenceTransformer for one inference backend.
+
+    Args:
+        backend: One of EMBEDDING_BACKENDS; "torch-quantized" and "onnx" always run on the CPU.
+        model_source: Hub model name or local model directory.
+        device: Torch device for the "torch" backend.
+        threads: Intra-op CPU threads (0 = library default).
+        local_only: Never contact the model hub (local folder or offline mode).
+    """
+    import torch # Deferred: only needed once embeddings are generated
+    from sentence_transformers import SentenceTransformer
+    if threads: torch.set_num_threads(threads)
+    load_kwargs: Dict[str, Any] = {"local_files_only": True} if local_only else {}
+    if backend != "torch" and device != "cpu": logger.info(f"Backend '{backend}' runs on the CPU; ignoring device '{device}'."); device = "cpu"
+    if backend == "onnx":
+        import onnxruntime # Optional dependency: `pip install onnxruntime optimum` (export happens on first load)
+        session_options = onnxruntime.SessionOptions()
+        if threads: session_options.intra_op_num_threads = threads
+        return SentenceTransformer(model_source, device=device, backend="onnx",
+                                   model_kwargs={"provider": "CPUExecutionProvider", "session_options": session_options}, **load_kwargs)
+    model = SentenceTransformer(model_source, device=device, **load_kwargs)
+    if backend == "torch-quantized":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+def _load_model(model_type: str = "code_model_name"):
+    """
+    Loads the configured model for 'code_model_name' or 'doc_model_name' through the model registry.
+    Each (source, backend, device) is loaded once per process, so identical code and doc models share one instance.
+    """
+    spec = resolve_model(model_type); settings = _get_backend_settings(); device = None
+    with _model_lock:
         try:
-            from sentence_transformers import SentenceTransformer
-            MODEL_INSTANCE = SentenceTransformer(DEFAULT_MODEL_NAME, device=device)
-            logger.info(f"Loaded sentence transformer model: {DEFAULT_MODEL_NAME} on device: {device}")
-        except ImportError as e: logger.error(f"Failed to import SentenceTransformer: {e}. Please install it (`pip install sentence-transformers`)"); raise
-        except Exception as e: logger.error(f"Failed to load model {DEFAULT_MODEL_NAME} on device {device}: {e}"); raise
-    return MODEL_INSTANCE
-
-# --- Preprocessing (unchanged) ---
-def _preprocess_content_for_embedding(file_path: str, content: str) -> str:
+            device = _select_device()
+            instance_key = (spec.source, settings["backend"], device if settings["backend"] == "torch" else "cpu")
+            if instance_key not in MODEL_INSTANCES:
+                local_only = prepare_model(spec)
+                MODEL_INSTANCES[instance_key] = _create_model(settings["backend"], spec.source, device, settings["threads"], local_only)
+                logger.info(f"Loaded sentence transformer model: {spec.model_id} from {spec.source} ({settings['backend']} backend) on device: {instance_key[2]}")
+            return MODEL_INSTANCES[instance_key]
+        except ImportError as e: logger.error(f"Failed to import the '{settings['backend']}' embedding backend: {e}. Please install it (`pip install torch sentence-transformers`, plus `onnxruntime optimum` for onnx)"); raise
+        except Exception as e: logger.error(f"Failed to load model {spec.model_id} ({spec.source}) on device {device}: {e}"); raise
+
+def compare_embedding_backends(texts: List[str], backend: str, reference_backend: str = "torch") -> Dict[str, Any]:
+    """
+    Encodes the same texts with two backends (same model, CPU) and compares the vectors.
+
+    Args:
+        texts: Sample texts (e.g. preprocessed project files).
+        backend: Backend under test.
+        reference_backend: Backend whose vectors are treated as ground truth.
+    Returns:
+        {"samples", "min_cosine", "mean_cosine", "max_abs_diff", "reference_seconds", "backend_seconds"}
+    """
+    import time
+    settings = _get_backend_settings(); spec = resolve_model("code_model_name"); local_only = prepare_model(spec)
+    vectors: Dict[str, np.ndarray] = {}; seconds: Dict[str, float] = {}
+    for name in (reference_backend, backend):
+        model = _create_model(name, spec.source, "cpu", settings["threads"], local_only)
+        model.encode(texts[:1], show_progress_bar=False) # Warm-up (lazy init, ONNX session)
+        start = time.perf_counter()
+        vectors[name] = np.asarray(model.encode(texts, batch_size=16, show_progress_bar=False, convert_to_numpy=True), dtype=np.float32)
+        seconds[name] = time.perf_counter() - start
+    reference, candidate = vectors[reference_backend], vectors[backend]
+    cosines = np.sum(reference * candidate, axis=1) / np.maximum(np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1), 1e-12)
+    return {"samples": len(texts), "min_cosine": float(cosines.min()), "mean_cosine": float(cosines.mean()),
+            "max_abs_diff": float(np.abs(reference - candidate).max()),
+            "reference_seconds": seconds[reference_backend], "backend_seconds": seconds[backend]}
+
+# --- Preprocessing ---
+def _preprocess_content_for_embedding(file_path: str, content: str, analysis: Optional[Dict[str, Any]] = None) -> str:
     """
     Preprocesses file content before embedding generation.
     Currently removes Python import lines.
@@ -80,6 +167,8 @@ def _preprocess_content_for_embedding(file_path: str, content: str) -> str:
     Args:
         file_path: The path to the file (used to determine file type).
         content: The original file content.
+        analysis: Optional analyze_file result for this file; its definition spans are reused
+                  instead of re-parsing the content.
 
     Returns:
         The preprocessed content string.
@@ -90,10 +179,12 @@ def _preprocess_content_for_embedding(file_path: str, content: str) -> str:
         filtered_lines = [line for line in lines if not (line.strip().startswith("import ") or line.strip().startswith("from "))]
         weighted_definitions = []
         try:
-            tree = ast.parse(content)
-            for node in ast.walk(tree):
-                segment = None
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)): segment = ast.get_source_segment(content, node)
+            if analysis and "definitions" in analysis and analysis.get("content_length") == len(content):
+                segments = get_definition_segments(content, analysis["definitions"])
+            else:
+                tree = ast.parse(content)
+                segments = [ast.get_source_segment(content, node) for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+            for segment in segments:
                 if segment: weighted_definitions.extend([segment, segment]) # Weighting
         except Exception as e: logger.warning(f"AST weighting failed for {file_path}: {e}. Proceeding without.")
         final_content_list = filtered_lines + weighted_definitions
@@ -101,32 +192,195 @@ def _preprocess_content_for_embedding(file_path: str, content: str) -> str:
     # TODO: Add preprocessing for other file types if needed (e.g., remove boilerplate HTML/JS?)
     return content # Return original content for non-Python files
 
+def _read_text_file(abs_file_path: str) -> Optional[str]:
+    """Reads a UTF-8 text file for embedding (via the run's file content cache); None for binary, non-UTF8 or unreadable files."""
+    file_content = get_file_content(abs_file_path)
+    if file_content.is_binary: logger.debug(f"Skipping binary file: {abs_file_path}")
+    elif isinstance(file_content.error, UnicodeDecodeError): logger.debug(f"Skipping non-UTF8 file: {abs_file_path}")
+    elif file_content.error is not None: logger.warning(f"Failed to read {abs_file_path}: {file_content.error}")
+    else: return file_content.text
+    return None
+
+# --- Chunked Encoding ---
+def _get_chunking_settings(config_manager: ConfigManager, model) -> Dict[str, Any]:
+    """Chunking settings from the compute config; 'window' defaults to the model's max sequence length."""
+    max_seq_length = int(getattr(model, "max_seq_length", 0) or 384)
+    window = int(config_manager.get_compute_setting("embedding_chunk_tokens", 0)) or max_seq_length
+    window = max(16, min(window, max_seq_length) - 2) # Leave room for the special tokens the model adds
+    overlap = max(0, min(int(config_manager.get_compute_setting("embedding_chunk_overlap", 32)), window // 2))
+    pooling = str(config_manager.get_compute_setting("embedding_pooling", "mean")).lower()
+    if pooling not in ("mean", "max"): logger.warning(f"Unknown embedding_pooling '{pooling}', using mean."); pooling = "mean"
+    return {"enabled": bool(config_manager.get_compute_setting("embedding_chunking", True)), "window": window, "overlap": overlap,
+            "max_chunks": max(1, int(config_manager.get_compute_setting("embedding_max_chunks", 16))), "pooling": pooling,
+            "keep_chunks": bool(config_manager.get_compute_setting("embedding_keep_chunks", False)),
+            "batch_size": max(1, int(config_manager.get_compute_setting("embedding_batch_size", 64)))}
+
+def _split_into_chunks(tokenizer, text: str, window: int, overlap: int, max_chunks: int) -> List[Tuple[str, int]]:
+    """
+    Splits text into token windows of 'window' tokens overlapping by 'overlap'.
+    Windows are cut at token character offsets, so chunk text is a slice of the original.
+    When there are more than 'max_chunks' windows, evenly spaced ones are kept so the whole file is covered.
+
+    Returns:
+        List of (chunk text, token count).
+    """
+    try:
+        encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, return_attention_mask=False, truncation=False, verbose=False)
+        offsets = encoded["offset_mapping"]
+    except Exception: # Slow tokenizers have no offsets; approximate tokens with ~4 characters each
+        offsets = [(i, min(i + 4, len(text))) for i in range(0, len(text), 4)]
+    if len(offsets) <= window: return [(text, len(offsets))]
+    stride = window - overlap
+    starts = list(range(0, len(offsets) - overlap, stride))
+    if len(starts) > max_chunks: starts = [starts[round(i * (len(starts) - 1) / (max_chunks - 1))] for i in range(max_chunks)] if max_chunks > 1 else starts[:1]
+    chunks = []
+    for start in starts:
+        end = min(start + window, len(offsets))
+        chunks.append((text[offsets[start][0]:offsets[end - 1][1]], end - start))
+    return chunks
+
+def _encode_pooled(model, texts: List[str], settings: Dict[str, Any]) -> List[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """
+    Encodes texts as pooled per-text vectors. All chunks of all texts go through one batched
+    model.encode call; chunk vectors are combined with a token-weighted mean or an element-wise max.
+
+    Returns:
+        Per text: (pooled vector, chunk matrix or None when the text fits in one window).
+    """
+    if not settings["enabled"]:
+        vectors = model.encode(texts, batch_size=settings["batch_size"], show_progress_bar=False, convert_to_numpy=True)
+        return [(vector, None) for vector in vectors]
+    per_text = [_split_into_chunks(model.tokenizer, text, settings["window"], settings["overlap"], settings["max_chunks"]) for text in texts]
+    flat_chunks = [chunk for chunks in per_text for chunk, _ in chunks]
+    chunk_vectors = model.encode(flat_chunks, batch_size=settings["batch_size"], show_progress_bar=False, convert_to_numpy=True)
+    results: List[Tuple[np.ndarray, Optional[np.ndarray]]] = []; position = 0
+    for chunks in per_text:
+        vectors = chunk_vectors[position:position + len(chunks)]; position += len(chunks)
+        if len(chunks) == 1: results.append((vectors[0], None)); continue
+        if settings["pooling"] == "max": pooled = vectors.max(axis=0)
+        else: pooled = np.average(vectors, axis=0, weights=[max(1, count) for _, count in chunks])
+        results.append((pooled.astype(np.float32), vectors))
+    return results
+
+# --- Pipelined Encoding ---
+EncodeJob = Tuple[str, str, str] # (key_string, abs file path, model type)
+_last_pipeline_stats: Dict[str, float] = {}
+
+def get_last_embedding_stats() -> Dict[str, float]:
+    """Stage timings of the last generate_embeddings call (summed over its scopes)."""
+    return dict(_last_pipeline_stats)
+
+def _run_encode_pipeline(jobs: List[EncodeJob], models: Dict[str, Any], chunkings: Dict[str, Dict[str, Any]],
+                         on_encoded: Callable[[str, str, str, np.ndarray, Optional[np.ndarray]], bool],
+                         file_analyses: Optional[Dict[str, Dict[str, Any]]] = None,
+                         workers: int = 0, queue_size: int = 256) -> Dict[str, float]:
+    """
+    Producer/consumer embedding pipeline. A reader pool reads and preprocesses files (binary check,
+    decode, AST weighting) into a bounded queue of ready texts; the calling thread consumes the queue
+    in per-model batches and encodes them. model.encode releases the GIL, so file I/O and preprocessing
+    of the next files overlap with inference of the current batch; the queue bound caps memory.
+
+    Args:
+        jobs: Files to encode.
+        models: Model type -> loaded model.
+        chunkings: Model type -> chunking settings (_get_chunking_settings).
+        on_encoded: Called as (key_string, path, model type, vector, chunk vectors or None) for each
+                    encoded file; returns False if saving failed.
+        file_analyses: Optional analyze_file results reused by preprocessing.
+        workers: Reader threads (0 = min(8, CPU count)).
+        queue_size: Max preprocessed texts waiting for the encoder.
+    Returns:
+        Stage timings in seconds ("read", "preprocess": summed over readers; "encode", "save",
+        "encoder_wait", "wall") plus "files", "skipped" and "failed" counts.
+    """
+    stats = {"files": 0, "skipped": 0, "failed": 0, "read": 0.0, "preprocess": 0.0, "encode": 0.0, "save": 0.0, "encoder_wait": 0.0, "wall": 0.0}
+    if not jobs: return stats
+    wall_start = time.perf_counter(); stats_lock = threading.Lock()
+    ready: "queue.Queue[Tuple[str, str, str, Optional[str]]]" = queue.Queue(maxsize=max(1, queue_size))
+    workers = workers or min(8, os.cpu_count() or 1)
+
+    def produce(job: EncodeJob) -> None:
+        key_string, abs_file_path, model_type = job; content = None
+        try:
+            start = time.perf_counter(); original_content = _read_text_file(abs_file_path) or ""; read_done = time.perf_counter()
+            content = _preprocess_content_for_embedding(abs_file_path, original_content, (file_analyses or {}).get(abs_file_path))
+            with stats_lock: stats["read"] += read_done - start; stats["preprocess"] += time.perf_counter() - read_done
+        except Exception as e: logger.warning(f"Failed to prepare {abs_file_path} for embedding: {e}")
+        ready.put((key_string, abs_file_path, model_type, content)) # Exactly one item per job, so the encoder knows when it is done
+
+    def encode(model_type: str, batch: List[Tuple[str, str, str]]) -> None:
+        start = time.perf_counter()
+        try:
+            logger.debug(f"Encoding {len(batch)} files with {model_type} (batch starting with {batch[0][0]})...")
+            encoded: List[Optional[Tuple[np.ndarray, Optional[np.ndarray]]]] = list(_encode_pooled(models[model_type], [content for _, _, content in batch], chunkings[model_type]))
+        except Exception as e:
+            # One bad file (e.g. a tokenizer error) must not fail the whole batch: retry each file on its own
+            logger.warning(f"Failed generate embeddings for batch starting with {batch[0][0]}: {e}. Retrying files individually.")
+            encoded = []
+            for key_string, abs_file_path, content in batch:
+                try: encoded.append(_encode_pooled(models[model_type], [content], chunkings[model_type])[0])
+                except Exception as file_e: logger.error(f"Failed generate embedding for {key_string} ({abs_file_path}): {file_e}"); encoded.append(None)
+        stats["encode"] += time.perf_counter() - start
+        start = time.perf_counter()
+        for (key_string, abs_file_path, _), result in zip(batch, encoded):
+            if result is not None and on_encoded(key_string, abs_file_path, model_type, result[0], result[1]): stats["files"] += 1
+            else: stats["failed"] += 1
+        stats["save"] += time.perf_counter() - start
+
+    files_per_encode = {t: max(1, 4 * c["batch_size"] // c["max_chunks"]) if c["enabled"] else c["batch_size"] * 4 for t, c in chunkings.items()}
+    buffers: Dict[str, List[Tuple[str, str, str]]] = {t: [] for t in chunkings}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for job in jobs: executor.submit(produce, job)
+        for _ in range(len(jobs)):
+            start = time.perf_counter(); key_string, abs_file_path, model_type, content = ready.get(); stats["encoder_wait"] += time.perf_counter() - start
+            if not content or not content.strip(): logger.debug(f"Skipping empty file content for key {key_string} ({abs_file_path})"); stats["skipped"] += 1; continue
+            buffers[model_type].append((key_string, abs_file_path, content))
+            if len(buffers[model_type]) >= files_per_encode[model_type]: encode(model_type, buffers[model_type]); buffers[model_type] = []
+        for model_type, batch in buffers.items():
+            if batch: encode(model_type, batch)
+    stats["wall"] = time.perf_counter() - wall_start
+    return stats
+
 # --- Embedding Generation ---
 # <<< *** MODIFIED SIGNATURE AND LOGIC *** >>>
 # Caching removed due to complexity and risk of stale data; relies on internal checks.
 def generate_embeddings(project_paths: List[str],
                         path_to_key_info: Dict[str, KeyInfo], # Changed from global_key_map
-                        force: bool = False) -> bool:
+                        force: bool = False,
+                        file_analyses: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
     """
     Generate embeddings for all files in the specified project paths using contextual keys.
+    Files under the doc directories are encoded with models.doc_model_name, all others with
+    models.code_model_name; each embedding is tagged with its model id in the scope metadata.
 
     Args:
         project_paths: List of project directory paths (relative to project root)
         path_to_key_info: The global map from normalized paths to KeyInfo objects.
         force: If True, regenerate embeddings even if they exist
+        file_analyses: Optional map of absolute file path -> analyze_file result, reused for preprocessing
     Returns:
         success: bool indicating overall success.
     """
     if not project_paths: logger.error("No project paths provided."); return False
     if not path_to_key_info: logger.warning("path_to_key_info map is empty. Cannot generate embeddings."); return False
 
-    try: model = _load_model()
-    except Exception: return False
-
     config_manager = ConfigManager(); project_root = get_project_root()
+    try:
+        specs = {model_type: resolve_model(model_type, config_manager) for model_type in MODEL_TYPES}
+        models = {model_type: _load_model(model_type) for model_type in MODEL_TYPES}
+    except Exception: return False
+    doc_dirs = get_doc_dirs(config_manager, project_root)
     embeddings_dir = config_manager.get_path("embeddings_dir", "cline_utils/dependency_system/analysis/embeddings")
     if not os.path.isabs(embeddings_dir): embeddings_dir = os.path.join(project_root, embeddings_dir)
     os.makedirs(embeddings_dir, exist_ok=True)
+    embedding_dtype = get_embedding_dtype(config_manager)
+    chunkings = {model_type: _get_chunking_settings(config_manager, models[model_type]) for model_type in MODEL_TYPES}
+    # Changes here invalidate stored vectors of that model
+    chunking_signatures = {specs[t].model_id: {k: chunkings[t][k] for k in ("enabled", "window", "overlap", "max_chunks", "pooling")} for t in MODEL_TYPES}
+
+    reader_workers = max(0, int(config_manager.get_compute_setting("embedding_reader_workers", 0)))
+    queue_size = max(1, int(config_manager.get_compute_setting("embedding_queue_size", 256)))
+    pipeline_stats: Dict[str, float] = {}
 
     overall_success = True
     keys_skipped_mtime = set() # Track keys skipped due to mtime match
@@ -149,7 +403,12 @@ def generate_embeddings(project_paths: List[str],
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f: existing_metadata = json.load(f)
                 if existing_metadata.get("version") != "1.0": logger.warning(f"Incompatible metadata version in {metadata_file}. Regenerating."); existing_metadata = {}
+                elif existing_metadata.get("dtype", "float32") != embedding_dtype: logger.info(f"Embedding dtype changed to {embedding_dtype} for {metadata_file}. Regenerating."); existing_metadata = {}
             except Exception as e: logger.warning(f"Corrupted/missing metadata {metadata_file}: {e}. Regenerating."); existing_metadata = {}
+        existing_chunking = existing_metadata.get("chunking") or {}
+        if "enabled" in existing_chunking: existing_chunking = {existing_metadata.get("model", DEFAULT_MODEL_ID): existing_chunking} # Single-model metadata
+        stale_models = {model_id for model_id, signature in chunking_signatures.items() if existing_chunking.get(model_id) != signature}
+        if existing_metadata and stale_models: logger.info(f"Embedding chunking settings changed for {', '.join(sorted(stale_models))} in {metadata_file}. Regenerating those files.")
 
         # --- Filter path_to_key_info for the current path ---
         # <<< *** MODIFIED FILTERING *** >>>
@@ -162,29 +421,14 @@ def generate_embeddings(project_paths: List[str],
             logger.warning(f"No files found via path_to_key_info within path: {current_project_path}")
             continue
 
-        # --- Read file contents (batch read could optimize) ---
-        # <<< *** MODIFIED ITERATION *** >>>
-        file_contents: Dict[str, str] = {} # Map key_string -> content
-        for norm_path, key_info in key_info_for_current_path.items():
-            abs_file_path = key_info.norm_path # Already normalized absolute path
-            key_string = key_info.key_string
-            if not os.path.isfile(abs_file_path):
-                 logger.warning(f"Path is not a file: {abs_file_path} for key {key_string}. Skipping read.")
-                 continue
-            try:
-                is_binary = False; # (Binary check unchanged)
-                with open(abs_file_path, 'rb') as f_check:
-                    if b'\0' in f_check.read(1024): is_binary = True
-                if is_binary: logger.debug(f"Skipping binary file: {abs_file_path}"); continue
-                # Read content
-                with open(abs_file_path, 'r', encoding='utf-8') as f: file_contents[key_string] = f.read()
-            except UnicodeDecodeError: logger.debug(f"Skipping non-UTF8 file: {abs_file_path}")
-            except Exception as e: logger.warning(f"Failed to read {abs_file_path}: {e}")
-
         # --- Generate or load embeddings ---
         # <<< *** MODIFIED ITERATION AND CHECKS *** >>>
         current_embeddings: Dict[str, np.ndarray] = {} # Map key_string -> embedding
         keys_skipped_mtime_this_pass = set() # Track skips for *this* pass/project_path
+        jobs: List[EncodeJob] = [] # Files to (re-)encode, fed through the read/preprocess -> encode pipeline
+        model_of_key: Dict[str, str] = {} # key_string -> model id of its (new or kept) embedding
+        model_of_file: Dict[str, str] = {} # Same by path: key strings repeat across directories
+        embedded_paths: Set[str] = set() # Files whose embedding was saved or kept this pass
 
         for norm_path, key_info in key_info_for_current_path.items():
             key_string = key_info.key_string
@@ -199,8 +443,14 @@ def generate_embeddings(project_paths: List[str],
 
             should_generate = True
             metadata_key_entry = existing_metadata.get("keys", {}).get(key_string)
-
-            if metadata_key_entry and not force:
+            model_type = model_type_for_path(abs_file_path, doc_dirs); model_id = specs[model_type].model_id
+            model_of_key[key_string] = model_id; model_of_file[abs_file_path] = model_id
+
+            if metadata_key_entry and not force and existing_metadata.get("models", {}).get(abs_file_path, metadata_key_entry.get("model", existing_metadata.get("model"))) != model_id:
+                logger.debug(f"Model changed to {model_id} for {key_string}. Regen.")
+            elif metadata_key_entry and not force and model_id in stale_models:
+                logger.debug(f"Chunking settings changed for {key_string}. Regen.")
+            elif metadata_key_entry and not force:
                 # Find the expected .npy path using the mirrored structure
                 try:
                     relative_file_path_for_npy = os.path.relpath(abs_file_path, project_root)
@@ -216,6 +466,7 @@ def generate_embeddings(project_paths: List[str],
                             logger.debug(f"  MTime match. Skipping generation for {key_string}.")
                             should_generate = False
                             keys_skipped_mtime_this_pass.add(key_string) # Track skip
+                            embedded_paths.add(abs_file_path)
                         elif metadata_mtime is None: logger.debug(f"  Meta mtime missing. Regen {key_string}.")
                         else: logger.debug(f"  MTime mismatch. Regen {key_string}.")
                     except FileNotFoundError: logger.warning(f"Source file {abs_file_path} gone. Skip {key_string}."); should_generate = False
@@ -224,31 +475,32 @@ def generate_embeddings(project_paths: List[str],
             elif force: logger.info(f"Force flag set. Regen {key_string}."); should_generate = True
             else: logger.debug(f"Key {key_string} not in meta or meta missing. Gen."); should_generate = True
 
-            # Generate new or updated embedding if needed
-            if should_generate:
-                original_content = file_contents.get(key_string, "")
-                processed_content = _preprocess_content_for_embedding(abs_file_path, original_content)
-                if processed_content.strip():
-                    try:
-                        logger.debug(f"Encoding content for key: {key_string}...")
-                        embedding = model.encode(processed_content, show_progress_bar=False, convert_to_numpy=True)
-                        current_embeddings[key_string] = embedding
-                        logger.debug(f"Encoding successful for key: {key_string}.")
-                        # Save using mirrored structure (logic unchanged, uses abs_file_path)
-                        try:
-                            relative_file_path = os.path.relpath(abs_file_path, project_root)
-                            # Construct mirrored path under embeddings_dir (base embeddings dir)
-                            mirrored_path_base = os.path.join(embeddings_dir, relative_file_path)
-                            mirrored_dir = os.path.dirname(mirrored_path_base)
-                            # Ensure the mirrored directory exists
-                            os.makedirs(mirrored_dir, exist_ok=True)
-                            save_path = normalize_path(mirrored_path_base + ".npy")
-                            logger.debug(f"Saving embedding for {key_string} to {save_path}...")
-                            np.save(save_path, embedding)
-                            logger.info(f"Generated/saved embedding for {key_string} to {save_path}")
-                        except Exception as e: logger.error(f"Failed save embedding {key_string} ({abs_file_path}) to {save_path}: {e}"); overall_success = False
-                    except Exception as e: logger.error(f"Failed generate embedding {key_string} ({abs_file_path}): {e}"); overall_success = False
-                else: logger.debug(f"Skipping empty file content for key {key_string} ({abs_file_path})")
+            # Queue new or updated embeddings; files are read, preprocessed and encoded by the pipeline below
+            if should_generate: jobs.append((key_string, abs_file_path, model_type))
+
+        def save_encoded(key_string: str, abs_file_path: str, model_type: str, embedding: np.ndarray, chunk_vectors: Optional[np.ndarray]) -> bool:
+            current_embeddings[key_string] = embedding
+            # Save using mirrored structure under the base embeddings dir
+            save_path = None
+            try:
+                relative_file_path = os.path.relpath(abs_file_path, project_root)
+                mirrored_path_base = os.path.join(embeddings_dir, relative_file_path)
+                os.makedirs(os.path.dirname(mirrored_path_base), exist_ok=True)
+                save_path = normalize_path(mirrored_path_base + ".npy"); chunks_path = normalize_path(mirrored_path_base + CHUNKS_SUFFIX)
+                save_embedding(save_path, embedding, embedding_dtype)
+                if chunkings[model_type]["keep_chunks"] and chunk_vectors is not None: save_embedding(chunks_path, chunk_vectors, embedding_dtype)
+                elif os.path.exists(chunks_path): os.remove(chunks_path) # Drop stale chunk vectors
+                logger.info(f"Generated/saved embedding for {key_string} to {save_path}" + (f" ({len(chunk_vectors)} chunks)" if chunk_vectors is not None else ""))
+                embedded_paths.add(abs_file_path)
+                return True
+            except Exception as e: logger.error(f"Failed save embedding {key_string} ({abs_file_path}) to {save_path}: {e}"); return False
+
+        stats = _run_encode_pipeline(jobs, models, chunkings, save_encoded, file_analyses, reader_workers, queue_size)
+        if stats["failed"]: overall_success = False
+        for stage, value in stats.items(): pipeline_stats[stage] = pipeline_stats.get(stage, 0) + value
+        if jobs: logger.info(f"Embedding pipeline for {project_name}: {stats['files']} files in {stats['wall']:.2f}s "
+                             f"(read {stats['read']:.2f}s + preprocess {stats['preprocess']:.2f}s over {reader_workers or 'auto'} readers; "
+                             f"encode {stats['encode']:.2f}s, save {stats['save']:.2f}s, encoder idle {stats['encoder_wait']:.2f}s)")
 
         # Update the global skip set
         keys_skipped_mtime.update(keys_skipped_mtime_this_pass)
@@ -264,14 +516,17 @@ def generate_embeddings(project_paths: List[str],
                  try:
                     valid_keys_in_metadata[key_string] = {
                         "path": abs_v_path, # Save normalized absolute path
-                        "mtime": os.path.getmtime(abs_v_path)
+                        "mtime": os.path.getmtime(abs_v_path),
+                        "model": model_of_key[key_string]
                     }
                  except FileNotFoundError: logger.warning(f"File {abs_v_path} gone before meta save for {key_string}.")
                  except Exception as e: logger.error(f"Error getting mtime for {abs_v_path} ({key_string}): {e}.")
 
         if not valid_keys_in_metadata: logger.warning(f"No valid files processed for metadata in {current_project_path}. Skipping save.")
         else:
-            metadata = {"version": "1.0", "model": DEFAULT_MODEL_NAME, "keys": valid_keys_in_metadata}
+            models_by_path = {path: model_of_file[path] for path in sorted(embedded_paths) if os.path.exists(path)}
+            metadata = {"version": "1.0", "model": specs["code_model_name"].model_id, "dtype": embedding_dtype, "chunking": chunking_signatures,
+                        "keys": valid_keys_in_metadata, "models": models_by_path}
             try:
                 # Save metadata specific to this project path (or adjust if one global metadata is preferred)
                 with open(metadata_file, 'w', encoding='utf-8') as f: json.dump(metadata, f, indent=2)
@@ -279,6 +534,8 @@ def generate_embeddings(project_paths: List[str],
             except Exception as e: logger.error(f"Failed write metadata {metadata_file}: {e}"); overall_success = False
 
     # --- End Loop ---
+    _last_pipeline_stats.clear(); _last_pipeline_stats.update(pipeline_stats)
+    invalidate_semantic_neighbour_index() # Neighbour search must see the regenerated vectors
     if overall_success: logger.info(f"Completed embedding generation for paths: {project_paths}")
     else: logger.warning(f"Embedding generation completed with errors for paths: {project_paths}")
     return overall_success
@@ -393,9 +650,13 @@ def calculate_similarity(key1_str: str, # Renamed for clarity
         logger.debug(f"Embedding files missing/path error during similarity: {', '.join(relative_missing)}")
         return 0.0
 
+    embedding_models = load_embedding_models(embeddings_dir); model_ids = configured_model_ids(); doc_dirs = get_doc_dirs(project_root=project_root)
+    if embedding_model_id(key1_info.norm_path, embedding_models, model_ids, doc_dirs) != embedding_model_id(key2_info.norm_path, embedding_models, model_ids, doc_dirs):
+        logger.debug(f"Embeddings of {key1_str} and {key2_str} come from different models. Sim=0."); return 0.0
+
     # (Loading and calculation logic unchanged)
     try:
-        emb1 = np.load(file1_path); emb2 = np.load(file2_path)
+        emb1 = load_embedding(file1_path); emb2 = load_embedding(file2_path) # float32, whatever the storage dtype
         if emb1.ndim > 1: emb1 = emb1.flatten()
         if emb2.ndim > 1: emb2 = emb2.flatten()
         norm1 = np.linalg.norm(emb1); norm2 = np.linalg.norm(emb2)
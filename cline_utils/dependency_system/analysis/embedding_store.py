@@ -0,0 +1,138 @@
+# analysis/embedding_store.py
+
+"""
+On-disk format of the mirrored embedding .npy files.
+Embeddings are stored unit-normalized in one of three dtypes (compute.embedding_dtype):
+  - "float32": full precision (4 bytes/dim)
+  - "float16": half precision (2 bytes/dim)
+  - "int8":    per-vector scaled so the largest component maps to +/-127 (1 byte/dim);
+               cosine similarity only needs the direction, so the scale is not stored
+The dtype of each file is self-describing, so mixed stores (e.g. after a setting change) still load.
+Files split into several token windows may also keep their per-chunk vectors in '<file>.chunks.npy'
+(compute.embedding_keep_chunks) for finer-grained matching.
+Each scope's metadata.json records the model id of every embedding by source path ("models"), so
+callers can keep vectors of different models apart (load_embedding_models). Contextual key strings
+repeat across directories, so the per-key "keys" entries are only read for older metadata.
+"""
+
+import glob
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from cline_utils.dependency_system.utils.config_manager import ConfigManager
+
+import logging
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+DEFAULT_EMBEDDING_DTYPE = "float32"
+INT8_MAX = 127
+CHUNKS_SUFFIX = ".chunks.npy"
+
+def get_embedding_dtype(config: Optional[ConfigManager] = None) -> str:
+    """Returns the configured storage dtype, falling back to float32 for unknown values."""
+    dtype = str((config or ConfigManager()).get_compute_setting("embedding_dtype", DEFAULT_EMBEDDING_DTYPE)).lower()
+    if dtype not in EMBEDDING_DTYPES: logger.warning(f"Unknown embedding_dtype '{dtype}', using {DEFAULT_EMBEDDING_DTYPE}."); return DEFAULT_EMBEDDING_DTYPE
+    return dtype
+
+def quantize_embeddings(vectors: np.ndarray, dtype: str) -> np.ndarray:
+    """
+    Converts embeddings (one per row, or a single 1-D vector) to the storage dtype.
+
+    Args:
+        vectors: Embeddings in any stored dtype (already-quantized input is re-quantized).
+        dtype: One of EMBEDDING_DTYPES.
+    Returns:
+        Unit-normalized float32/float16 rows, or int8 rows scaled to the full [-127, 127] range.
+    """
+    if dtype not in EMBEDDING_DTYPES: raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    rows = np.atleast_2d(vectors).astype(np.float32)
+    if dtype == "int8":
+        peaks = np.abs(rows).max(axis=1, keepdims=True); peaks[peaks == 0] = 1.0
+        quantized = np.rint(rows * (INT8_MAX / peaks)).astype(np.int8)
+    else:
+        norms = np.linalg.norm(rows, axis=1, keepdims=True); norms[norms == 0] = 1.0 # Zero vectors stay zero
+        quantized = (rows / norms).astype(dtype)
+    return quantized if np.ndim(vectors) > 1 else quantized[0]
+
+def row_scales(vectors: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Per-row factors that turn dot products of stored rows into cosine similarities:
+    1/||q|| for int8 rows, None for float rows (already unit length).
+    """
+    if vectors.dtype != np.int8: return None
+    norms = np.linalg.norm(vectors.astype(np.float32), axis=1); norms[norms == 0] = 1.0
+    return (1.0 / norms).astype(np.float32)
+
+def dequantize_embeddings(vectors: np.ndarray) -> np.ndarray:
+    """Unit-normalized float32 copy of stored rows (for code that needs real vectors, e.g. k-means)."""
+    scales = row_scales(np.atleast_2d(vectors))
+    rows = np.atleast_2d(vectors).astype(np.float32)
+    if scales is not None: rows *= scales[:, None]
+    return rows if np.ndim(vectors) > 1 else rows[0]
+
+def save_embedding(path: str, embedding: np.ndarray, dtype: str) -> None:
+    """Writes one embedding (1-D) or a (chunks, D) matrix to 'path' in the given storage dtype."""
+    embedding = np.asarray(embedding)
+    np.save(path, quantize_embeddings(embedding if embedding.ndim == 2 else embedding.reshape(-1), dtype))
+
+def load_embedding(path: str, dtype: Optional[str] = None) -> np.ndarray:
+    """
+    Reads one embedding as a 1-D vector.
+
+    Args:
+        path: The .npy file.
+        dtype: Convert to this storage dtype; None returns unit-normalized float32.
+    """
+    stored = np.load(path).reshape(-1)
+    return quantize_embeddings(stored, dtype) if dtype else dequantize_embeddings(stored)
+
+def load_chunk_embeddings(embedding_path: str) -> Optional[np.ndarray]:
+    """
+    Reads the per-chunk vectors stored next to a file's embedding.
+
+    Args:
+        embedding_path: The file's mirrored '<file>.npy' path.
+    Returns:
+        Unit-normalized float32 (chunks, D) matrix, or None if the file was not chunked or chunks were not kept.
+    """
+    chunks_path = embedding_path[:-len(".npy")] + CHUNKS_SUFFIX if embedding_path.endswith(".npy") else embedding_path + CHUNKS_SUFFIX
+    try: return dequantize_embeddings(np.atleast_2d(np.load(chunks_path)))
+    except FileNotFoundError: return None
+    except Exception as e: logger.warning(f"Could not load chunk embeddings {chunks_path}: {e}"); return None
+
+_models_cache: Dict[str, Tuple[Tuple[Tuple[str, float], ...], Dict[str, str]]] = {}
+
+def load_embedding_models(embeddings_dir: str) -> Dict[str, str]:
+    """
+    Model id of each embedded file, read from the scopes' metadata.json files.
+
+    Args:
+        embeddings_dir: Absolute base embeddings directory.
+    Returns:
+        Map of normalized absolute source path -> model id (cached until a metadata file changes).
+        Files missing from it use the configured model of their type (model_registry.embedding_model_id).
+    """
+    metadata_files = sorted(glob.glob(os.path.join(embeddings_dir, "*", "metadata.json")))
+    stamps = []
+    for metadata_file in metadata_files:
+        try: stamps.append((metadata_file, os.path.getmtime(metadata_file)))
+        except OSError: continue
+    cached = _models_cache.get(embeddings_dir)
+    if cached is not None and cached[0] == tuple(stamps): return cached[1]
+    models: Dict[str, str] = {}
+    for metadata_file, _ in stamps:
+        try:
+            with open(metadata_file, 'r', encoding='utf-8') as f: metadata = json.load(f)
+        except Exception as e: logger.warning(f"Could not read embeddings metadata {metadata_file}: {e}"); continue
+        scope_model = metadata.get("model", "")
+        models.update(metadata.get("models", {}))
+        for entry in metadata.get("keys", {}).values(): # Metadata written before the path-keyed "models" map
+            if entry.get("path") and (entry.get("model") or scope_model): models.setdefault(entry["path"], entry.get("model") or scope_model)
+    _models_cache[embeddings_dir] = (tuple(stamps), models)
+    return models
+
+# --- End of embedding_store.py ---
@@ -0,0 +1,141 @@
+# analysis/model_registry.py
+
+"""
+Resolves the configured embedding models (models.code_model_name / models.doc_model_name) to a
+concrete source before anything is loaded:
+  1. the name itself, if it is a directory (absolute or relative to the project root)
+  2. a folder under models.model_dir named after the model ("org/name", "org__name" or "name")
+  3. the hub name; with models.offline only the local Hugging Face cache is consulted
+Local folders listed in models.checksums are verified (sha256 over their files) before loading,
+and offline mode sets HF_HUB_OFFLINE/TRANSFORMERS_OFFLINE so no library attempts a network lookup.
+Every stored embedding is tagged with its model id (see embedding_store.load_embedding_models),
+so vectors produced by different models are never compared.
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from cline_utils.dependency_system.utils.config_manager import ConfigManager
+from cline_utils.dependency_system.utils.path_utils import get_project_root, is_subpath, normalize_path
+
+import logging
+logger = logging.getLogger(__name__)
+
+MODEL_TYPES = ("code_model_name", "doc_model_name")
+DEFAULT_MODEL_ID = "sentence-transformers/all-mpnet-base-v2"
+_OFFLINE_ENV_VARS = ("HF_HUB_OFFLINE", "TRANSFORMERS_OFFLINE")
+_verified_checksums: Dict[str, str] = {} # Local folder -> digest already verified in this process
+
+class ModelSpec(NamedTuple):
+    """A configured model resolved to where it will be loaded from."""
+    model_type: str # "code_model_name" or "doc_model_name"
+    model_id: str # Tag stored with each embedding (canonical configured name)
+    source: str # Local folder or hub name passed to SentenceTransformer
+    is_local: bool
+    offline: bool
+    checksum: Optional[str] # Expected sha256 of the local folder, if configured
+
+def canonical_model_id(name: str) -> str:
+    """Canonical tag for a configured model name: bare hub names get the 'sentence-transformers/' prefix."""
+    name = (name or "").strip().replace("\\", "/").rstrip("/")
+    if not name: return DEFAULT_MODEL_ID
+    if "/" not in name: return f"sentence-transformers/{name}"
+    return name
+
+def _find_local_folder(name: str, model_id: str, model_dir: str, project_root: str) -> Optional[str]:
+    candidate = name if os.path.isabs(name) else os.path.join(project_root, name)
+    if os.path.isdir(candidate): return normalize_path(candidate)
+    if not model_dir: return None
+    if not os.path.isabs(model_dir): model_dir = os.path.join(project_root, model_dir)
+    for folder in (model_id, model_id.replace("/", "__"), model_id.rsplit("/", 1)[-1]):
+        candidate = os.path.join(model_dir, folder)
+        if os.path.isdir(candidate): return normalize_path(candidate)
+    return None
+
+def resolve_model(model_type: str, config: Optional[ConfigManager] = None) -> ModelSpec:
+    """
+    Resolves one configured model without loading it.
+
+    Args:
+        model_type: "code_model_name" or "doc_model_name".
+        config: ConfigManager to read from (default: a new one).
+    Returns:
+        The ModelSpec; its source is a local folder whenever one is available.
+    """
+    if model_type not in MODEL_TYPES: raise ValueError(f"Unknown model type: {model_type}")
+    config = config or ConfigManager()
+    name = config.get_model_name(model_type); model_id = canonical_model_id(name)
+    local_folder = _find_local_folder(name, model_id, config.get_model_setting("model_dir", "") or "", get_project_root())
+    checksum = (config.get_model_setting("checksums", {}) or {}).get(model_id)
+    return ModelSpec(model_type, model_id, local_folder or model_id, local_folder is not None,
+                     bool(config.get_model_setting("offline", False)), checksum)
+
+def model_type_for_path(norm_path: str, doc_dirs: List[str]) -> str:
+    """'doc_model_name' for files under one of the (absolute, normalized) doc dirs, else 'code_model_name'."""
+    return "doc_model_name" if any(is_subpath(norm_path, doc_dir) for doc_dir in doc_dirs) else "code_model_name"
+
+def configured_model_ids(config: Optional[ConfigManager] = None) -> Dict[str, str]:
+    """Model type -> id new embeddings of that type are tagged with (no folder resolution or checksums)."""
+    config = config or ConfigManager()
+    return {model_type: canonical_model_id(config.get_model_name(model_type)) for model_type in MODEL_TYPES}
+
+def embedding_model_id(norm_path: str, model_of_path: Dict[str, str], model_ids: Dict[str, str], doc_dirs: List[str]) -> str:
+    """
+    Model id of a file's embedding: its stored tag (load_embedding_models), else the configured model
+    of its type (configured_model_ids). Never empty, so untagged files are compared like tagged ones.
+    """
+    return model_of_path.get(norm_path) or model_ids[model_type_for_path(norm_path, doc_dirs)]
+
+def get_doc_dirs(config: Optional[ConfigManager] = None, project_root: Optional[str] = None) -> List[str]:
+    """Absolute, normalized doc directories (for model_type_for_path)."""
+    config = config or ConfigManager(); project_root = project_root or get_project_root()
+    return [normalize_path(os.path.join(project_root, d)) for d in config.get_doc_directories()]
+
+def compute_model_checksum(folder: str) -> str:
+    """sha256 over the relative paths and contents of all files in a model folder (hidden entries skipped)."""
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(f for f in filenames if not f.startswith(".")):
+            file_path = os.path.join(dirpath, filename)
+            digest.update(os.path.relpath(file_path, folder).replace("\\", "/").encode("utf-8") + b"\0")
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b""): digest.update(block)
+    return digest.hexdigest()
+
+def prepare_model(spec: ModelSpec) -> bool:
+    """
+    Verifies a model before it is loaded and configures offline mode.
+
+    An offline model without a local folder is not an error: it is loaded from the HF cache.
+
+    Returns:
+        Whether the model must be loaded with local_files_only.
+    Raises:
+        ValueError: A checksum is configured in models.checksums but the model has no local
+                    folder, or the local folder's checksum does not match it.
+    """
+    if spec.offline:
+        for var in _OFFLINE_ENV_VARS: os.environ.setdefault(var, "1")
+    if spec.checksum:
+        if not spec.is_local: raise ValueError(f"Model {spec.model_id} has a checksum configured but no local folder (set models.model_dir).")
+        if _verified_checksums.get(spec.source) != spec.checksum:
+            actual = compute_model_checksum(spec.source)
+            if actual != spec.checksum: raise ValueError(f"Checksum mismatch for model {spec.model_id} at {spec.source}: expected {spec.checksum}, found {actual}.")
+            _verified_checksums[spec.source] = actual
+            logger.info(f"Verified checksum of model {spec.model_id} at {spec.source}.")
+    return spec.is_local or spec.offline
+
+def describe_models(config: Optional[ConfigManager] = None, compute_checksums: bool = True) -> List[Dict[str, Any]]:
+    """Resolution and checksum status of each configured model (for the verify-models command)."""
+    config = config or ConfigManager(); report = []
+    for model_type in MODEL_TYPES:
+        spec = resolve_model(model_type, config)
+        actual = compute_model_checksum(spec.source) if spec.is_local and compute_checksums else None
+        status = ("no local folder" if not spec.is_local else "unverified" if not spec.checksum
+                  else "ok" if actual == spec.checksum else "MISMATCH" if actual else "not checked")
+        report.append({**spec._asdict(), "actual_checksum": actual, "status": status})
+    return report
+
+# --- End of model_registry.py ---
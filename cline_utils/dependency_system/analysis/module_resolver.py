@@ -0,0 +1,228 @@
+# analysis/module_resolver.py
+
+"""
+Project-wide module resolution indexes (Python and JS/TS).
+Built once from path_to_key_info so import -> path resolution is a dictionary lookup
+instead of candidate-path construction plus filesystem checks for every import.
+"""
+
+import json
+import os
+import posixpath
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from cline_utils.dependency_system.core.key_manager import KeyInfo
+from cline_utils.dependency_system.utils.path_utils import normalize_path
+from cline_utils.dependency_system.utils.config_manager import ConfigManager
+
+import logging
+logger = logging.getLogger(__name__)
+
+class PythonModuleIndex:
+    """
+    Maps dotted Python module names to tracked files.
+
+    Absolute imports are looked up per source root (project root first, then code roots),
+    preferring 'pkg/mod.py' over 'pkg/mod/__init__.py' like the previous candidate order.
+    Relative imports walk up 'level - 1' directories from the importing file's directory,
+    never past the project root. Results are memoised; nothing here touches the disk.
+    """
+    def __init__(self, tracked_paths: Set[str], project_root: str, source_roots: Optional[List[str]] = None):
+        self.project_root = normalize_path(project_root)
+        self._py_paths: Set[str] = {p for p in tracked_paths if p.endswith(".py")}
+        self._root_modules: List[Tuple[Dict[str, str], Dict[str, str]]] = [] # Per root: (module files, package __init__ files)
+        roots = [self.project_root] + [r for r in (source_roots or []) if r != self.project_root]
+        for root in roots:
+            module_files: Dict[str, str] = {}; package_inits: Dict[str, str] = {}; prefix = root.rstrip("/") + "/"
+            for path in self._py_paths:
+                if not path.startswith(prefix): continue
+                parts = path[len(prefix):-3].split("/")
+                if parts[-1] == "__init__":
+                    if len(parts) > 1: package_inits[".".join(parts[:-1])] = path
+                else: module_files[".".join(parts)] = path
+            self._root_modules.append((module_files, package_inits))
+        self._memo: Dict[Tuple[str, str, int], Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, import_name: str, source_dir: str, level: int = 0) -> Optional[str]:
+        """
+        Resolves an import to a tracked .py path.
+
+        Args:
+            import_name: Dotted module name ('' for 'from . import x').
+            source_dir: Normalized directory of the importing file.
+            level: Relative import level (number of leading dots), 0 for absolute imports.
+        Returns:
+            The normalized path of the module file or package __init__.py, or None.
+        """
+        memo_key = (import_name, source_dir if level > 0 else "", level)
+        with self._lock:
+            if memo_key in self._memo: return self._memo[memo_key]
+        resolved = self._resolve_relative(import_name, source_dir, level) if level > 0 else self._resolve_absolute(import_name)
+        with self._lock: self._memo[memo_key] = resolved
+        return resolved
+
+    def _resolve_absolute(self, import_name: str) -> Optional[str]:
+        if not import_name or import_name.startswith('.'): return None
+        for module_files, package_inits in self._root_modules:
+            path = module_files.get(import_name) or package_inits.get(import_name)
+            if path: return path
+        return None
+
+    def _resolve_relative(self, import_name: str, source_dir: str, level: int) -> Optional[str]:
+        current_dir = source_dir
+        for _ in range(level - 1):
+            parent_dir = os.path.dirname(current_dir)
+            if not parent_dir or parent_dir == current_dir or not parent_dir.startswith(self.project_root): return None
+            current_dir = parent_dir
+        if not import_name: candidates = [f"{current_dir}/__init__.py"]
+        else:
+            base_path = f"{current_dir}/{import_name.replace('.', '/')}"
+            candidates = [f"{base_path}.py", f"{base_path}/__init__.py"]
+        return next((c for c in candidates if c in self._py_paths), None)
+
+JS_EXTENSIONS = ['.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs']
+TS_CONFIG_NAMES = ("tsconfig.json", "jsconfig.json")
+# Strings are matched first so '//' or '/*' inside them survive; comments and trailing commas are dropped
+_JSONC_TOKEN_PATTERN = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/|,(?=\s*[}\]])', re.DOTALL)
+
+def _load_tsconfig(config_path: str) -> Dict[str, Any]:
+    """Reads a tsconfig/jsconfig file (JSON with comments and trailing commas). Returns {} on failure."""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f: content = f.read()
+        return json.loads(_JSONC_TOKEN_PATTERN.sub(lambda m: m.group(1) or "", content))
+    except Exception as e: logger.warning(f"Could not read {config_path}: {e}"); return {}
+
+class _TsPathConfig:
+    """compilerOptions.baseUrl/paths of one tsconfig, with targets made absolute."""
+    def __init__(self, config_dir: str, compiler_options: Dict[str, Any]):
+        base_url = compiler_options.get("baseUrl")
+        self.base_url = posixpath.normpath(posixpath.join(config_dir, base_url)) if isinstance(base_url, str) else None
+        paths_root = self.base_url or config_dir # TS resolves 'paths' against the config dir when baseUrl is unset
+        self.paths: List[Tuple[str, Optional[str], List[str]]] = [] # (prefix, suffix or None for exact, absolute targets)
+        for pattern, targets in (compiler_options.get("paths") or {}).items():
+            if not isinstance(targets, list) or pattern.count('*') > 1: continue
+            if '*' in pattern: prefix, _, suffix = pattern.partition('*')
+            else: prefix, suffix = pattern, None # Exact alias
+            self.paths.append((prefix, suffix, [posixpath.join(paths_root, t) for t in targets if isinstance(t, str)]))
+        self.paths.sort(key=lambda entry: len(entry[0]), reverse=True) # Longest prefix wins, as in tsc
+
+    def alias_candidates(self, specifier: str) -> List[str]:
+        for prefix, suffix, targets in self.paths:
+            if suffix is None:
+                if specifier == prefix: return [posixpath.normpath(t) for t in targets]
+            elif specifier.startswith(prefix) and specifier.endswith(suffix) and len(specifier) >= len(prefix) + len(suffix):
+                star = specifier[len(prefix):len(specifier) - len(suffix)]
+                return [posixpath.normpath(t.replace('*', star, 1)) for t in targets]
+        return []
+
+class JavaScriptModuleIndex:
+    """
+    Resolves JS/TS import specifiers to tracked files.
+
+    Relative/absolute specifiers probe the exact path, then each of JS_EXTENSIONS, then
+    'index.<ext>' inside the directory; '.js'-style specifiers also try the TS sources they
+    compile from. Bare specifiers go through the nearest tsconfig/jsconfig 'paths' aliases and
+    'baseUrl'. Results are cached per (source_dir, specifier); resolution never touches the disk.
+    """
+    def __init__(self, tracked_paths: Set[str], ts_configs: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._paths = tracked_paths
+        self._configs: Dict[str, _TsPathConfig] = {d: _TsPathConfig(d, (c.get("compilerOptions") or {})) for d, c in (ts_configs or {}).items()}
+        self._config_for_dir: Dict[str, Optional[_TsPathConfig]] = {}
+        self._memo: Dict[Tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, specifier: str, source_dir: str) -> Optional[str]:
+        """
+        Resolves an import specifier from a file in 'source_dir' to a tracked path.
+
+        Args:
+            specifier: The string from import/require (e.g. './util', '@app/core', 'lodash').
+            source_dir: Normalized directory of the importing file.
+        Returns:
+            The normalized tracked path, or None (external packages, URLs, untracked targets).
+        """
+        memo_key = (source_dir, specifier)
+        with self._lock:
+            if memo_key in self._memo: return self._memo[memo_key]
+        resolved = self._resolve(specifier, source_dir)
+        with self._lock: self._memo[memo_key] = resolved
+        return resolved
+
+    def _resolve(self, specifier: str, source_dir: str) -> Optional[str]:
+        if not specifier or specifier.startswith(('http:', 'https:', 'data:')): return None
+        if specifier.startswith(('.', '/')): return self._probe(posixpath.normpath(posixpath.join(source_dir, specifier)))
+        config = self._nearest_config(source_dir)
+        if not config: return None
+        for candidate in config.alias_candidates(specifier):
+            resolved = self._probe(candidate)
+            if resolved: return resolved
+        return self._probe(posixpath.normpath(posixpath.join(config.base_url, specifier))) if config.base_url else None
+
+    def _probe(self, base_path: str) -> Optional[str]:
+        if base_path in self._paths: return base_path
+        stem, ext = posixpath.splitext(base_path)
+        if ext.lower() in JS_EXTENSIONS:
+            # 'import "./x.js"' in TS sources refers to x.ts/x.tsx
+            if ext.lower() in ('.js', '.jsx', '.mjs', '.cjs'):
+                return next((c for c in (f"{stem}.ts", f"{stem}.tsx") if c in self._paths), None)
+            return None
+        for candidate in [f"{base_path}{e}" for e in JS_EXTENSIONS] + [f"{base_path}/index{e}" for e in JS_EXTENSIONS]:
+            if candidate in self._paths: return candidate
+        return None
+
+    def _nearest_config(self, source_dir: str) -> Optional[_TsPathConfig]:
+        if source_dir in self._config_for_dir: return self._config_for_dir[source_dir]
+        current_dir = source_dir; config = None
+        while True:
+            if current_dir in self._configs: config = self._configs[current_dir]; break
+            parent_dir = posixpath.dirname(current_dir)
+            if parent_dir == current_dir: break
+            current_dir = parent_dir
+        self._config_for_dir[source_dir] = config
+        return config
+
+_index_lock = threading.Lock()
+_index_state: Dict[str, Dict[str, Any]] = {}
+
+def _get_cached_index(kind: str, path_to_key_info: Dict[str, KeyInfo], project_root: str, builder: Callable[[Set[str], str], Any]) -> Any:
+    """
+    Returns the 'kind' index for this path_to_key_info map, building it on first use.
+    The index is rebuilt whenever a different (or resized) map or project root is passed.
+    """
+    norm_root = normalize_path(project_root)
+    with _index_lock:
+        state = _index_state.get(kind)
+        if state and state["source"] is path_to_key_info and state["size"] == len(path_to_key_info) and state["root"] == norm_root:
+            return state["index"]
+        tracked_files = {info.norm_path for info in path_to_key_info.values() if not info.is_directory}
+        index = builder(tracked_files, norm_root)
+        _index_state[kind] = {"source": path_to_key_info, "size": len(path_to_key_info), "root": norm_root, "index": index}
+        logger.debug(f"Built {kind} module index from {len(tracked_files)} tracked files.")
+        return index
+
+def _code_root_paths(project_root: str) -> List[str]:
+    return [normalize_path(os.path.join(project_root, r)) for r in ConfigManager().get_code_root_directories()]
+
+def get_python_module_index(path_to_key_info: Dict[str, KeyInfo], project_root: str) -> PythonModuleIndex:
+    """Returns the shared PythonModuleIndex for this path_to_key_info map."""
+    return _get_cached_index("python", path_to_key_info, project_root,
+                             lambda tracked, root: PythonModuleIndex(tracked, root, _code_root_paths(root)))
+
+def _build_javascript_index(tracked_files: Set[str], project_root: str) -> JavaScriptModuleIndex:
+    # tsconfig/jsconfig: tracked ones plus any at the project root or code roots (often outside tracked dirs)
+    config_paths = {p for p in tracked_files if posixpath.basename(p) in TS_CONFIG_NAMES}
+    for directory in [project_root] + _code_root_paths(project_root):
+        config_paths.update(p for p in (f"{directory}/{name}" for name in TS_CONFIG_NAMES) if os.path.isfile(p))
+    ts_configs: Dict[str, Dict[str, Any]] = {}
+    for config_path in sorted(config_paths, key=lambda p: posixpath.basename(p) != "tsconfig.json"): # tsconfig wins over jsconfig
+        ts_configs.setdefault(posixpath.dirname(config_path), _load_tsconfig(config_path))
+    return JavaScriptModuleIndex(tracked_files, ts_configs)
+
+def get_javascript_module_index(path_to_key_info: Dict[str, KeyInfo], project_root: str) -> JavaScriptModuleIndex:
+    """Returns the shared JavaScriptModuleIndex for this path_to_key_info map."""
+    return _get_cached_index("javascript", path_to_key_info, project_root, _build_javascript_index)
+
+# --- End of module_resolver.py ---
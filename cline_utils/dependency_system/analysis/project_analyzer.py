@@ -4,7 +4,8 @@ from collections import defaultdict
 import fnmatch
 import json
 import os
-from typing import Any, Dict, Optional, List, Tuple
+import time
+from typing import Any, Dict, Optional, List, Set, Tuple
 from cline_utils.dependency_system.core.dependency_grid import decompress
 # <<< MODIFIED IMPORT: Import tracker_io module >>>
 from cline_utils.dependency_system.io import tracker_io
@@ -15,12 +16,14 @@ import logging
 from cline_utils.dependency_system.analysis.dependency_analyzer import analyze_file
 from cline_utils.dependency_system.utils.batch_processor import BatchProcessor, process_items
 from cline_utils.dependency_system.analysis.dependency_suggester import suggest_dependencies
-from cline_utils.dependency_system.analysis.embedding_manager import generate_embeddings
+from cline_utils.dependency_system.analysis.embedding_manager import generate_embeddings, get_last_embedding_stats
 # Remove direct import of generate_keys, KeyInfo etc. Use key_manager.generate_keys etc.
 # from cline_utils.dependency_system.core.key_manager import get_key_from_path, generate_keys, validate_key, KeyInfo, KeyGenerationError, sort_keys
 from cline_utils.dependency_system.utils.cache_manager import cached, file_modified, clear_all_caches
 from cline_utils.dependency_system.utils.config_manager import ConfigManager
+from cline_utils.dependency_system.utils.file_content_cache import get_file_content_stats, with_file_content_cache
 from cline_utils.dependency_system.utils.path_utils import is_subpath, normalize_path, get_project_root
+from cline_utils.dependency_system.utils.profiler import profile_count, profile_detail, profile_phase, profile_section
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +31,7 @@ logger = logging.getLogger(__name__)
 # @cached("project_analysis",
 #        key_func=lambda force_analysis=False, force_embeddings=False, **kwargs:
 #        f"analyze_project:{normalize_path(get_project_root())}:{(os.path.getmtime(ConfigManager().config_path) if os.path.exists(ConfigManager().config_path) else 0)}:{force_analysis}:{force_embeddings}")
+@with_file_content_cache # Each file is read once per run, shared by analysis and embeddings
 def analyze_project(force_analysis: bool = False, force_embeddings: bool = False) -> Dict[str, Any]:
     """
     Analyzes all files in a project to identify dependencies between them,
@@ -110,6 +114,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
     path_to_key_info: Dict[str, key_manager.KeyInfo] = {} # Use qualified type
     newly_generated_keys: List[key_manager.KeyInfo] = [] # Use qualified type
 
+    key_phase = profile_phase("key_generation")
     try:
         # Call generate_keys using the module reference
         path_to_key_info, newly_generated_keys = key_manager.generate_keys(
@@ -121,6 +126,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
         results["tracker_initialization"]["key_generation"] = "success"
         logger.info(f"Generated {len(path_to_key_info)} keys for {len(path_to_key_info)} files/dirs.")
         if newly_generated_keys: logger.info(f"Assigned {len(newly_generated_keys)} new keys.")
+        key_phase.stop(items=len(path_to_key_info)); profile_count("keys_new", len(newly_generated_keys))
     except key_manager.KeyGenerationError as kge: # Use qualified type
         results["status"] = "error"; results["message"] = f"Key generation failed: {kge}"; logger.critical(results["message"]); return results
     except Exception as e:
@@ -143,6 +149,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
     # --- File Identification and Filtering ---
     config_manager_instance = ConfigManager()
     logger.info("Identifying files for analysis...")
+    walk_phase = profile_phase("walk")
     files_to_analyze_abs = []
     # Get excluded_file_patterns from config
     excluded_file_patterns = config_manager_instance.config.get("excluded_file_patterns", [])
@@ -200,16 +207,19 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
                     logger.warning(f"File found but no key generated: {file_path_abs}")
 
     logger.info(f"Found {len(files_to_analyze_abs)} files to analyze.")
+    walk_phase.stop(items=len(files_to_analyze_abs))
 
     # --- File Analysis ---
     logger.info("Starting file analysis...")
     # Use process_items for potential parallelization
     # Pass force_analysis flag down to analyze_file if caching is implemented there
+    analysis_phase = profile_phase("analysis")
     analysis_results_list = process_items(
         files_to_analyze_abs,
         analyze_file,
         force=force_analysis
     )
+    analysis_phase.stop(items=len(files_to_analyze_abs))
     file_analysis_results: Dict[str, Any] = {}
     analyzed_count, skipped_count, error_count = 0, 0, 0
     for file_path_abs, analysis_result in zip(files_to_analyze_abs, analysis_results_list):
@@ -219,6 +229,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
             else: file_analysis_results[file_path_abs] = analysis_result; analyzed_count += 1
         else: logger.warning(f"Analysis returned no result for {file_path_abs}"); error_count += 1
     results["file_analysis"] = file_analysis_results
+    profile_count("files_analyzed", analyzed_count); profile_count("files_skipped", skipped_count); profile_count("files_failed", error_count)
     logger.info(f"File analysis complete. Analyzed: {analyzed_count}, Skipped: {skipped_count}, Errors: {error_count}")
 
         # --- Create file_to_module mapping (Adapted for path_to_key_info) ---
@@ -251,9 +262,12 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
 
     # --- Embedding generation ---
     logger.info("Starting embedding generation...")
+    embedding_phase = profile_phase("embeddings")
     try:
         # Pass path_to_key_info instead of key_map
-        success = generate_embeddings(all_roots_rel, path_to_key_info, force=force_embeddings)
+        success = generate_embeddings(all_roots_rel, path_to_key_info, force=force_embeddings, file_analyses=file_analysis_results)
+        embedding_stats = get_last_embedding_stats()
+        embedding_phase.stop(items=embedding_stats.get("files", 0)); profile_section("embedding_pipeline", embedding_stats)
         results["embedding_generation"]["status"] = "success" if success else "partial_failure"
         if not success: results["message"] += " Warning: Embedding generation failed for some paths."; logger.warning("Embedding generation failed or skipped for some paths.")
         else: logger.info("Embedding generation completed successfully.")
@@ -265,6 +279,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
 
     # --- Dependency Suggestion ---
     logger.info("Starting dependency suggestion...")
+    suggestion_phase = profile_phase("suggestion")
     try:
         # Start with initial suggestions (e.g., from key generation if any)
         # Use defaultdict for easier merging
@@ -299,6 +314,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
                 suggestion_count += len(suggestions_for_file)
 
         logger.info(f"Generated {suggestion_count} raw suggestions from file analysis.")
+        profile_count("suggestions_raw", suggestion_count)
 
         # --- Combine suggestions within each source key using priority ---
         # This step is crucial before adding reciprocal ones
@@ -370,59 +386,48 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
         #                   # else: Keep existing for other equal priority conflicts
 
         results["dependency_suggestion"]["status"] = "success"
+        suggestion_phase.stop(items=len(analyzed_file_paths))
         logger.info("Dependency suggestion combining completed.")
     except Exception as e:
         results["status"] = "error"; results["message"] = f"Dependency suggestion failed critically: {e}"; logger.exception(results["message"]); return results
 
     # --- Update Trackers ---
     logger.info("Updating trackers...")
+    tracker_io.reset_tracker_write_stats()
     # --- Update Mini Trackers FIRST ---
     results["tracker_update"]["mini"] = {}
-    mini_tracker_paths_updated = set() # Track paths to avoid duplicates if structure overlaps
-
-    potential_mini_tracker_dirs: Dict[str, key_manager.KeyInfo] = {}
-    for code_root_abs in abs_code_roots:
-        for path, key_info in path_to_key_info.items():
-            if key_info.is_directory and key_info.parent_path == code_root_abs:
-               potential_mini_tracker_dirs[path] = key_info
-               # Also consider the code root itself if it contains files directly
-            elif key_info.is_directory and path == code_root_abs:
-                 potential_mini_tracker_dirs[path] = key_info
-
-    logger.info(f"Identified {len(potential_mini_tracker_dirs)} potential directories for mini-trackers.")
-
-    # Iterate through the identified module paths
-    for norm_module_path, module_key_info in potential_mini_tracker_dirs.items():
-        module_key_string = module_key_info.key_string # Get key string for logging if needed
-        # Check if directory is NOT empty before trying to update/create tracker
-        if os.path.isdir(norm_module_path) and not _is_empty_dir(norm_module_path):
-            if norm_module_path in mini_tracker_paths_updated: continue # Skip if already processed
-            mini_tracker_path = tracker_io.get_tracker_path(project_root, tracker_type="mini", module_path=norm_module_path)
-            logger.info(f"Updating mini tracker for module '{norm_module_path}' (Key: {module_key_string}) at: {mini_tracker_path}")
-            mini_tracker_paths_updated.add(norm_module_path)
-            try:
-                # Update the mini-tracker. Suggestions are applied internally by update_tracker.
-                # Pass the GLOBAL suggestions here. update_tracker will filter them based on the module.
-                tracker_io.update_tracker(
-                    output_file_suggestion=mini_tracker_path,
-                    path_to_key_info=path_to_key_info, # Pass the main map
-                    tracker_type="mini",
-                    suggestions=all_suggestions, # Pass combined & reciprocal suggestions (keyed by key strings)
-                    file_to_module=file_to_module,
-                    new_keys=newly_generated_keys, # Pass list of KeyInfo objects
-                    force_apply_suggestions=False,
-                    use_old_map_for_migration=old_map_existed_before_gen
-                )
-                results["tracker_update"]["mini"][norm_module_path] = "success"
-            except Exception as mini_err:
-                 logger.error(f"Error updating mini tracker {mini_tracker_path}: {mini_err}", exc_info=True)
-                 results["tracker_update"]["mini"][norm_module_path] = "failure"; results["status"] = "warning"
-        elif os.path.isdir(norm_module_path): logger.debug(f"Skipping mini-tracker update for empty directory: {norm_module_path}")
+    mini_tracker_jobs = _collect_mini_tracker_jobs(path_to_key_info, abs_code_roots)
+
+    # --- Route suggestions to modules once (instead of every update_tracker call rescanning all of them) ---
+    suggestions_by_module = _partition_suggestions_by_module(all_suggestions, path_to_key_info, file_to_module, {p for p, _ in mini_tracker_jobs})
+
+    if mini_tracker_jobs:
+        tracker_update_processor = BatchProcessor(max_workers=config.get_compute_setting("tracker_update_workers", None), show_progress=False)
+        # process_items returns only once every job has finished (join barrier before doc/main updates)
+        mini_phase = profile_phase("tracker_update.mini")
+        mini_update_outcomes = tracker_update_processor.process_items(
+            mini_tracker_jobs, _update_mini_tracker_job,
+            project_root=project_root,
+            path_to_key_info=path_to_key_info, # Pass the main map
+            suggestions_by_module=suggestions_by_module, # Each job only receives its module's slice
+            file_to_module=file_to_module,
+            new_keys=newly_generated_keys, # Pass list of KeyInfo objects
+            use_old_map_for_migration=old_map_existed_before_gen
+        )
+        mini_phase.stop(items=len(mini_tracker_jobs))
+        for norm_module_path, outcome in mini_update_outcomes:
+            results["tracker_update"]["mini"][norm_module_path] = outcome
+            if outcome != "success": results["status"] = "warning"
+        # Jobs dropped by the pool itself (should not happen, errors are caught per job) still count as failures
+        for norm_module_path, _ in mini_tracker_jobs:
+            if norm_module_path not in results["tracker_update"]["mini"]:
+                results["tracker_update"]["mini"][norm_module_path] = "failure"; results["status"] = "warning"
 
     # --- Update Doc Tracker ---
     doc_tracker_path = tracker_io.get_tracker_path(project_root, tracker_type="doc") if doc_directories_rel else None
     if doc_tracker_path:
         logger.info(f"Updating doc tracker: {doc_tracker_path}")
+        doc_phase = profile_phase("tracker_update.doc")
         try:
             tracker_io.update_tracker(
                 output_file_suggestion=doc_tracker_path,
@@ -435,6 +440,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
                 use_old_map_for_migration=old_map_existed_before_gen
             )
             results["tracker_update"]["doc"] = "success"
+            profile_detail("tracker_update", doc_tracker_path, doc_phase.stop(items=1))
         except Exception as doc_err:
             logger.error(f"Error updating doc tracker {doc_tracker_path}: {doc_err}", exc_info=True)
             results["tracker_update"]["doc"] = "failure"; results["status"] = "warning"
@@ -442,6 +448,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
     # --- Update Main Tracker LAST (using aggregation) ---
     main_tracker_path = tracker_io.get_tracker_path(project_root, tracker_type="main")
     logger.info(f"Updating main tracker (with aggregation): {main_tracker_path}")
+    main_phase = profile_phase("tracker_update.main")
     try:
         # update_tracker for "main" will call the aggregation function internally.
         # Aggregation needs path_to_key_info and file_to_module.
@@ -456,6 +463,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
             use_old_map_for_migration=old_map_existed_before_gen
         )
         results["tracker_update"]["main"] = "success"
+        profile_detail("tracker_update", main_tracker_path, main_phase.stop(items=1))
     except Exception as main_err:
         logger.error(f"Error updating main tracker {main_tracker_path}: {main_err}", exc_info=True)
         results["tracker_update"]["main"] = "failure"; results["status"] = "warning"
@@ -465,11 +473,201 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
         results["message"] = f"Dependency suggestion or tracker update failed critically: {e}"
         logger.exception(results["message"]); return results
 
+    write_stats = tracker_io.get_tracker_write_stats()
+    results["tracker_update"]["rewritten"] = write_stats["rewritten"]; results["tracker_update"]["unchanged"] = write_stats["unchanged"]
+    print(f"Trackers rewritten: {write_stats['rewritten']} (unchanged: {write_stats['unchanged']})")
+    profile_count("trackers_rewritten", write_stats["rewritten"]); profile_count("trackers_unchanged", write_stats["unchanged"])
+    profile_section("file_content_cache", get_file_content_stats())
+
     # --- Final Status Check & Return ---
     if results["status"] == "success": print("Project analysis completed successfully."); results["message"] = "Project analysis completed successfully."
     elif results["status"] == "warning": print("Project analysis completed with warnings. Check logs."); results["message"] = results.get("message", "") + " Project analysis completed with warnings."
     return results
 
+@with_file_content_cache
+def analyze_changed_files(changed_paths: List[str]) -> Dict[str, Any]:
+    """
+    Incremental counterpart of analyze_project for edits to files that already have keys.
+    Only the changed files are re-analyzed, re-embedded and re-suggested, and only the trackers
+    their suggestions touch are updated (plus the main tracker, which aggregates the mini trackers).
+    Falls back to a full analyze_project when the key set changes (a file was added or removed)
+    or no global key map exists yet.
+
+    Args:
+        changed_paths: Paths of modified files (absolute or relative to the CWD).
+    Returns:
+        Results dictionary shaped like analyze_project's, with "mode" set to "incremental" or "full".
+    """
+    config = ConfigManager(); project_root = get_project_root()
+    changed = sorted({normalize_path(os.path.abspath(p)) for p in changed_paths})
+    path_to_key_info = key_manager.load_global_key_map()
+    if path_to_key_info is None or any(p not in path_to_key_info or not os.path.isfile(p) for p in changed):
+        logger.info("Key set changed (or no key map yet); running full project analysis.")
+        results = analyze_project(); results["mode"] = "full"; return results
+
+    results: Dict[str, Any] = {"status": "success", "message": "", "mode": "incremental", "changed_files": changed,
+                               "embedding_generation": {}, "dependency_suggestion": {}, "tracker_update": {}}
+    for path in changed: file_modified(path, project_root) # Drop cached analysis/similarity entries for these files
+    file_to_module = {info.norm_path: info.parent_path for info in path_to_key_info.values() if not info.is_directory and info.parent_path}
+
+    # --- File Analysis (changed files only) ---
+    file_analysis_results: Dict[str, Any] = {}
+    for path in changed:
+        analysis_result = analyze_file(path)
+        if analysis_result and "error" not in analysis_result and "skipped" not in analysis_result: file_analysis_results[path] = analysis_result
+    logger.info(f"Incremental analysis: {len(file_analysis_results)} of {len(changed)} changed files analyzed.")
+
+    # --- Embedding refresh (unchanged files are skipped by their recorded mtimes) ---
+    all_roots_rel = sorted(set(config.get_code_root_directories() + config.get_doc_directories()))
+    try:
+        success = generate_embeddings(all_roots_rel, path_to_key_info, file_analyses=file_analysis_results)
+        results["embedding_generation"]["status"] = "success" if success else "partial_failure"
+    except Exception as e:
+        results["embedding_generation"]["status"] = "error"; results["status"] = "warning"; logger.exception(f"Embedding refresh failed: {e}")
+
+    # --- Suggestions for the changed files ---
+    all_suggestions: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+    from cline_utils.dependency_system.analysis.dependency_suggester import _combine_suggestions_with_char_priority
+    try:
+        for path in file_analysis_results:
+            suggestions_for_file = suggest_dependencies(path, path_to_key_info, project_root, file_analysis_results, threshold=0.65)
+            if suggestions_for_file: all_suggestions[path_to_key_info[path].key_string].extend(suggestions_for_file)
+        all_suggestions = defaultdict(list, {src: _combine_suggestions_with_char_priority(deps) for src, deps in all_suggestions.items()})
+        results["dependency_suggestion"]["status"] = "success"
+    except Exception as e:
+        results["status"] = "error"; results["message"] = f"Dependency suggestion failed: {e}"; logger.exception(results["message"]); return results
+
+    # --- Update only the trackers these suggestions touch ---
+    tracker_io.reset_tracker_write_stats()
+    abs_code_roots = {normalize_path(os.path.join(project_root, r)) for r in config.get_code_root_directories()}
+    mini_tracker_jobs = _collect_mini_tracker_jobs(path_to_key_info, abs_code_roots)
+    suggestions_by_module = _partition_suggestions_by_module(all_suggestions, path_to_key_info, file_to_module, {p for p, _ in mini_tracker_jobs})
+    results["tracker_update"]["mini"] = {}
+    for job in mini_tracker_jobs:
+        if job[0] not in suggestions_by_module: continue
+        norm_module_path, outcome = _update_mini_tracker_job(job, project_root, path_to_key_info, suggestions_by_module, file_to_module,
+                                                             new_keys=[], use_old_map_for_migration=False)
+        results["tracker_update"]["mini"][norm_module_path] = outcome
+        if outcome != "success": results["status"] = "warning"
+    doc_roots = [normalize_path(os.path.join(project_root, r)) for r in config.get_doc_directories()]
+    doc_tracker_path = tracker_io.get_tracker_path(project_root, tracker_type="doc") if doc_roots else None
+    if doc_tracker_path and any(is_subpath(p, root) for p in changed for root in doc_roots):
+        try:
+            tracker_io.update_tracker(output_file_suggestion=doc_tracker_path, path_to_key_info=path_to_key_info, tracker_type="doc",
+                                      suggestions=all_suggestions, file_to_module=file_to_module, new_keys=[],
+                                      force_apply_suggestions=False, use_old_map_for_migration=False)
+            results["tracker_update"]["doc"] = "success"
+        except Exception as doc_err:
+            logger.error(f"Error updating doc tracker {doc_tracker_path}: {doc_err}", exc_info=True); results["tracker_update"]["doc"] = "failure"; results["status"] = "warning"
+    if results["tracker_update"]["mini"]:
+        main_tracker_path = tracker_io.get_tracker_path(project_root, tracker_type="main")
+        try:
+            tracker_io.update_tracker(output_file_suggestion=main_tracker_path, path_to_key_info=path_to_key_info, tracker_type="main",
+                                      suggestions=None, file_to_module=file_to_module, new_keys=[],
+                                      force_apply_suggestions=False, use_old_map_for_migration=False)
+            results["tracker_update"]["main"] = "success"
+        except Exception as main_err:
+            logger.error(f"Error updating main tracker {main_tracker_path}: {main_err}", exc_info=True); results["tracker_update"]["main"] = "failure"; results["status"] = "warning"
+
+    write_stats = tracker_io.get_tracker_write_stats()
+    results["tracker_update"]["rewritten"] = write_stats["rewritten"]; results["tracker_update"]["unchanged"] = write_stats["unchanged"]
+    logger.info(f"Incremental update of {len(changed)} files done: {write_stats['rewritten']} trackers rewritten, {write_stats['unchanged']} unchanged.")
+    return results
+
+def _collect_mini_tracker_jobs(path_to_key_info: Dict[str, key_manager.KeyInfo], abs_code_roots: Set[str]) -> List[Tuple[str, str]]:
+    """
+    Returns (normalized module path, module key string) for every non-empty mini-tracker directory:
+    the code roots themselves and their direct subdirectories.
+    """
+    potential_mini_tracker_dirs: Dict[str, key_manager.KeyInfo] = {}
+    for code_root_abs in abs_code_roots:
+        for path, key_info in path_to_key_info.items():
+            if key_info.is_directory and key_info.parent_path == code_root_abs:
+               potential_mini_tracker_dirs[path] = key_info
+               # Also consider the code root itself if it contains files directly
+            elif key_info.is_directory and path == code_root_abs:
+                 potential_mini_tracker_dirs[path] = key_info
+
+    logger.info(f"Identified {len(potential_mini_tracker_dirs)} potential directories for mini-trackers.")
+
+    # Collect non-empty module directories; the (independent) mini-tracker updates are fanned out by the caller
+    mini_tracker_jobs: List[Tuple[str, str]] = []
+    for norm_module_path, module_key_info in potential_mini_tracker_dirs.items():
+        # Check if directory is NOT empty before trying to update/create tracker
+        if os.path.isdir(norm_module_path) and not _is_empty_dir(norm_module_path):
+            mini_tracker_jobs.append((norm_module_path, module_key_info.key_string))
+        elif os.path.isdir(norm_module_path): logger.debug(f"Skipping mini-tracker update for empty directory: {norm_module_path}")
+    return mini_tracker_jobs
+
+def _partition_suggestions_by_module(suggestions: Dict[str, List[Tuple[str, str]]],
+                                     path_to_key_info: Dict[str, key_manager.KeyInfo],
+                                     file_to_module: Dict[str, str],
+                                     module_paths: Set[str]) -> Dict[str, Dict[str, List[Tuple[str, str]]]]:
+    """
+    Routes suggestions to the mini-tracker modules they touch, in a single pass.
+    A suggestion goes to the module owning its source and to the module owning its target
+    (files via file_to_module, directories via their parent or themselves), so every
+    tracker receives its internal links plus the foreign keys they pull in.
+
+    Args:
+        suggestions: Global suggestions (source key string -> [(target key string, char)])
+        path_to_key_info: Global path -> KeyInfo map
+        file_to_module: Normalized file path -> normalized module path
+        module_paths: Module paths that will receive a mini-tracker update
+    Returns:
+        Module path -> suggestion slice in the same shape as the input
+    """
+    # Key strings are contextual (may repeat), so a key can belong to several modules
+    modules_for_key: Dict[str, Set[str]] = defaultdict(set)
+    for norm_path, info in path_to_key_info.items():
+        owners = (info.parent_path, norm_path) if info.is_directory else (file_to_module.get(norm_path, info.parent_path),)
+        for owner in owners:
+            if owner in module_paths: modules_for_key[info.key_string].add(owner)
+    partitioned: Dict[str, Dict[str, List[Tuple[str, str]]]] = defaultdict(lambda: defaultdict(list))
+    routed = 0
+    for src_key, deps in suggestions.items():
+        src_modules = modules_for_key.get(src_key, set())
+        for target_key, dep_char in deps:
+            for module_path in src_modules | modules_for_key.get(target_key, set()):
+                partitioned[module_path][src_key].append((target_key, dep_char)); routed += 1
+    logger.info(f"Routed {routed} suggestion entries to {len(partitioned)} modules.")
+    return partitioned
+
+def _update_mini_tracker_job(job: Tuple[str, str], project_root: str, path_to_key_info: Dict[str, key_manager.KeyInfo],
+                             suggestions_by_module: Dict[str, Dict[str, List[Tuple[str, str]]]], file_to_module: Dict[str, str],
+                             new_keys: List[key_manager.KeyInfo], use_old_map_for_migration: bool) -> Tuple[str, str]:
+    """
+    Updates a single module's mini-tracker. Runs inside the tracker update worker pool;
+    errors are contained here so one failing module does not affect the others.
+
+    Args:
+        job: (normalized module path, module key string)
+    Returns:
+        (normalized module path, "success" | "failure")
+    """
+    norm_module_path, module_key_string = job
+    mini_tracker_path = norm_module_path
+    try:
+        mini_tracker_path = tracker_io.get_tracker_path(project_root, tracker_type="mini", module_path=norm_module_path)
+        logger.info(f"Updating mini tracker for module '{norm_module_path}' (Key: {module_key_string}) at: {mini_tracker_path}")
+        start = time.perf_counter()
+        # Suggestions are applied internally by update_tracker (filtered to the module).
+        tracker_io.update_tracker(
+            output_file_suggestion=mini_tracker_path,
+            path_to_key_info=path_to_key_info,
+            tracker_type="mini",
+            suggestions=suggestions_by_module.get(norm_module_path, {}),
+            file_to_module=file_to_module,
+            new_keys=new_keys,
+            force_apply_suggestions=False,
+            use_old_map_for_migration=use_old_map_for_migration
+        )
+        profile_detail("tracker_update", mini_tracker_path, time.perf_counter() - start)
+        return norm_module_path, "success"
+    except Exception as mini_err:
+        logger.error(f"Error updating mini tracker {mini_tracker_path}: {mini_err}", exc_info=True)
+        return norm_module_path, "failure"
+
 def _is_empty_dir(dir_path: str) -> bool:
     """
     Checks if a directory is empty (contains no files or subdirectories).
@@ -0,0 +1,515 @@
+# analysis/similarity_index.py
+
+"""
+Nearest-neighbour search over file embeddings for semantic suggestions.
+Loads the mirrored .npy embeddings into one matrix (in the configured storage dtype,
+see embedding_store) and answers
+"which files are at least `threshold` similar to this one" through a pluggable backend:
+  - "exact": blocked top-k over the full matrix (default; memory bounded by tile size)
+  - "ivf":   inverted-file ANN (spherical k-means), persisted next to the embeddings
+             and updated incrementally when embeddings change
+Files are split into embedding spaces by kind (code, or doc for files under the doc directories)
+and model (see model_registry; untagged files use the configured model of their type), each with its own matrix and backend. Which space pairs are compared
+(code<->code, doc<->doc, doc<->code) and at what threshold comes from the 'semantic_policies' config;
+disallowed pairs are never scored, and spaces of different models are never compared.
+"""
+
+import abc
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+import numpy as np
+
+from cline_utils.dependency_system.analysis.embedding_store import (
+    EMBEDDING_DTYPES, dequantize_embeddings, get_embedding_dtype, load_embedding, load_embedding_models, quantize_embeddings, row_scales
+)
+from cline_utils.dependency_system.analysis.model_registry import configured_model_ids, embedding_model_id, get_doc_dirs, model_type_for_path
+from cline_utils.dependency_system.core.key_manager import KeyInfo
+from cline_utils.dependency_system.utils.path_utils import normalize_path
+from cline_utils.dependency_system.utils.config_manager import ConfigManager
+
+import logging
+logger = logging.getLogger(__name__)
+
+ANN_INDEX_FILENAME = "semantic_ann_index.npz"
+Neighbours = List[Tuple[int, float]] # (row, cosine similarity)
+Triples = Tuple[np.ndarray, np.ndarray, np.ndarray] # (source rows, target rows, scores), parallel arrays
+SPACE_KINDS = ("code", "doc")
+SEMANTIC_POLICIES = {("code", "code"): "code_code", ("doc", "doc"): "doc_doc", ("doc", "code"): "doc_code", ("code", "doc"): "doc_code"}
+
+def get_embedding_path(norm_file_path: str, embeddings_dir: str, project_root: str) -> Optional[str]:
+    """Returns the mirrored .npy path for a tracked file, or None if it lies outside the project root."""
+    if not norm_file_path.startswith(project_root): return None
+    try: return normalize_path(os.path.join(embeddings_dir, os.path.relpath(norm_file_path, project_root)) + ".npy")
+    except ValueError: return None
+
+def get_ann_index_filename(kind: str, model_id: str) -> str:
+    """Persisted IVF index file of one embedding space."""
+    return f"semantic_ann_index.{kind}.{re.sub(r'[^A-Za-z0-9_.-]+', '_', model_id or 'default')}.npz"
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True); norms[norms == 0] = 1.0 # Zero vectors stay zero (similarity 0)
+    return (vectors / norms).astype(np.float32, copy=False)
+
+def _top_k_above(scores: np.ndarray, k: int, threshold: float, exclude: Optional[np.ndarray] = None) -> List[Neighbours]:
+    """Per row of 'scores': up to k (0 = unlimited) (column, score) pairs with score >= threshold, best first."""
+    if exclude is not None: scores[np.arange(scores.shape[0]), exclude] = -np.inf
+    results: List[Neighbours] = []
+    for row in scores:
+        hits = np.flatnonzero(row >= threshold)
+        if k and hits.size > k: hits = hits[np.argpartition(row[hits], -k)[-k:]]
+        hits = hits[np.argsort(-row[hits], kind="stable")]
+        results.append([(int(col), float(min(1.0, row[col]))) for col in hits])
+    return results
+
+def iter_similarity_triples(vectors: np.ndarray, threshold: float, tile_size: int = 1024, top_k: int = 0,
+                            rows: Optional[np.ndarray] = None, scales: Optional[np.ndarray] = None,
+                            targets: Optional[np.ndarray] = None, target_scales: Optional[np.ndarray] = None) -> Iterator[Triples]:
+    """
+    Blocked cosine similarity over a stored embedding matrix, streamed as sparse triples.
+
+    Scores one tile_size x tile_size tile at a time and keeps only entries >= threshold
+    (self-pairs excluded), so memory is bounded by the tile size rather than N^2. With top_k,
+    each source row's best k candidates are merged across column tiles (tile x (k + tile) extra).
+    The matrix stays in its storage dtype; only the two tiles being multiplied are widened to
+    float32; for int8 rows the float32 products and per-row scales carry ordinary rounding error
+    (well below the precision of the similarity thresholds).
+
+    Args:
+        vectors: (N, D) matrix of unit-normalized float32/float16 rows or int8 rows.
+        threshold: Minimum cosine similarity kept.
+        tile_size: Rows/columns scored per tile.
+        top_k: Max targets per source row (0 = every target above threshold).
+        rows: Source rows to score (default: all rows).
+        scales: Per-row cosine factors for int8 rows (embedding_store.row_scales).
+        targets: Score source rows against this (M, D) matrix instead of 'vectors' itself
+                 (a different embedding space, so no self-pairs are excluded).
+        target_scales: Per-row cosine factors for int8 'targets'.
+    Yields:
+        (source rows, target rows, scores) arrays; with top_k one batch per row tile,
+        sorted by source row then best score first, otherwise one batch per non-empty tile.
+    """
+    n_rows = vectors.shape[0]; tile_size = max(1, int(tile_size))
+    columns, column_scales, exclude_self = (vectors, scales, True) if targets is None else (targets, target_scales, False)
+    source_rows = np.arange(n_rows) if rows is None else np.asarray(rows, dtype=np.int64)
+    for r_start in range(0, source_rows.size, tile_size):
+        tile_rows = source_rows[r_start:r_start + tile_size]; queries = vectors[tile_rows].astype(np.float32)
+        if scales is not None: queries *= scales[tile_rows, None]
+        if top_k:
+            best_scores = np.full((tile_rows.size, top_k), -np.inf, dtype=np.float32)
+            best_cols = np.full((tile_rows.size, top_k), -1, dtype=np.int64)
+        for c_start in range(0, columns.shape[0], tile_size):
+            scores = queries @ columns[c_start:c_start + tile_size].astype(np.float32).T
+            if column_scales is not None: scores *= column_scales[None, c_start:c_start + scores.shape[1]]
+            if exclude_self:
+                own = (tile_rows >= c_start) & (tile_rows < c_start + scores.shape[1])
+                scores[np.flatnonzero(own), tile_rows[own] - c_start] = -np.inf # Never pair a file with itself
+            if not top_k:
+                src, tgt = np.nonzero(scores >= threshold)
+                if src.size: yield tile_rows[src], tgt + c_start, np.minimum(scores[src, tgt], 1.0)
+                continue
+            scores[scores < threshold] = -np.inf
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            merged_cols = np.concatenate([best_cols, np.broadcast_to(np.arange(c_start, c_start + scores.shape[1]), scores.shape)], axis=1)
+            keep = np.argpartition(-merged_scores, top_k - 1, axis=1)[:, :top_k]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1); best_cols = np.take_along_axis(merged_cols, keep, axis=1)
+        if top_k:
+            src, slot = np.nonzero(np.isfinite(best_scores))
+            if not src.size: continue
+            order = np.lexsort((best_cols[src, slot], -best_scores[src, slot], src)) # Row, best first, then column for ties
+            src, slot = src[order], slot[order]
+            yield tile_rows[src], best_cols[src, slot], np.minimum(best_scores[src, slot], 1.0)
+
+# --- Backends ---
+
+class NeighbourBackend(abc.ABC):
+    """Base class for nearest-neighbour backends. Subclasses register in NEIGHBOUR_BACKENDS."""
+    name = "base"
+
+    def __init__(self, vectors: np.ndarray, paths: List[str], embeddings_dir: str, config: ConfigManager):
+        self.vectors = vectors; self.paths = paths; self.embeddings_dir = embeddings_dir; self.config = config
+        self.scales = row_scales(vectors) # None unless rows are int8
+
+    @abc.abstractmethod
+    def search(self, rows: np.ndarray, k: int, threshold: float) -> List[Neighbours]:
+        """Neighbours (excluding the row itself) for each matrix row in 'rows'."""
+
+class ExactBlockedBackend(NeighbourBackend):
+    """Exact cosine top-k through iter_similarity_triples; memory is bounded by 'semantic_block_size' tiles."""
+    name = "exact"
+
+    def search(self, rows: np.ndarray, k: int, threshold: float) -> List[Neighbours]:
+        tile_size = max(1, int(self.config.get_compute_setting("semantic_block_size", 1024)))
+        found: Dict[int, Neighbours] = {int(row): [] for row in rows}
+        for src, tgt, scores in iter_similarity_triples(self.vectors, threshold, tile_size, k, rows, self.scales):
+            for s, t, score in zip(src.tolist(), tgt.tolist(), scores.tolist()): found[s].append((t, score))
+        if not k: # Unlimited mode streams tile by tile, so order each row's hits here
+            for hits in found.values(): hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return [found[int(row)] for row in rows]
+
+class IVFBackend(NeighbourBackend):
+    """
+    Inverted-file ANN: rows are bucketed by their nearest k-means centroid and a query only scores
+    rows in its 'nprobe' closest buckets. Centroids and assignments are saved to 'index_filename';
+    on reload, changed or new rows are re-assigned and the centroids are retrained only when more
+    than 'semantic_ann_retrain_fraction' of the rows changed.
+    """
+    name = "ivf"
+
+    def __init__(self, vectors: np.ndarray, paths: List[str], embeddings_dir: str, config: ConfigManager,
+                 previous_rows: Optional[np.ndarray] = None, previous: Optional[Dict[str, np.ndarray]] = None,
+                 index_filename: str = ANN_INDEX_FILENAME):
+        super().__init__(vectors, paths, embeddings_dir, config)
+        self.index_filename = index_filename
+        self.nprobe = max(1, int(config.get_compute_setting("semantic_ann_nprobe", 8)))
+        retrain_fraction = float(config.get_compute_setting("semantic_ann_retrain_fraction", 0.25))
+        n_rows = len(paths)
+        nlist = int(config.get_compute_setting("semantic_ann_nlist", 0)) or max(1, int(4 * np.sqrt(n_rows)))
+        self.nlist = min(nlist, max(1, n_rows))
+        # previous_rows[i] is row i's position in the persisted index, or -1 if it is new/changed
+        changed_rows = np.flatnonzero(previous_rows < 0) if previous_rows is not None else None
+        if previous is not None and changed_rows is not None and changed_rows.size <= retrain_fraction * max(1, n_rows):
+            self.centroids = previous["centroids"]
+            self.assignments = np.where(previous_rows >= 0, previous["assignments"][np.maximum(previous_rows, 0)], 0).astype(np.int32)
+            if changed_rows.size: self.assignments[changed_rows] = self._assign(vectors[changed_rows])
+            self.updated = changed_rows.size > 0 or len(previous["paths"]) != n_rows
+            logger.info(f"IVF index updated incrementally: {changed_rows.size} of {n_rows} rows re-assigned.")
+        else:
+            self.centroids = self._train(vectors); self.assignments = self._assign(vectors); self.updated = True
+            logger.info(f"IVF index trained: {n_rows} rows, {self.centroids.shape[0]} lists.")
+        self.lists = [np.flatnonzero(self.assignments == c) for c in range(self.centroids.shape[0])]
+
+    def _train(self, vectors: np.ndarray, iterations: int = 10, seed: int = 0) -> np.ndarray:
+        """Spherical k-means on a sample of at most 64 rows per list."""
+        rng = np.random.default_rng(seed); n_rows = vectors.shape[0]
+        sample = dequantize_embeddings(vectors[rng.choice(n_rows, size=min(n_rows, 64 * self.nlist), replace=False)])
+        centroids = sample[rng.choice(sample.shape[0], size=self.nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids); np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1); sums[empty] = centroids[empty] # Keep empty lists where they were
+            centroids = _normalize_rows(sums)
+        return centroids
+
+    def _assign(self, vectors: np.ndarray, block_size: int = 4096) -> np.ndarray:
+        return np.concatenate([np.argmax(dequantize_embeddings(vectors[i:i + block_size]) @ self.centroids.T, axis=1) for i in range(0, vectors.shape[0], block_size)]).astype(np.int32) if vectors.shape[0] else np.zeros(0, dtype=np.int32)
+
+    def search(self, rows: np.ndarray, k: int, threshold: float) -> List[Neighbours]:
+        queries = dequantize_embeddings(self.vectors[rows]); nprobe = min(self.nprobe, self.centroids.shape[0])
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        results: List[Neighbours] = []
+        for query, row, probe in zip(queries, rows, probes):
+            candidates = np.concatenate([self.lists[c] for c in probe]); candidates = candidates[candidates != row]
+            found = _top_k_above((query @ dequantize_embeddings(self.vectors[candidates]).T)[None, :], k, threshold)[0]
+            results.append([(int(candidates[col]), score) for col, score in found])
+        return results
+
+    def save(self, mtimes: np.ndarray) -> None:
+        index_path = os.path.join(self.embeddings_dir, self.index_filename); tmp_path = index_path + ".tmp.npz"
+        try:
+            np.savez(tmp_path, paths=np.array(self.paths, dtype=str), mtimes=mtimes, vectors=self.vectors,
+                     centroids=self.centroids, assignments=self.assignments)
+            os.replace(tmp_path, index_path)
+        except Exception as e: logger.warning(f"Could not save IVF index to {index_path}: {e}")
+
+NEIGHBOUR_BACKENDS: Dict[str, Type[NeighbourBackend]] = {ExactBlockedBackend.name: ExactBlockedBackend, IVFBackend.name: IVFBackend}
+
+def register_neighbour_backend(backend_cls: Type[NeighbourBackend]) -> None:
+    """Makes a backend selectable through the 'semantic_backend' compute setting."""
+    NEIGHBOUR_BACKENDS[backend_cls.name] = backend_cls
+
+# --- Index facade ---
+
+class EmbeddingSpace:
+    """A contiguous block of index rows (offset .. offset + len(backend.paths)) of one kind ("code"/"doc") and model."""
+    __slots__ = ("kind", "model_id", "offset", "backend")
+
+    def __init__(self, kind: str, model_id: str, offset: int, backend: NeighbourBackend):
+        self.kind = kind; self.model_id = model_id; self.offset = offset; self.backend = backend
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}:{self.model_id or 'default'}"
+
+    def __len__(self) -> int:
+        return len(self.backend.paths)
+
+class SemanticNeighbourIndex:
+    """
+    Embedding matrices for all tracked files that have an embedding (one EmbeddingSpace per kind and model),
+    plus the configured backend for each. A source is scored against its own space through the backend and
+    against other allowed spaces with the exact kernel. Neighbours are computed block by block
+    (semantic_block_size sources at a time) on first request and kept, so a full project pass scores
+    each source exactly once.
+    """
+    def __init__(self, path_to_key_info: Dict[str, KeyInfo], project_root: str):
+        self.config = ConfigManager(); self.project_root = normalize_path(project_root)
+        embeddings_dir = self.config.get_path("embeddings_dir", "cline_utils/dependency_system/analysis/embeddings")
+        self.embeddings_dir = normalize_path(os.path.join(self.project_root, embeddings_dir))
+        # Minimum similarity per (source kind, target kind); None = that pair of spaces is never compared
+        self.policies: Dict[Tuple[str, str], Optional[float]] = {pair: self.config.get_semantic_policy(name) for pair, name in SEMANTIC_POLICIES.items()}
+        self.top_k = int(self.config.get_compute_setting("semantic_top_k", 0))
+        self.dtype = get_embedding_dtype(self.config)
+        self.block_size = max(1, int(self.config.get_compute_setting("semantic_block_size", 1024)))
+        backend_name = self.config.get_compute_setting("semantic_backend", ExactBlockedBackend.name)
+        if backend_name not in NEIGHBOUR_BACKENDS: logger.warning(f"Unknown semantic_backend '{backend_name}', using exact."); backend_name = ExactBlockedBackend.name
+        self.backend_name = backend_name
+
+        model_of_path = load_embedding_models(self.embeddings_dir); doc_dirs = get_doc_dirs(self.config, self.project_root)
+        model_ids = configured_model_ids(self.config) # Model in effect for files without a stored tag
+        paths_by_space: Dict[Tuple[str, str], List[str]] = {}
+        for norm_path in sorted(p for p, info in path_to_key_info.items() if not info.is_directory):
+            kind = "doc" if model_type_for_path(norm_path, doc_dirs) == "doc_model_name" else "code"
+            paths_by_space.setdefault((kind, embedding_model_id(norm_path, model_of_path, model_ids, doc_dirs)), []).append(norm_path)
+        self.paths: List[str] = []; self.spaces: List[EmbeddingSpace] = []
+        for (kind, model_id), candidate_paths in sorted(paths_by_space.items()):
+            if not any(self.policies[(kind, other)] is not None for other in SPACE_KINDS): continue # Never compared: skip loading
+            space = self._build_space(kind, model_id, candidate_paths)
+            if space is not None: self.spaces.append(space); self.paths.extend(space.backend.paths)
+        self.row_of_path = {p: i for i, p in enumerate(self.paths)}
+        self._space_of_row = np.repeat(np.arange(len(self.spaces)), [len(space) for space in self.spaces])
+        self._neighbours: Dict[int, Neighbours] = {}
+        self._lock = threading.Lock()
+        compared = sum(len(a) * len(b) for a, b, _ in self._space_pairs())
+        logger.info(f"Semantic neighbour index ({backend_name}) ready for {len(self.paths)} embedded files in {len(self.spaces)} space(s); "
+                    f"policies allow {compared} of {len(self.paths) ** 2} pairwise scores.")
+
+    def _space_pairs(self, source: Optional[EmbeddingSpace] = None) -> List[Tuple[EmbeddingSpace, EmbeddingSpace, float]]:
+        """(source space, target space, threshold) for every allowed comparison (optionally from one source space)."""
+        pairs = []
+        for a in ([source] if source is not None else self.spaces):
+            for b in self.spaces:
+                threshold = self.policies[(a.kind, b.kind)]
+                if a.model_id == b.model_id and threshold is not None: pairs.append((a, b, threshold))
+        return pairs
+
+    def _build_space(self, kind: str, model_id: str, candidate_paths: List[str]) -> Optional[EmbeddingSpace]:
+        """Loads one space's vectors and builds its backend; None when none of its files has an embedding."""
+        index_filename = get_ann_index_filename(kind, model_id)
+        previous = self._load_persisted_ann(index_filename) if self.backend_name == IVFBackend.name else None
+        paths, vectors, mtimes, previous_rows = self._load_vectors(candidate_paths, previous)
+        if not paths: return None
+        if self.backend_name == IVFBackend.name:
+            if previous is not None and previous["centroids"].shape[1:] != vectors.shape[1:]: previous = None # Model/dimension changed
+            backend = IVFBackend(vectors, paths, self.embeddings_dir, self.config, previous_rows, previous, index_filename)
+            if backend.updated: backend.save(mtimes)
+        else: backend = NEIGHBOUR_BACKENDS[self.backend_name](vectors, paths, self.embeddings_dir, self.config)
+        return EmbeddingSpace(kind, model_id, len(self.paths), backend)
+
+    def _load_persisted_ann(self, index_filename: str) -> Optional[Dict[str, np.ndarray]]:
+        index_path = os.path.join(self.embeddings_dir, index_filename)
+        if not os.path.exists(index_path): return None
+        try:
+            with np.load(index_path, allow_pickle=False) as data: return {name: data[name] for name in data.files}
+        except Exception as e: logger.warning(f"Ignoring unreadable IVF index {index_path}: {e}"); return None
+
+    def _load_vectors(self, candidate_paths: List[str], previous: Optional[Dict[str, np.ndarray]]):
+        """
+        Returns (paths, normalized vectors, npy mtimes, previous_rows) for the candidate files that have an
+        embedding. Vectors whose .npy mtime matches the persisted index are reused from it; previous_rows maps
+        each row to its persisted row or -1.
+        """
+        previous_row_of = {p: i for i, p in enumerate(previous["paths"].tolist())} if previous is not None else {}
+        paths: List[str] = []; mtimes: List[float] = []; rows: List[np.ndarray] = []; previous_rows: List[int] = []
+        for norm_path in candidate_paths:
+            npy_path = get_embedding_path(norm_path, self.embeddings_dir, self.project_root)
+            try: mtime = os.path.getmtime(npy_path) if npy_path else None
+            except OSError: mtime = None
+            if mtime is None: continue
+            prev_row = previous_row_of.get(norm_path, -1)
+            if prev_row >= 0 and previous["mtimes"][prev_row] == mtime:
+                vector = previous["vectors"][prev_row]
+                if vector.dtype != np.dtype(self.dtype): vector = quantize_embeddings(vector, self.dtype)
+            else:
+                prev_row = -1
+                try: vector = load_embedding(npy_path, self.dtype)
+                except Exception as e: logger.warning(f"Could not load embedding {npy_path}: {e}"); continue
+            if rows and vector.shape != rows[0].shape: logger.warning(f"Skipping {npy_path}: dimension {vector.shape[0]} differs from {rows[0].shape[0]}."); continue
+            paths.append(norm_path); mtimes.append(mtime); rows.append(vector); previous_rows.append(prev_row)
+        vectors = np.vstack(rows) if rows else np.zeros((0, 0), dtype=self.dtype)
+        return paths, vectors, np.array(mtimes, dtype=np.float64), np.array(previous_rows, dtype=np.int64)
+
+    def neighbours(self, norm_path: str) -> List[Tuple[str, float]]:
+        """(path, similarity) of files that pass the policy threshold of their space pair with 'norm_path', best first."""
+        row = self.row_of_path.get(norm_path)
+        if row is None: return []
+        with self._lock:
+            if row not in self._neighbours:
+                space = self.spaces[self._space_of_row[row]]; local_row = row - space.offset
+                block_start = (local_row // self.block_size) * self.block_size
+                block_rows = np.arange(block_start, min(block_start + self.block_size, len(space)))
+                found: Dict[int, Neighbours] = {int(r): [] for r in block_rows}
+                for _, target, threshold in self._space_pairs(space):
+                    if target is space:
+                        for block_row, hits in zip(block_rows, space.backend.search(block_rows, self.top_k, threshold)):
+                            found[int(block_row)].extend((space.offset + col, score) for col, score in hits)
+                        continue
+                    for src, tgt, scores in iter_similarity_triples(space.backend.vectors, threshold, self.block_size, self.top_k, block_rows,
+                                                                    space.backend.scales, target.backend.vectors, target.backend.scales):
+                        for s, t, score in zip(src.tolist(), tgt.tolist(), scores.tolist()): found[s].append((target.offset + t, score))
+                for block_row, hits in found.items():
+                    hits.sort(key=lambda hit: (-hit[1], hit[0]))
+                    self._neighbours[space.offset + block_row] = hits[:self.top_k] if self.top_k else hits
+            return [(self.paths[col], score) for col, score in self._neighbours[row]]
+
+    def iter_pairs(self, threshold: Optional[float] = None, top_k: Optional[int] = None,
+                   tile_size: Optional[int] = None) -> Iterator[Tuple[str, str, float]]:
+        """
+        Streams exact (source path, target path, similarity) triples for all embedded files,
+        for every space pair the policies allow (top_k applies per source and target space).
+
+        Args:
+            threshold: Minimum similarity (default: each space pair's policy threshold).
+            top_k: Max targets per source (default: semantic_top_k; 0 = unlimited).
+            tile_size: Tile size (default: semantic_block_size).
+        """
+        top_k = self.top_k if top_k is None else top_k
+        for source, target, policy_threshold in self._space_pairs():
+            same = source is target; src_backend, tgt_backend = source.backend, target.backend
+            for src, tgt, scores in iter_similarity_triples(src_backend.vectors, policy_threshold if threshold is None else threshold, tile_size or self.block_size, top_k,
+                                                            scales=src_backend.scales, targets=None if same else tgt_backend.vectors,
+                                                            target_scales=None if same else tgt_backend.scales):
+                for s, t, score in zip(src.tolist(), tgt.tolist(), scores.tolist()): yield src_backend.paths[s], tgt_backend.paths[t], score
+
+def _similarity_char(score: float, doc_threshold: float, code_threshold: float) -> str:
+    return 'S' if score >= code_threshold else 's' if score >= doc_threshold else ''
+
+def compare_quantized_suggestions(path_to_key_info: Dict[str, KeyInfo], project_root: str,
+                                  dtypes: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Re-scores the project's float32 embeddings in each quantised dtype and counts how many
+    semantic suggestion characters (S/s, with the configured thresholds and semantic_top_k) change.
+
+    Args:
+        path_to_key_info: Global map from normalized paths to KeyInfo objects.
+        project_root: Root directory of the project.
+        dtypes: Storage dtypes to compare against float32 (default: float16 and int8).
+    Returns:
+        {"files": N, "dimension": D, "reference_pairs": pairs with S/s in float32,
+         "modes": {dtype: {"changed", "S_to_s", "s_to_S", "lost", "gained", "max_abs_error", "bytes_per_vector"}}}
+        or {"error": message} when the stored embeddings are not float32 (re-generate with embedding_dtype float32).
+    """
+    config = ConfigManager(); project_root = normalize_path(project_root)
+    embeddings_dir = normalize_path(os.path.join(project_root, config.get_path("embeddings_dir", "cline_utils/dependency_system/analysis/embeddings")))
+    doc_threshold = float(config.get_threshold("doc_similarity")); code_threshold = float(config.get_threshold("code_similarity"))
+    top_k = int(config.get_compute_setting("semantic_top_k", 0)); tile_size = max(1, int(config.get_compute_setting("semantic_block_size", 1024)))
+    model_of_path = load_embedding_models(embeddings_dir); model_ids = configured_model_ids(config); doc_dirs = get_doc_dirs(config, project_root)
+    rows_by_model: Dict[str, List[np.ndarray]] = {}
+    for norm_path in sorted(p for p, info in path_to_key_info.items() if not info.is_directory):
+        npy_path = get_embedding_path(norm_path, embeddings_dir, project_root)
+        if not npy_path or not os.path.exists(npy_path): continue
+        try: stored = np.load(npy_path).reshape(-1)
+        except Exception as e: logger.warning(f"Could not load embedding {npy_path}: {e}"); continue
+        if stored.dtype != np.float32: return {"error": f"{npy_path} is stored as {stored.dtype}; float32 embeddings are needed as the reference (set compute.embedding_dtype to float32 and re-run analyze-project --force-embeddings)."}
+        rows = rows_by_model.setdefault(embedding_model_id(norm_path, model_of_path, model_ids, doc_dirs), [])
+        if rows and stored.shape != rows[0].shape: continue
+        rows.append(stored)
+    if not rows_by_model: return {"error": "No embeddings found. Run 'analyze-project' first."}
+    if len({rows[0].shape for rows in rows_by_model.values()}) > 1: return {"error": "Embeddings come from models with different dimensions; compare one model at a time."}
+    spans: List[Tuple[int, int]] = [] # Row range of each model space; pairs never cross spaces
+    for rows in rows_by_model.values(): start = spans[-1][1] if spans else 0; spans.append((start, start + len(rows)))
+    reference = quantize_embeddings(np.vstack([row for rows in rows_by_model.values() for row in rows]), "float32")
+
+    def score_pairs(vectors: np.ndarray) -> Dict[Tuple[int, int], float]:
+        pairs: Dict[Tuple[int, int], float] = {}
+        for start, end in spans:
+            space_vectors = vectors[start:end]
+            for src, tgt, scores in iter_similarity_triples(space_vectors, doc_threshold, tile_size, 0, scales=row_scales(space_vectors)):
+                pairs.update(zip(zip((src + start).tolist(), (tgt + start).tolist()), scores.tolist()))
+        return pairs
+
+    def suggestion_chars(pairs: Dict[Tuple[int, int], float]) -> Dict[Tuple[int, int], str]:
+        by_source: Dict[int, List[Tuple[int, float]]] = {}
+        for (src, tgt), score in pairs.items():
+            if score >= doc_threshold: by_source.setdefault(src, []).append((tgt, score))
+        chars: Dict[Tuple[int, int], str] = {}
+        for src, hits in by_source.items():
+            hits.sort(key=lambda hit: (-hit[1], hit[0]))
+            for tgt, score in (hits[:top_k] if top_k else hits): chars[(src, tgt)] = _similarity_char(score, doc_threshold, code_threshold)
+        return chars
+
+    reference_pairs = score_pairs(reference); reference_chars = suggestion_chars(reference_pairs)
+    report: Dict[str, Any] = {"files": reference.shape[0], "dimension": reference.shape[1], "reference_pairs": len(reference_chars), "modes": {}}
+    for dtype in dtypes or [d for d in EMBEDDING_DTYPES if d != "float32"]:
+        quantized = quantize_embeddings(reference, dtype); pairs = score_pairs(quantized); chars = suggestion_chars(pairs)
+        counts = {"changed": 0, "S_to_s": 0, "s_to_S": 0, "lost": 0, "gained": 0}
+        for pair in set(reference_chars) | set(chars):
+            before, after = reference_chars.get(pair, ''), chars.get(pair, '')
+            if before == after: continue
+            counts["changed"] += 1
+            counts["lost" if not after else "gained" if not before else "S_to_s" if before == 'S' else "s_to_S"] += 1
+        common = set(reference_pairs) & set(pairs)
+        counts["max_abs_error"] = max((abs(reference_pairs[p] - pairs[p]) for p in common), default=0.0)
+        counts["bytes_per_vector"] = int(quantized.itemsize * quantized.shape[1])
+        report["modes"][dtype] = counts
+    return report
+
+def verify_semantic_index(path_to_key_info: Dict[str, KeyInfo], project_root: str, tolerance: float = 1e-5) -> Dict[str, Any]:
+    """
+    Checks SemanticNeighbourIndex against brute-force cosine similarity: every embedded file is scored
+    against every other file with the same model, filtered by the policy threshold of the two spaces and
+    semantic_top_k, and the resulting S/s suggestion characters are compared with the index's neighbours.
+    With one model (all pairs compared), float32 storage and the exact backend both must give the same set
+    (the code/doc split only changes which thresholds apply); the ivf backend is approximate and may miss pairs.
+
+    Args:
+        path_to_key_info: Global map from normalized paths to KeyInfo objects.
+        project_root: Root directory of the project.
+        tolerance: Scores this close to a threshold are not counted as mismatches (float rounding).
+    Returns:
+        {"files": N, "pairs": brute-force S/s pairs, "mismatches": M,
+         "examples": up to 10 [source, target, expected char, index char]}
+    """
+    index = SemanticNeighbourIndex(path_to_key_info, project_root); config = index.config
+    code_threshold = float(config.get_threshold("code_similarity"))
+    model_of_path = load_embedding_models(index.embeddings_dir); model_ids = configured_model_ids(config); doc_dirs = get_doc_dirs(config, index.project_root)
+    paths: List[str] = []; rows: List[np.ndarray] = []
+    for norm_path in sorted(p for p, info in path_to_key_info.items() if not info.is_directory):
+        npy_path = get_embedding_path(norm_path, index.embeddings_dir, index.project_root)
+        if not npy_path or not os.path.exists(npy_path): continue
+        try: rows.append(load_embedding(npy_path)); paths.append(norm_path)
+        except Exception as e: logger.warning(f"Could not load embedding {npy_path}: {e}")
+    if not paths: return {"files": 0, "pairs": 0, "mismatches": 0, "examples": []}
+    kinds = ["doc" if model_type_for_path(p, doc_dirs) == "doc_model_name" else "code" for p in paths]
+    # With a single model in use every pair is compared, independently of how the index resolves model tags
+    single_model = len(set(model_ids.values()) | set(model_of_path.values())) == 1
+    models = ["" if single_model else embedding_model_id(p, model_of_path, model_ids, doc_dirs) for p in paths]
+    dimension = rows[0].shape[0]; vectors = _normalize_rows(np.vstack([row if row.shape[0] == dimension else np.zeros(dimension, dtype=np.float32) for row in rows]))
+    expected: Dict[Tuple[str, str], str] = {}; near_threshold: Set[Tuple[str, str]] = set()
+    for i, scores in enumerate(vectors @ vectors.T):
+        hits = []
+        for j, score in enumerate(scores.tolist()):
+            threshold = None if i == j or models[i] != models[j] else index.policies[(kinds[i], kinds[j])]
+            if threshold is None: continue
+            if abs(score - threshold) <= tolerance or abs(score - code_threshold) <= tolerance: near_threshold.add((paths[i], paths[j]))
+            if score >= threshold: hits.append((j, min(score, 1.0)))
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        for j, score in (hits[:index.top_k] if index.top_k else hits): expected[(paths[i], paths[j])] = 'S' if score >= code_threshold else 's'
+    found = {(source, target): 'S' if score >= code_threshold else 's' for source in paths for target, score in index.neighbours(source)}
+    examples: List[List[str]] = []; mismatches = 0
+    for pair in sorted(set(expected) | set(found)):
+        want = expected.get(pair, ''); got = found.get(pair, '')
+        if want == got or pair in near_threshold: continue
+        mismatches += 1
+        if len(examples) < 10: examples.append([pair[0], pair[1], want, got])
+    return {"files": len(paths), "pairs": len(expected), "mismatches": mismatches, "examples": examples}
+
+_index_lock = threading.Lock()
+_index_state: Dict[str, object] = {"source": None, "size": -1, "root": None, "index": None}
+
+def get_semantic_neighbour_index(path_to_key_info: Dict[str, KeyInfo], project_root: str) -> SemanticNeighbourIndex:
+    """Returns the shared index for this path_to_key_info map, building it on first use."""
+    norm_root = normalize_path(project_root)
+    with _index_lock:
+        state = _index_state
+        if state["index"] is None or state["source"] is not path_to_key_info or state["size"] != len(path_to_key_info) or state["root"] != norm_root:
+            state.update(source=path_to_key_info, size=len(path_to_key_info), root=norm_root, index=SemanticNeighbourIndex(path_to_key_info, norm_root))
+        return state["index"]
+
+def invalidate_semantic_neighbour_index() -> None:
+    """Drops the in-memory index (call after embeddings are regenerated)."""
+    with _index_lock: _index_state.update(source=None, size=-1, root=None, index=None)
+
+# --- End of similarity_index.py ---
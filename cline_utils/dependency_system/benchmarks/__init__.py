@@ -0,0 +1,4 @@
+"""
+Standalone benchmarks for the dependency system. Run individual modules with
+`python -m cline_utils.dependency_system.benchmarks.<module>`.
+"""
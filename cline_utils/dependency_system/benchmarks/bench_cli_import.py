@@ -0,0 +1,77 @@
+"""
+Import-time benchmark for the dependency_processor CLI.
+
+Runs `python -X importtime` in a fresh interpreter for the CLI module (and, for comparison,
+project_analyzer), prints the total import time and the slowest modules by cumulative time,
+and checks that no heavy ML module (torch, sentence_transformers, transformers) was imported.
+Also times a full lightweight command (`compress`) end to end, run in a temporary directory
+because the CLI writes its log files to the current directory.
+
+Usage:
+    python -m cline_utils.dependency_system.benchmarks.bench_cli_import [--top 15] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+CLI_MODULE = "cline_utils.dependency_system.dependency_processor"
+MODULES = [CLI_MODULE, "cline_utils.dependency_system.analysis.project_analyzer"]
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers")
+
+def _project_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+def _env() -> dict:
+    env = dict(os.environ); env["PYTHONPATH"] = os.pathsep.join(filter(None, [_project_root(), env.get("PYTHONPATH")]))
+    return env
+
+def measure_import(module: str) -> Tuple[int, List[Tuple[int, str]], List[str]]:
+    """
+    Imports 'module' in a fresh interpreter with -X importtime.
+
+    Returns:
+        (total cumulative microseconds, [(cumulative us, module)] sorted slowest first, heavy modules imported)
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, env=_env())
+    if proc.returncode != 0: raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+    entries: List[Tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line: continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|", 1).split("|")]
+        entries.append((int(cumulative_us), name))
+    total = next((us for us, name in entries if name == module), 0)
+    heavy = sorted({name for _, name in entries if name.split(".")[0] in HEAVY_MODULES})
+    return total, sorted(entries, reverse=True), heavy
+
+def time_command(args: List[str], runs: int) -> float:
+    """Median wall time in seconds of `python -m dependency_processor <args>`."""
+    samples = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-m", CLI_MODULE] + args, cwd=work_dir, capture_output=True, env=_env(), check=True)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark import time of the dependency_processor CLI.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list per import")
+    parser.add_argument("--runs", type=int, default=5, help="Runs of the end-to-end command timing")
+    args = parser.parse_args()
+    for module in MODULES:
+        total, entries, heavy = measure_import(module)
+        print(f"{module}: {total / 1000:.1f} ms cumulative import time")
+        for cumulative_us, name in entries[:args.top]: print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+        print(f"  heavy ML modules imported: {', '.join(heavy) if heavy else 'none'}")
+    print(f"'compress' command end to end (median of {args.runs}): {time_command(['compress', 'aaaa'], args.runs) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
+
+# --- End of bench_cli_import.py ---
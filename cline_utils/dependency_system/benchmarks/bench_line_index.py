@@ -0,0 +1,83 @@
+"""
+Benchmark for line-number lookup in the regex analyzers.
+
+Generates a ~5 MB minified JavaScript file and a ~2 MB Markdown file, runs the
+JS/Markdown analyzers (which use LineIndex), and compares the lookup cost on the
+same match offsets with the previous content[:pos].count('\\n') approach. The
+prefix-count baseline is quadratic, so it is timed on --baseline-limit offsets spread
+evenly over the file and extrapolated.
+
+Usage:
+    python -m cline_utils.dependency_system.benchmarks.bench_line_index [--js-mb 5] [--md-mb 2]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, Any, List
+
+from cline_utils.dependency_system.analysis.dependency_analyzer import (
+    LineIndex, _analyze_javascript_file, _analyze_markdown_file
+)
+
+def generate_minified_js(target_bytes: int, seed: int = 0) -> str:
+    """Builds a single-line bundle of functions, arrow functions and classes."""
+    rng = random.Random(seed); parts: List[str] = []; size = 0; i = 0
+    while size < target_bytes:
+        kind = rng.randrange(3)
+        if kind == 0: chunk = f"function f{i}(a,b){{return a+b*{i}}};"
+        elif kind == 1: chunk = f"const g{i}=(x)=>x*{i};"
+        else: chunk = f"class C{i}{{m(){{return {i}}}}};"
+        parts.append(chunk); size += len(chunk); i += 1
+    return "".join(parts)
+
+def generate_markdown(target_bytes: int, seed: int = 0) -> str:
+    """Builds a long document with headings, relative links and fenced code blocks."""
+    rng = random.Random(seed); parts: List[str] = []; size = 0; i = 0
+    while size < target_bytes:
+        chunk = f"## Section {i}\n\nSee [doc {i}](docs/page_{i}.md) and [other](../ref_{rng.randrange(1000)}.md).\n\n"
+        if i % 5 == 0: chunk += f"```python\nprint({i})\n```\n\n"
+        parts.append(chunk); size += len(chunk); i += 1
+    return "".join(parts)
+
+def _time(func: Callable[[], Any]) -> float:
+    start = time.perf_counter(); func(); return time.perf_counter() - start
+
+class _RecordingLineIndex(LineIndex):
+    """LineIndex that remembers every offset the analyzer looked up."""
+    __slots__ = ("offsets",)
+
+    def __init__(self, content: str):
+        super().__init__(content); self.offsets: List[int] = []
+
+    def line_of(self, offset: int) -> int:
+        self.offsets.append(offset); return super().line_of(offset)
+
+def _benchmark_content(label: str, content: str, analyzer: Callable[..., None], baseline_limit: int) -> None:
+    result: Dict[str, Any] = {}
+    analyze_seconds = _time(lambda: analyzer(f"<{label}>", content, result, LineIndex(content)))
+    recorder = _RecordingLineIndex(content); analyzer(f"<{label}>", content, {}, recorder); offsets = recorder.offsets
+    index = LineIndex(content)
+    index_seconds = _time(lambda: [index.line_of(pos) for pos in offsets])
+    sample = offsets[::max(1, len(offsets) // max(1, baseline_limit))][:baseline_limit]
+    baseline_seconds = _time(lambda: [content[:pos].count('\n') + 1 for pos in sample])
+    extrapolated = baseline_seconds * (len(offsets) / len(sample)) if sample else 0.0
+    mismatches = sum(1 for pos in sample if index.line_of(pos) != content[:pos].count('\n') + 1)
+    print(f"{label}: {len(content) / 1e6:.1f} MB, {len(offsets)} line lookups, {mismatches} mismatches vs baseline sample")
+    print(f"  analyzer total (LineIndex): {analyze_seconds * 1000:10.1f} ms")
+    print(f"  LineIndex build + lookups:  {index_seconds * 1000:10.1f} ms")
+    print(f"  prefix count, {len(sample)} lookups: {baseline_seconds * 1000:10.1f} ms (~{extrapolated:.1f} s extrapolated to all lookups)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark line-number lookup in the regex analyzers.")
+    parser.add_argument("--js-mb", type=float, default=5.0, help="Size of the generated minified JS file in MB")
+    parser.add_argument("--md-mb", type=float, default=2.0, help="Size of the generated Markdown file in MB")
+    parser.add_argument("--baseline-limit", type=int, default=2000, help="Lookups timed with the prefix-count baseline")
+    args = parser.parse_args()
+    _benchmark_content("minified.js", generate_minified_js(int(args.js_mb * 1_000_000)), _analyze_javascript_file, args.baseline_limit)
+    _benchmark_content("long.md", generate_markdown(int(args.md_mb * 1_000_000)), _analyze_markdown_file, args.baseline_limit)
+
+if __name__ == "__main__":
+    main()
+
+# --- End of bench_line_index.py ---
@@ -0,0 +1,223 @@
+"""
+End-to-end benchmark suite on a synthetic project (see synthetic_project.py).
+
+Generates a project in a temporary directory, then times each stage the way analyze-project
+runs it: generate_keys, analyze_file over every file, embedding generation (fake model, no
+download), suggest_dependencies, update_tracker for the mini/doc/main trackers, the main
+tracker aggregation alone, read_tracker_file / write_tracker_file on a synthetic tracker of
+--tracker-keys keys, and the RLE codec on that tracker's rows.
+After the embeddings are generated, the semantic neighbour index is also checked against
+brute-force cosine similarity (similarity_index.verify_semantic_index); with the default config
+the S/s suggestion sets must match. The check is stored under "checks" in the results.
+
+Every benchmark runs --warmup untimed rounds and then --repeat timed rounds; in-memory caches
+are cleared before each round, so the numbers are for a fresh process working on existing
+trackers and embeddings (the first analyze-project on a new project does extra one-off work).
+Results (min/median/mean seconds, items and items/sec per benchmark plus the parameters) are
+written as JSON; --compare prints the median ratio against an earlier results file.
+generate_keys rewrites the global key map stored next to key_manager.py, so the suite backs it
+up and restores it afterwards.
+
+Usage:
+    python -m cline_utils.dependency_system.benchmarks.bench_suite [--files 1000] [--repeat 3]
+        [--only generate_keys,rle_codec] [--output benchmark_results.json] [--compare old.json]
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from cline_utils.dependency_system.benchmarks.synthetic_project import (
+    DEFAULT_LANGUAGE_MIX, LANGUAGES, fake_embedding_model, generate_project, parse_language_mix, write_synthetic_tracker
+)
+
+SUITE_VERSION = 1
+BENCHMARKS = ("generate_keys", "analyze_file", "embeddings", "suggestion", "update_tracker.mini", "update_tracker.doc",
+              "update_tracker.main", "aggregation", "write_tracker_file", "read_tracker_file", "rle_codec")
+
+def _clear_caches() -> None:
+    from cline_utils.dependency_system.utils.cache_manager import clear_all_caches
+    clear_all_caches()
+
+def run_benchmark(func: Callable[[], Any], items: int, repeat: int, warmup: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Times func() 'repeat' times after 'warmup' untimed calls; setup() (untimed) and a cache clear run before each call.
+
+    Returns:
+        {"repeat", "items", "min_seconds", "median_seconds", "mean_seconds", "items_per_second"} (rate from the median).
+    """
+    samples = []
+    for round_index in range(warmup + repeat):
+        _clear_caches()
+        if setup: setup()
+        start = time.perf_counter(); func(); elapsed = time.perf_counter() - start
+        if round_index >= warmup: samples.append(elapsed)
+    median = statistics.median(samples)
+    return {"repeat": repeat, "items": items, "min_seconds": round(min(samples), 6), "median_seconds": round(median, 6),
+            "mean_seconds": round(statistics.mean(samples), 6), "items_per_second": round(items / median, 1) if median > 0 else None}
+
+@contextlib.contextmanager
+def preserve_global_key_maps() -> Iterator[None]:
+    """Restores the global key map files next to key_manager.py (written by generate_keys) on exit."""
+    from cline_utils.dependency_system.core import key_manager
+    directory = os.path.dirname(key_manager.get_global_key_map_path())
+    saved: Dict[str, Optional[bytes]] = {}
+    for filename in (key_manager.GLOBAL_KEY_MAP_FILENAME, key_manager.OLD_GLOBAL_KEY_MAP_FILENAME):
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            with open(path, 'rb') as f: saved[path] = f.read()
+        else: saved[path] = None
+    try: yield
+    finally:
+        for path, content in saved.items():
+            if content is None:
+                with contextlib.suppress(OSError): os.remove(path)
+            else:
+                with open(path, 'wb') as f: f.write(content)
+
+def run_suite(project_root: str, selected: List[str], repeat: int, warmup: int, tracker_keys: int, tracker_density: float,
+              checks: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """Runs the selected benchmarks inside 'project_root' (the current directory must already be it); correctness checks go into 'checks'."""
+    from cline_utils.dependency_system.analysis.dependency_analyzer import analyze_file
+    from cline_utils.dependency_system.analysis.dependency_suggester import suggest_dependencies
+    from cline_utils.dependency_system.analysis.embedding_manager import generate_embeddings
+    from cline_utils.dependency_system.analysis.similarity_index import verify_semantic_index
+    from cline_utils.dependency_system.analysis.project_analyzer import _collect_mini_tracker_jobs, _partition_suggestions_by_module, _update_mini_tracker_job
+    from cline_utils.dependency_system.core import key_manager
+    from cline_utils.dependency_system.core.dependency_grid import compress, decompress
+    from cline_utils.dependency_system.io import tracker_io
+    from cline_utils.dependency_system.io.update_main_tracker import aggregate_dependencies_contextual, main_key_filter
+    from cline_utils.dependency_system.utils.path_utils import normalize_path
+
+    results: Dict[str, Dict[str, Any]] = {}; roots = ["src", "docs"]
+    def record(name: str, func: Callable[[], Any], items: int, setup: Optional[Callable[[], None]] = None) -> None:
+        if name not in selected: return
+        results[name] = run_benchmark(func, items, repeat, warmup, setup)
+        print(f"{name:22s} {results[name]['median_seconds'] * 1000:10.1f} ms  {results[name]['items']:7d} items  "
+              f"{results[name]['items_per_second'] or 0:10.1f} items/s")
+
+    # Each stage's inputs come from running the previous stages once, as analyze_project does
+    path_to_key_info, new_keys = key_manager.generate_keys(roots)
+    record("generate_keys", lambda: key_manager.generate_keys(roots), len(path_to_key_info))
+    files = sorted(p for p, info in path_to_key_info.items() if not info.is_directory)
+    file_to_module = {info.norm_path: info.parent_path for info in path_to_key_info.values() if not info.is_directory and info.parent_path}
+
+    record("analyze_file", lambda: [analyze_file(path, force=True) for path in files], len(files))
+    analyses = {path: result for path, result in ((path, analyze_file(path)) for path in files) if result and "error" not in result and "skipped" not in result}
+
+    with fake_embedding_model():
+        generate_embeddings(roots, path_to_key_info, force=True, file_analyses=analyses)
+        record("embeddings", lambda: generate_embeddings(roots, path_to_key_info, force=True, file_analyses=analyses), len(files))
+    if checks is not None:
+        parity = checks["semantic_parity"] = verify_semantic_index(path_to_key_info, project_root)
+        print(f"semantic_parity        {parity['mismatches']} mismatches in {parity['pairs']} S/s pairs over {parity['files']} files")
+        for source, target, expected, found in parity["examples"]: print(f"  {source} -> {target}: brute force '{expected}', index '{found}'")
+
+    def suggest_all() -> Dict[str, List[Any]]:
+        suggestions: Dict[str, List[Any]] = {}
+        for path in analyses:
+            found = suggest_dependencies(path, path_to_key_info, project_root, analyses, threshold=0.65)
+            if found: suggestions.setdefault(path_to_key_info[path].key_string, []).extend(found)
+        return suggestions
+    record("suggestion", suggest_all, len(analyses))
+    suggestions = suggest_all()
+
+    mini_jobs = _collect_mini_tracker_jobs(path_to_key_info, {normalize_path(os.path.join(project_root, "src"))})
+    by_module = _partition_suggestions_by_module(suggestions, path_to_key_info, file_to_module, {p for p, _ in mini_jobs})
+    def update_minis() -> None:
+        for job in mini_jobs: _update_mini_tracker_job(job, project_root, path_to_key_info, by_module, file_to_module, new_keys, False)
+    def update(tracker_type: str, tracker_suggestions: Optional[Dict[str, List[Any]]]) -> Callable[[], None]:
+        return lambda: tracker_io.update_tracker(tracker_io.get_tracker_path(project_root, tracker_type=tracker_type), path_to_key_info,
+                                                 tracker_type=tracker_type, suggestions=tracker_suggestions, file_to_module=file_to_module,
+                                                 new_keys=new_keys, force_apply_suggestions=False, use_old_map_for_migration=False)
+    update_minis(); update("doc", suggestions)(); update("main", None)() # Create the trackers once; timed rounds update existing ones
+    record("update_tracker.mini", update_minis, len(mini_jobs))
+    record("update_tracker.doc", update("doc", suggestions), 1)
+    record("update_tracker.main", update("main", None), 1)
+    for tracker_type in ("doc", "main"):
+        name = f"update_tracker.{tracker_type}"
+        if name in results and not os.path.exists(tracker_io.get_tracker_path(project_root, tracker_type=tracker_type)):
+            # e.g. main: contextual module keys repeat in deep trees and the grid fails validation
+            results[name]["error"] = "tracker was not written (see log); timing covers the failed update only"
+            print(f"  warning: {name}: {results[name]['error']}")
+    modules = main_key_filter(project_root, path_to_key_info)
+    record("aggregation", lambda: aggregate_dependencies_contextual(project_root, path_to_key_info, modules, file_to_module), len(modules))
+
+    tracker_path = os.path.join(project_root, "synthetic_tracker.md")
+    key_defs, grid = write_synthetic_tracker(tracker_path, tracker_keys, tracker_density)
+    def remove_tracker() -> None:
+        for path in (tracker_path, tracker_io.get_sidecar_path(tracker_path)):
+            with contextlib.suppress(OSError): os.remove(path)
+    record("write_tracker_file", lambda: tracker_io.write_tracker_file(tracker_path, key_defs, grid, "synthetic", "synthetic"), tracker_keys, setup=remove_tracker)
+    write_synthetic_tracker(tracker_path, tracker_keys, tracker_density)
+    record("read_tracker_file", lambda: tracker_io.read_tracker_file(tracker_path), tracker_keys)
+    rows = list(grid.values()); decompress_row = getattr(decompress, "__wrapped__", decompress) # The codec itself, not its cache
+    record("rle_codec", lambda: [compress(decompress_row(row)) for row in rows], len(rows))
+    return results
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Prints the median time of each benchmark relative to a baseline results file (< 1.00 is faster)."""
+    print(f"\nCompared with {baseline.get('created', 'baseline')} (median ratio, < 1.00 is faster):")
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("median_seconds"): print(f"  {name:22s}   (no baseline)"); continue
+        note = "" if previous.get("items") == result["items"] else f"  (items {previous.get('items')} -> {result['items']})"
+        print(f"  {name:22s} {result['median_seconds'] / previous['median_seconds']:6.2f}x{note}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the dependency system on a synthetic project.")
+    parser.add_argument("--files", type=int, default=1000, help="Files in the synthetic project")
+    parser.add_argument("--depth", type=int, default=3, help="Directory depth below the code root")
+    parser.add_argument("--branching", type=int, default=4, help="Subdirectories per directory (at most 26)")
+    parser.add_argument("--languages", default=DEFAULT_LANGUAGE_MIX, help=f"Language mix (choices: {', '.join(LANGUAGES)})")
+    parser.add_argument("--import-density", type=float, default=3.0, help="Average imports/links per file")
+    parser.add_argument("--tracker-keys", type=int, default=1000, help="Keys in the synthetic tracker for read/write/RLE")
+    parser.add_argument("--tracker-density", type=float, default=0.05, help="Share of dependency cells in the synthetic tracker")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the project and tracker")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed rounds per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds per benchmark")
+    parser.add_argument("--only", help=f"Comma-separated benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--work-dir", help="Generate the project here and keep it (default: a temporary directory)")
+    args = parser.parse_args()
+    selected = [name.strip() for name in args.only.split(",")] if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown: parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+    output_path = os.path.abspath(args.output); baseline_path = os.path.abspath(args.compare) if args.compare else None
+    params = {k: getattr(args, k) for k in ("files", "depth", "branching", "languages", "import_density", "tracker_keys", "tracker_density", "seed", "repeat", "warmup")}
+
+    work_dir = os.path.abspath(args.work_dir) if args.work_dir else tempfile.mkdtemp(prefix="cline-bench-")
+    original_cwd = os.getcwd()
+    try:
+        start = time.perf_counter()
+        project = generate_project(work_dir, args.files, args.depth, args.branching, parse_language_mix(args.languages), args.import_density, seed=args.seed)
+        print(f"Generated {len(project.files)} files in {project.directories} directories ({time.perf_counter() - start:.1f} s) under {project.root}")
+        os.chdir(project.root) # Project root, config and tracker paths all resolve from the CWD
+        with preserve_global_key_maps():
+            checks: Dict[str, Any] = {}
+            results = run_suite(project.root, selected, args.repeat, args.warmup, args.tracker_keys, args.tracker_density, checks)
+    finally:
+        os.chdir(original_cwd)
+        if not args.work_dir: shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {"suite_version": SUITE_VERSION, "created": datetime.datetime.now().isoformat(timespec="seconds"),
+              "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+              "params": params, "results": results, "checks": checks}
+    with open(output_path, 'w', encoding='utf-8') as f: json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f: compare_results(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
+
+# --- End of bench_suite.py ---
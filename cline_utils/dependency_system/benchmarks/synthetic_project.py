@@ -0,0 +1,248 @@
+"""
+Synthetic project generator for the benchmark suite.
+
+Builds a reproducible project tree (same seed -> same files) with a configurable number of
+files, directory depth and branching, language mix and import density: Python files import
+other modules by dotted name, JS files import each other by relative path, HTML pages load
+scripts and stylesheets, CSS files @import each other and Markdown docs link to code and docs,
+so analysis and suggestion find real, resolvable dependencies. Code goes under 'src' and docs
+under 'docs', registered in a generated .clinerules.
+
+Also provides synthetic trackers of a given key count (write_synthetic_tracker) and a fake
+embedding model (fake_embedding_model) so embedding generation and semantic suggestion run
+without torch, sentence-transformers or a model download.
+
+Usage (generate a tree to run the CLI against, e.g. analyze-project --profile-out):
+    python -m cline_utils.dependency_system.benchmarks.synthetic_project OUT_DIR [--files 2000] [--depth 3]
+"""
+
+import argparse
+import contextlib
+import os
+import posixpath
+import random
+import re
+import zlib
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+LANGUAGES = {"py": ".py", "js": ".js", "md": ".md", "html": ".html", "css": ".css"}
+DEFAULT_LANGUAGE_MIX = "py=0.6,js=0.2,md=0.2"
+# Which languages a file of each language imports/links to
+IMPORT_TARGETS = {"py": ("py",), "js": ("js",), "md": ("md", "py", "js"), "html": ("js", "css"), "css": ("css",)}
+_WORDS = ("alpha", "batch", "cache", "delta", "event", "fetch", "graph", "index", "join", "key", "layer", "merge",
+          "node", "order", "parse", "query", "route", "store", "token", "update", "value", "worker", "yield", "zone")
+_DEPENDENCY_CHARS = "<>xdsS"
+
+class SyntheticFile(NamedTuple):
+    path: str # Relative to the project root, forward slashes
+    language: str
+
+class SyntheticProject(NamedTuple):
+    root: str
+    code_root: str # Relative code root ('src')
+    doc_root: str # Relative doc root ('docs')
+    files: List[SyntheticFile]
+    directories: int
+
+def parse_language_mix(spec: str) -> Dict[str, float]:
+    """Parses 'py=0.6,js=0.2,md=0.2' into normalized weights."""
+    mix: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        language, _, weight = part.partition("=")
+        if language not in LANGUAGES: raise ValueError(f"Unknown language '{language}' (choose from {', '.join(LANGUAGES)})")
+        mix[language] = float(weight or 1)
+    total = sum(mix.values())
+    if total <= 0: raise ValueError(f"Language mix '{spec}' has no positive weight")
+    return {language: weight / total for language, weight in mix.items()}
+
+def _directory_tree(base: str, depth: int, branching: int) -> List[str]:
+    """'base' plus every directory of a tree with the given depth and branching factor."""
+    directories = [base]; level = [base]
+    for tier in range(depth):
+        level = [f"{parent}/d{tier}_{i}" for parent in level for i in range(branching)]
+        directories.extend(level)
+    return directories
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(count))
+
+def _python_source(rng: random.Random, name: str, imports: List[str], definitions: int) -> str:
+    lines = [f'"""Synthetic module {name}: {_words(rng, 8)}."""', ""] + [f"import {module}" for module in imports] + [""]
+    for i in range(definitions):
+        if i % 3 == 2:
+            lines += [f"class {name.title()}Part{i}:", f'    """{_words(rng, 6)}."""', "    def run(self, value):",
+                      f"        return value * {i} # {_words(rng, 4)}", ""]
+        else:
+            lines += [f"def {name}_{rng.choice(_WORDS)}_{i}(value):", f'    """{_words(rng, 6)}."""',
+                      f"    return [value + {i} for _ in range({rng.randrange(1, 9)})] # {_words(rng, 4)}", ""]
+    return "\n".join(lines)
+
+def _javascript_source(rng: random.Random, name: str, imports: List[str], definitions: int) -> str:
+    lines = [f"// Synthetic module {name}: {_words(rng, 8)}"]
+    lines += [f"import {{ helper{i} }} from '{target}';" for i, target in enumerate(imports)] + [""]
+    for i in range(definitions):
+        if i % 2: lines += [f"export const {name}_{rng.choice(_WORDS)}_{i} = (value) => value * {i}; // {_words(rng, 4)}"]
+        else: lines += [f"export function {name}_{rng.choice(_WORDS)}_{i}(value) {{", f"  return value + {i}; // {_words(rng, 4)}", "}"]
+    return "\n".join(lines) + "\n"
+
+def _markdown_source(rng: random.Random, name: str, links: List[str], definitions: int) -> str:
+    lines = [f"# {name}", "", _words(rng, 20), ""]
+    for i in range(definitions):
+        lines += [f"## Section {i}", "", _words(rng, 15), ""]
+        if i % 3 == 0: lines += ["```python", f"print({i})", "```", ""]
+    lines += [f"See [{posixpath.basename(link)}]({link}) for {_words(rng, 3)}." for link in links]
+    return "\n".join(lines) + "\n"
+
+def _html_source(rng: random.Random, name: str, links: List[str], definitions: int) -> str:
+    head = [f'<link rel="stylesheet" href="{link}">' if link.endswith(".css") else f'<script src="{link}"></script>' for link in links]
+    body = [f"<p>{_words(rng, 12)}</p>" for _ in range(definitions)]
+    return "\n".join(["<!DOCTYPE html>", f"<html><head><title>{name}</title>"] + head + ["</head><body>"] + body + ["</body></html>"]) + "\n"
+
+def _css_source(rng: random.Random, name: str, imports: List[str], definitions: int) -> str:
+    lines = [f'@import url("{target}");' for target in imports]
+    lines += [f".{name}-{rng.choice(_WORDS)}-{i} {{ margin: {i}px; padding: {rng.randrange(9)}px; }}" for i in range(definitions)]
+    return "\n".join(lines) + "\n"
+
+def _import_count(rng: random.Random, density: float) -> int:
+    """'density' imports per file on average: the integer part always, the fraction with that probability."""
+    whole = int(density)
+    return whole + (1 if rng.random() < density - whole else 0)
+
+def generate_project(root: str, files: int = 1000, depth: int = 3, branching: int = 4,
+                     language_mix: Optional[Dict[str, float]] = None, import_density: float = 3.0,
+                     definitions: int = 6, seed: int = 0) -> SyntheticProject:
+    """
+    Writes a synthetic project under 'root' (created if missing; existing files are overwritten).
+
+    Args:
+        root: Project directory.
+        files: Total number of files (code and docs).
+        depth: Directory levels below the code root (docs use at most 2).
+        branching: Subdirectories per directory.
+        language_mix: Language -> weight (see parse_language_mix); default DEFAULT_LANGUAGE_MIX.
+        import_density: Average imports/links per file.
+        definitions: Functions/classes (or sections) per file.
+        seed: Random seed; the same arguments always produce the same tree.
+    Returns:
+        The SyntheticProject description.
+    """
+    rng = random.Random(seed); mix = language_mix or parse_language_mix(DEFAULT_LANGUAGE_MIX)
+    code_dirs = _directory_tree("src", depth, branching); doc_dirs = _directory_tree("docs", min(depth, 2), branching)
+    languages = rng.choices(list(mix), weights=list(mix.values()), k=files)
+    project_files: List[SyntheticFile] = []
+    for i, language in enumerate(languages):
+        directory = rng.choice(doc_dirs if language == "md" else code_dirs)
+        project_files.append(SyntheticFile(f"{directory}/{language}_{i}{LANGUAGES[language]}", language))
+    by_language: Dict[str, List[SyntheticFile]] = {}
+    for project_file in project_files: by_language.setdefault(project_file.language, []).append(project_file)
+
+    for project_file in project_files:
+        candidates = [f for language in IMPORT_TARGETS[project_file.language] for f in by_language.get(language, []) if f is not project_file]
+        targets = rng.sample(candidates, min(len(candidates), _import_count(rng, import_density)))
+        name = posixpath.splitext(posixpath.basename(project_file.path))[0]
+        source_dir = posixpath.dirname(project_file.path)
+        if project_file.language == "py":
+            # Dotted names relative to the code root (resolved through its source roots)
+            imports = [posixpath.splitext(t.path)[0][len("src/"):].replace("/", ".") for t in targets if t.language == "py"]
+            content = _python_source(rng, name, imports, definitions)
+        else:
+            relative = [posixpath.relpath(t.path, source_dir) for t in targets]
+            relative = [r if r.startswith(".") else f"./{r}" for r in relative]
+            builder = {"js": _javascript_source, "md": _markdown_source, "html": _html_source, "css": _css_source}[project_file.language]
+            content = builder(rng, name, relative, definitions)
+        abs_path = os.path.join(root, *project_file.path.split("/"))
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        with open(abs_path, 'w', encoding='utf-8', newline='\n') as f: f.write(content)
+
+    with open(os.path.join(root, ".clinerules"), 'w', encoding='utf-8') as f:
+        f.write("[CODE_ROOT_DIRECTORIES]\n- src\n\n[DOC_DIRECTORIES]\n- docs\n")
+    return SyntheticProject(os.path.abspath(root), "src", "docs", project_files, len(code_dirs) + len(doc_dirs))
+
+def synthetic_keys(count: int) -> List[str]:
+    """'count' distinct valid key strings spread over tiers and directory letters (e.g. '1A1', '1B7', '2A3')."""
+    keys = []
+    for i in range(count):
+        tier, rest = divmod(i, 26 * 100); letter, number = divmod(rest, 100)
+        keys.append(f"{tier + 1}{chr(ord('A') + letter)}{number + 1}")
+    return keys
+
+def synthetic_grid(keys: List[str], density: float = 0.05, seed: int = 0) -> Dict[str, str]:
+    """Uncompressed rows: 'o' on the diagonal, 'density' of the other cells a dependency char, the rest 'p'."""
+    rng = random.Random(seed); size = len(keys); grid = {}
+    for row, key in enumerate(keys):
+        cells = ["p"] * size; cells[row] = "o"
+        for column in rng.sample(range(size), min(size, int(size * density))):
+            if column != row: cells[column] = rng.choice(_DEPENDENCY_CHARS)
+        grid[key] = "".join(cells)
+    return grid
+
+def write_synthetic_tracker(tracker_path: str, key_count: int, density: float = 0.05, seed: int = 0) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Writes a tracker with 'key_count' keys through tracker_io.write_tracker_file.
+
+    Returns:
+        (key definitions, compressed grid) as written.
+    """
+    from cline_utils.dependency_system.core.dependency_grid import compress
+    from cline_utils.dependency_system.io.tracker_io import write_tracker_file
+    keys = synthetic_keys(key_count)
+    key_defs = {key: f"/synthetic/{key[:2]}/file_{i}.py" for i, key in enumerate(keys)}
+    grid = {key: compress(row) for key, row in synthetic_grid(keys, density, seed).items()}
+    if not write_tracker_file(tracker_path, key_defs, grid, "synthetic", "synthetic"): raise RuntimeError(f"Writing {tracker_path} failed")
+    return key_defs, grid
+
+class _FakeTokenizer:
+    """Word/punctuation tokenizer with character offsets (what chunking needs from a fast tokenizer)."""
+    _pattern = re.compile(r"\w+|[^\w\s]")
+
+    def __call__(self, text: str, **kwargs) -> Dict[str, List[Tuple[int, int]]]:
+        return {"offset_mapping": [match.span() for match in self._pattern.finditer(text)]}
+
+class FakeEmbeddingModel:
+    """
+    Deterministic stand-in for a SentenceTransformer: hashed bag-of-words vectors, L2-normalized.
+    Texts sharing words get similar vectors, so semantic suggestion still finds neighbours.
+    """
+    def __init__(self, dimension: int = 384, max_seq_length: int = 256):
+        self.dimension = dimension; self.max_seq_length = max_seq_length; self.tokenizer = _FakeTokenizer()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                digest = zlib.crc32(word.encode("utf-8"))
+                vectors[row, digest % self.dimension] += 1.0 if digest & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True); norms[norms == 0] = 1.0
+        return vectors / norms
+
+@contextlib.contextmanager
+def fake_embedding_model(dimension: int = 384) -> Iterator[FakeEmbeddingModel]:
+    """Makes embedding_manager load a FakeEmbeddingModel (for both model types) inside the block."""
+    from cline_utils.dependency_system.analysis import embedding_manager
+    model = FakeEmbeddingModel(dimension); original = embedding_manager._load_model
+    embedding_manager._load_model = lambda model_type="code_model_name": model
+    try: yield model
+    finally: embedding_manager._load_model = original
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic project tree for benchmarking.")
+    parser.add_argument("output_dir", help="Directory to create the project in")
+    parser.add_argument("--files", type=int, default=1000, help="Number of files")
+    parser.add_argument("--depth", type=int, default=3, help="Directory depth below the code root")
+    parser.add_argument("--branching", type=int, default=4, help="Subdirectories per directory")
+    parser.add_argument("--languages", default=DEFAULT_LANGUAGE_MIX, help=f"Language mix, e.g. '{DEFAULT_LANGUAGE_MIX}' (choices: {', '.join(LANGUAGES)})")
+    parser.add_argument("--import-density", type=float, default=3.0, help="Average imports/links per file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    project = generate_project(args.output_dir, args.files, args.depth, args.branching, parse_language_mix(args.languages), args.import_density, seed=args.seed)
+    print(f"Generated {len(project.files)} files in {project.directories} directories under {project.root}")
+
+if __name__ == "__main__":
+    main()
+
+# --- End of synthetic_project.py ---
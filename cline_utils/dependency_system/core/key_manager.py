@@ -394,6 +394,10 @@ def generate_keys(root_paths: List[str], excluded_dirs: Optional[Set[str]] = Non
     unique_new_keys = list(dict.fromkeys(newly_generated_keys).keys())
     return path_to_key_info, unique_new_keys
 
+def get_global_key_map_path() -> str:
+    """Returns the normalized path of the persisted global key map (stored alongside key_manager.py)."""
+    return normalize_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), GLOBAL_KEY_MAP_FILENAME))
+
 def load_global_key_map() -> Optional[Dict[str, KeyInfo]]:
     """
     Loads the persisted global path_to_key_info map from the JSON file
@@ -404,8 +408,7 @@ def load_global_key_map() -> Optional[Dict[str, KeyInfo]]:
         or None if the file doesn't exist or fails to load/parse.
     """
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        map_path = normalize_path(os.path.join(script_dir, GLOBAL_KEY_MAP_FILENAME))
+        map_path = get_global_key_map_path()
 
         if not os.path.exists(map_path):
             logger.error(f"Global key map file not found at {map_path}. Run project analysis ('analyze-project') first.")
@@ -0,0 +1,185 @@
+# daemon.py
+
+"""
+Long-running 'serve' mode for the dependency processor CLI.
+
+The daemon listens on a local Unix socket and runs forwarded CLI commands in-process, so the
+state a normal invocation rebuilds every time stays resident between commands:
+the parsed global key map, the tracker/analysis caches, the module and semantic neighbour indexes
+(embedding matrix) and, once loaded, the SentenceTransformer model.
+Freshness comes from mtime checks before each command: the caches are already keyed on file
+mtimes, and a changed key map, config or embeddings metadata drops the resident map and indexes.
+
+Protocol: one newline-terminated JSON request per connection, answered by one JSON response.
+  request:  {"argv": [...], "cwd": "..."} | {"control": "ping" | "shutdown"}
+  response: {"exit_code": int, "stdout": str, "stderr": str, "elapsed_ms": float}
+"""
+
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import socket
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cline_utils.dependency_system.core.key_manager import get_global_key_map_path
+from cline_utils.dependency_system.utils.config_manager import ConfigManager
+from cline_utils.dependency_system.utils.path_utils import normalize_path
+
+import logging
+logger = logging.getLogger(__name__)
+
+SOCKET_ENV_VAR = "CLINE_DEPENDENCY_SOCKET"
+# Commands the thin client sends to a running daemon; everything else always runs locally
+FORWARDED_COMMANDS = {"show-dependencies", "show-keys", "add-dependency", "remove-key", "analyze-project",
+                      "visualize-dependencies", "similarity-pairs", "cache-stats"}
+_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+def get_socket_path(project_root: str) -> str:
+    """Socket path for a project: $CLINE_DEPENDENCY_SOCKET, else a per-project file in the temp dir."""
+    if os.environ.get(SOCKET_ENV_VAR): return os.environ[SOCKET_ENV_VAR]
+    digest = hashlib.sha1(normalize_path(project_root).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"cline-dependency-{digest}.sock") # Short: AF_UNIX paths are limited to ~100 bytes
+
+def _send_message(conn: socket.socket, payload: Dict[str, Any]) -> None:
+    conn.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+
+def _recv_message(conn: socket.socket) -> Optional[Dict[str, Any]]:
+    buffer = bytearray()
+    while not buffer.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk: break
+        buffer.extend(chunk)
+        if len(buffer) > _MAX_MESSAGE_BYTES: raise ValueError("Message too large")
+    return json.loads(buffer.decode("utf-8")) if buffer.strip() else None
+
+def _request(socket_path: str, payload: Dict[str, Any], timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+    """Sends one request; returns None when no daemon is listening on socket_path."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path): return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        try: conn.connect(socket_path)
+        except OSError: return None # Stale socket file
+        _send_message(conn, payload)
+        return _recv_message(conn)
+
+def forward_to_daemon(argv: List[str], socket_path: str, timeout: Optional[float] = None) -> Optional[Tuple[int, str, str]]:
+    """
+    Runs a CLI command in the daemon listening on socket_path.
+
+    Args:
+        argv: Command-line arguments (without the program name).
+        socket_path: The daemon's socket.
+        timeout: Seconds to wait for the response (None waits indefinitely, e.g. for analyze-project).
+    Returns:
+        (exit code, stdout, stderr), or None if no daemon is running (the caller runs the command locally).
+    """
+    try: response = _request(socket_path, {"argv": argv, "cwd": os.getcwd()}, timeout)
+    except (OSError, ValueError) as e: logger.warning(f"Daemon request failed ({e}); running locally."); return None
+    if response is None: return None
+    return int(response.get("exit_code", 1)), response.get("stdout", ""), response.get("stderr", "")
+
+def stop_daemon(socket_path: str) -> bool:
+    """Asks the daemon on socket_path to shut down. Returns False if none was running."""
+    try: return _request(socket_path, {"control": "shutdown"}, timeout=10) is not None
+    except (OSError, ValueError): return False
+
+class DependencyDaemon:
+    """
+    Serves forwarded CLI commands one at a time (handlers share module-level state, so requests
+    are serialized).
+
+    Args:
+        socket_path: Unix socket to listen on.
+        project_root: Project whose key map/config/embeddings are watched.
+        dispatch: Parses and runs an argv list, returning its exit code.
+        warm: Loads resident state (key map, trackers, indexes, model) at startup.
+        drop_state: Forgets resident state after a watched file changed.
+    """
+    def __init__(self, socket_path: str, project_root: str, dispatch: Callable[[List[str]], int],
+                 warm: Optional[Callable[[], None]] = None, drop_state: Optional[Callable[[], None]] = None):
+        self.socket_path = socket_path; self.project_root = normalize_path(project_root)
+        self.dispatch = dispatch; self.warm = warm; self.drop_state = drop_state
+        self._watched_mtimes: Dict[str, Optional[float]] = {}
+        self._running = False
+
+    def _watched_files(self) -> List[str]:
+        """Files whose change invalidates resident state: key map, config, embeddings metadata."""
+        config = ConfigManager()
+        embeddings_dir = normalize_path(os.path.join(self.project_root, config.get_path("embeddings_dir", "cline_utils/dependency_system/analysis/embeddings")))
+        return [get_global_key_map_path(), config.config_path] + sorted(glob.glob(os.path.join(embeddings_dir, "*", "metadata.json")))
+
+    def refresh(self) -> bool:
+        """Drops resident state if any watched file changed since the last check. Returns True if it did."""
+        current: Dict[str, Optional[float]] = {}
+        for path in self._watched_files():
+            try: current[path] = os.path.getmtime(path)
+            except OSError: current[path] = None
+        changed = bool(self._watched_mtimes) and current != self._watched_mtimes
+        self._watched_mtimes = current
+        if changed:
+            logger.info("Key map, config or embeddings changed; dropping resident state.")
+            from cline_utils.dependency_system.analysis.similarity_index import invalidate_semantic_neighbour_index
+            invalidate_semantic_neighbour_index()
+            if self.drop_state: self.drop_state()
+        return changed
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs one forwarded command in the client's working directory, capturing its output."""
+        start = time.perf_counter(); stdout, stderr = io.StringIO(), io.StringIO(); exit_code = 1
+        original_cwd = os.getcwd()
+        try:
+            os.chdir(request.get("cwd") or original_cwd)
+            self.refresh()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try: exit_code = self.dispatch(list(request.get("argv") or []))
+                except SystemExit as e: exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            logger.exception(f"Daemon command {request.get('argv')} failed: {e}"); stderr.write(f"Error: {e}\n")
+        finally:
+            os.chdir(original_cwd)
+            self.refresh() # Files the command rewrote itself (e.g. analyze-project's key map) also invalidate resident state
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Served {request.get('argv')} -> {exit_code} in {elapsed_ms:.1f} ms")
+        return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "elapsed_ms": elapsed_ms}
+
+    def serve_forever(self) -> int:
+        """Binds the socket and serves until a shutdown request or Ctrl+C. Returns an exit code."""
+        if not hasattr(socket, "AF_UNIX"): print("Error: 'serve' needs Unix domain sockets, which this platform lacks."); return 1
+        if os.path.exists(self.socket_path):
+            if _request(self.socket_path, {"control": "ping"}, timeout=2) is not None:
+                print(f"Error: A daemon is already listening on {self.socket_path}"); return 1
+            os.remove(self.socket_path) # Left behind by a daemon that did not shut down cleanly
+        if self.warm: self.warm()
+        self.refresh()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            old_umask = os.umask(0o177) # Create the socket as 0o600: the temp dir is shared, and forwarded commands run as this user
+            try: server.bind(self.socket_path)
+            finally: os.umask(old_umask)
+            os.chmod(self.socket_path, 0o600); server.listen(8)
+            print(f"Serving dependency commands on {self.socket_path} (stop with 'serve --stop' or Ctrl+C)", flush=True)
+            self._running = True
+            while self._running:
+                conn, _ = server.accept()
+                with conn:
+                    try:
+                        request = _recv_message(conn)
+                        if request is None: continue
+                        control = request.get("control")
+                        if control == "shutdown": self._running = False; _send_message(conn, {"exit_code": 0, "stdout": "", "stderr": ""})
+                        elif control == "ping": _send_message(conn, {"exit_code": 0, "stdout": "pong", "stderr": ""})
+                        else: _send_message(conn, self.handle_request(request))
+                    except (OSError, ValueError) as e: logger.warning(f"Dropped daemon connection: {e}")
+            return 0
+        except KeyboardInterrupt: return 0
+        finally:
+            server.close()
+            with contextlib.suppress(OSError): os.remove(self.socket_path)
+            logger.info("Daemon stopped.")
+
+# --- End of daemon.py ---
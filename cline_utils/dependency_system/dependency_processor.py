@@ -15,7 +15,6 @@ import re
 import glob
 from typing import Dict, List, Tuple, Any, Optional, Set
 
-from cline_utils.dependency_system.analysis.project_analyzer import analyze_project
 from cline_utils.dependency_system.core.dependency_grid import PLACEHOLDER_CHAR, compress, decompress, get_char_at, set_char_at, add_dependency_to_grid, get_dependencies_from_grid
 # Renamed function import
 from cline_utils.dependency_system.io.tracker_io import remove_key_from_tracker, merge_trackers, read_tracker_file, write_tracker_file, export_tracker, update_tracker
@@ -25,7 +24,7 @@ from cline_utils.dependency_system.utils.config_manager import ConfigManager
 from cline_utils.dependency_system.utils.cache_manager import clear_all_caches, file_modified, invalidate_dependent_entries # Added invalidate
 from cline_utils.dependency_system.analysis.dependency_analyzer import analyze_file
 # Added for show-dependencies and other utilities
-from cline_utils.dependency_system.core.key_manager import generate_keys, KeyInfo, KeyGenerationError, validate_key, sort_key_strings_hierarchically, load_global_key_map
+from cline_utils.dependency_system.core.key_manager import generate_keys, KeyInfo, KeyGenerationError, validate_key, sort_key_strings_hierarchically, load_global_key_map, get_global_key_map_path
 
 
 # Configure logging (moved to main block)
@@ -36,9 +35,17 @@ KEY_DEFINITIONS_START_MARKER = "---KEY_DEFINITIONS_START---"
 KEY_DEFINITIONS_END_MARKER = "---KEY_DEFINITIONS_END---"
 
 
+# Enabled by the serve daemon: the parsed key map is reused until global_key_map.json changes
+_resident_key_map: Dict[str, Any] = {"enabled": False, "mtime": None, "map": None}
+
 # <<< NEW UTILITY FUNCTION: Load Global Map >>>
 def _load_global_map_or_exit() -> Dict[str, KeyInfo]:
     """Loads the global key map, exiting if it fails."""
+    map_mtime = None
+    if _resident_key_map["enabled"]:
+        try: map_mtime = os.path.getmtime(get_global_key_map_path())
+        except OSError: map_mtime = None
+        if map_mtime is not None and _resident_key_map["map"] is not None and map_mtime == _resident_key_map["mtime"]: return _resident_key_map["map"]
     logger.info("Loading global key map...")
     path_to_key_info = load_global_key_map()
     if path_to_key_info is None:
@@ -47,6 +54,7 @@ def _load_global_map_or_exit() -> Dict[str, KeyInfo]:
         logger.critical("Global key map missing or invalid. Exiting.") # Use critical for exit condition
         sys.exit(1) # Exit the script
     logger.info("Global key map loaded successfully.")
+    if _resident_key_map["enabled"]: _resident_key_map.update(mtime=map_mtime, map=path_to_key_info)
     return path_to_key_info
 
 # <<< NEW UTILITY FUNCTION: Find Trackers >>>
@@ -216,13 +224,21 @@ def command_handler_analyze_project(args):
         if not args.project_root: args.project_root = "."; logger.info(f"Defaulting project root to CWD: {os.path.abspath(args.project_root)}")
         abs_project_root = normalize_path(os.path.abspath(args.project_root))
         if not os.path.isdir(abs_project_root): print(f"Error: Project directory not found: {abs_project_root}"); return 1
+        # Resolved before the chdir below, like any other path given relative to where the command was run
+        profile_out = os.path.abspath(args.profile_out) if getattr(args, "profile_out", None) else None
+        profile_pstats = os.path.abspath(args.profile_pstats) if getattr(args, "profile_pstats", None) else None
         original_cwd = os.getcwd()
         if abs_project_root != normalize_path(original_cwd):
              logger.info(f"Changing CWD to: {abs_project_root}"); os.chdir(abs_project_root)
              # ConfigManager.initialize(force=True) # Re-init if CWD matters for config finding
 
         logger.debug(f"Analyzing project: {abs_project_root}, force_analysis={args.force_analysis}, force_embeddings={args.force_embeddings}")
-        results = analyze_project(force_analysis=args.force_analysis, force_embeddings=args.force_embeddings)
+        from cline_utils.dependency_system.analysis.project_analyzer import analyze_project # Deferred: pulls in the analysis/embedding stack
+        from cline_utils.dependency_system.utils.profiler import profile_run
+        with profile_run("analyze-project", profile_out, profile_pstats):
+            results = analyze_project(force_analysis=args.force_analysis, force_embeddings=args.force_embeddings)
+        if profile_out: print(f"Profile report saved to {profile_out}")
+        if profile_pstats: print(f"cProfile statistics saved to {profile_pstats}")
         logger.debug(f"All Suggestions before Tracker Update: {results.get('dependency_suggestion', {}).get('suggestions')}")
 
         if args.output:
@@ -239,6 +255,175 @@ def command_handler_analyze_project(args):
              logger.info(f"Changing CWD back to: {original_cwd}"); os.chdir(original_cwd)
              # ConfigManager.initialize(force=True) # Re-init if needed
 
+def handle_similarity_pairs(args: argparse.Namespace) -> int:
+    """Handle the similarity-pairs command: stream exact embedding similarity triples as TSV."""
+    from cline_utils.dependency_system.analysis.similarity_index import SemanticNeighbourIndex
+    path_to_key_info = _load_global_map_or_exit()
+    try:
+        index = SemanticNeighbourIndex(path_to_key_info, get_project_root())
+        if not index.paths: print("Error: No embeddings found. Run 'analyze-project' first."); return 1
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        count = 0
+        try:
+            out.write("source_key\tsource_path\ttarget_key\ttarget_path\tscore\n")
+            for src_path, tgt_path, score in index.iter_pairs(args.threshold, args.top_k, args.tile_size):
+                out.write(f"{path_to_key_info[src_path].key_string}\t{src_path}\t{path_to_key_info[tgt_path].key_string}\t{tgt_path}\t{score:.4f}\n"); count += 1
+        finally:
+            if args.output: out.close()
+        if args.output: print(f"Wrote {count} similarity pairs for {len(index.paths)} files to {args.output}")
+        return 0
+    except Exception as e: logger.exception(f"Error computing similarity pairs: {e}"); print(f"Error: {e}"); return 1
+
+def handle_validate_quantization(args: argparse.Namespace) -> int:
+    """Handle the validate-quantization command: count S/s changes of quantised embeddings vs float32."""
+    from cline_utils.dependency_system.analysis.similarity_index import compare_quantized_suggestions
+    path_to_key_info = _load_global_map_or_exit()
+    try:
+        report = compare_quantized_suggestions(path_to_key_info, get_project_root(), args.dtypes)
+        if "error" in report: print(f"Error: {report['error']}"); return 1
+        print(f"{report['files']} embedded files ({report['dimension']} dims), {report['reference_pairs']} S/s suggestions with float32.")
+        for dtype, counts in report["modes"].items():
+            print(f"  {dtype:8} {counts['bytes_per_vector']:6} bytes/vector, {counts['changed']} changed "
+                  f"(S->s {counts['S_to_s']}, s->S {counts['s_to_S']}, lost {counts['lost']}, gained {counts['gained']}), "
+                  f"max score error {counts['max_abs_error']:.4f}")
+        return 0
+    except Exception as e: logger.exception(f"Error validating quantization: {e}"); print(f"Error: {e}"); return 1
+
+_BACKEND_SAMPLE_TEXTS = [
+    "def load_config(path):\n    with open(path) as f:\n        return json.load(f)",
+    "class Tracker:\n    def __init__(self, keys):\n        self.keys = keys",
+    "# Installation\n\nRun `pip install -r requirements.txt` and start the service.",
+    "The dependency grid records how each file relates to every other tracked file.",
+]
+
+def handle_check_embedding_backend(args: argparse.Namespace) -> int:
+    """Handle the check-embedding-backend command: compare a CPU backend's vectors against the torch ones."""
+    from cline_utils.dependency_system.analysis.embedding_manager import compare_embedding_backends, _read_text_file
+    texts: List[str] = []
+    if os.path.exists(get_global_key_map_path()):
+        path_to_key_info = _load_global_map_or_exit()
+        for path in sorted(p for p, info in path_to_key_info.items() if not info.is_directory):
+            content = _read_text_file(path)
+            if content and content.strip(): texts.append(content)
+            if len(texts) >= args.samples: break
+    if not texts: texts = list(_BACKEND_SAMPLE_TEXTS); print("No tracked files to sample; using built-in sample texts.")
+    try:
+        report = compare_embedding_backends(texts, args.backend)
+        print(f"{report['samples']} samples, {args.backend} vs torch: cosine min {report['min_cosine']:.5f}, "
+              f"mean {report['mean_cosine']:.5f}, max abs diff {report['max_abs_diff']:.5f}")
+        print(f"Encode time: torch {report['reference_seconds']:.2f}s, {args.backend} {report['backend_seconds']:.2f}s")
+        if report["min_cosine"] < args.min_cosine: print(f"FAIL: min cosine below {args.min_cosine}"); return 1
+        print("OK"); return 0
+    except ImportError as e: print(f"Error: backend '{args.backend}' is not installed: {e}"); return 1
+    except Exception as e: logger.exception(f"Error checking embedding backend: {e}"); print(f"Error: {e}"); return 1
+
+def handle_verify_models(args: argparse.Namespace) -> int:
+    """Handle the verify-models command: show where each configured model resolves and check its checksum."""
+    from cline_utils.dependency_system.analysis.model_registry import describe_models
+    try:
+        failed = False
+        for entry in describe_models(compute_checksums=not args.no_checksum):
+            print(f"{entry['model_type']}: {entry['model_id']}")
+            print(f"  source:   {entry['source']} ({'local folder' if entry['is_local'] else 'hub' + (' cache, offline' if entry['offline'] else '')})")
+            if entry["actual_checksum"]: print(f"  sha256:   {entry['actual_checksum']}")
+            print(f"  status:   {entry['status']}")
+            failed = failed or entry["status"] == "MISMATCH" or (entry["offline"] and not entry["is_local"] and args.require_local)
+        return 1 if failed else 0
+    except Exception as e: logger.exception(f"Error verifying models: {e}"); print(f"Error: {e}"); return 1
+
+def _print_cache_stats(stats: Dict[str, Dict[str, Any]]) -> None:
+    """Prints one row per named cache (counters accumulate over the process lifetime, see cache_manager)."""
+    if not stats: print("No cache activity in this process."); return
+    print(f"{'cache':28s} {'size':>11s} {'hits':>9s} {'misses':>9s} {'hit%':>6s} {'evict':>7s} {'expire':>7s} {'inval':>7s} {'avg B':>8s} {'maint ms':>9s}")
+    for name, entry in stats.items():
+        lookups = entry["hits"] + entry["misses"]
+        hit_rate = f"{100 * entry['hits'] / lookups:.1f}" if lookups else "-"
+        print(f"{name:28s} {entry['size']:>5d}/{entry['max_size']:<5d} {entry['hits']:>9d} {entry['misses']:>9d} {hit_rate:>6s} {entry['evictions']:>7d} "
+              f"{entry['expirations']:>7d} {entry['invalidations']:>7d} {entry['avg_entry_bytes']:>8d} {entry['maintenance_seconds'] * 1000:>9.1f}")
+
+def handle_cache_stats(args: argparse.Namespace) -> int:
+    """Handle the cache-stats command: per-cache counters of this process (of the daemon when one is running)."""
+    import json
+    from cline_utils.dependency_system.utils.cache_manager import get_all_cache_stats, reset_cache_stats
+    stats = get_all_cache_stats()
+    if args.json: print(json.dumps(stats, indent=2))
+    else:
+        _print_cache_stats(stats)
+        if not stats: print("Start 'serve' to accumulate statistics across commands, or add --stats to any command.")
+    if args.reset: reset_cache_stats(); print("Cache statistics reset.")
+    return 0
+
+def _execute(args: argparse.Namespace) -> int:
+    """Runs the parsed command; with --stats, prints the cache statistics afterwards."""
+    exit_code = args.func(args)
+    if getattr(args, "stats", False):
+        from cline_utils.dependency_system.utils.cache_manager import get_all_cache_stats
+        print("\n--- Cache statistics ---"); _print_cache_stats(get_all_cache_stats())
+    return exit_code
+
+def _run_command(argv: List[str]) -> int:
+    """Parses argv with the CLI parser and runs the handler in this process (used by the serve daemon)."""
+    args = _build_parser().parse_args(argv)
+    if args.command == "serve": print("Error: 'serve' cannot be forwarded to a daemon."); return 1
+    return _execute(args)
+
+def _warm_resident_state(load_model: bool) -> None:
+    """Loads the key map, trackers, semantic neighbour index and optionally the embedding model."""
+    if not os.path.exists(get_global_key_map_path()): logger.warning("No global key map yet; it will be loaded after the first 'analyze-project'."); return
+    try: path_to_key_info = _load_global_map_or_exit()
+    except SystemExit: logger.warning("Global key map could not be loaded; nothing preloaded."); return
+    project_root = get_project_root()
+    for tracker_path in _find_all_tracker_paths(ConfigManager(), project_root): read_tracker_file(tracker_path)
+    try:
+        from cline_utils.dependency_system.analysis.similarity_index import get_semantic_neighbour_index
+        get_semantic_neighbour_index(path_to_key_info, project_root)
+    except Exception as e: logger.warning(f"Semantic neighbour index not preloaded: {e}")
+    if load_model:
+        from cline_utils.dependency_system.analysis.embedding_manager import _load_model
+        from cline_utils.dependency_system.analysis.model_registry import MODEL_TYPES
+        try:
+            for model_type in MODEL_TYPES: _load_model(model_type)
+        except Exception as e: logger.warning(f"Embedding model not preloaded: {e}")
+
+def _drop_resident_state() -> None:
+    _resident_key_map.update(mtime=None, map=None)
+
+def handle_serve(args: argparse.Namespace) -> int:
+    """Handle the serve command: keep state resident and run forwarded commands from a Unix socket."""
+    from cline_utils.dependency_system.daemon import DependencyDaemon, get_socket_path, stop_daemon
+    project_root = get_project_root()
+    socket_path = args.socket or get_socket_path(project_root)
+    if args.stop:
+        if stop_daemon(socket_path): print(f"Stopped daemon on {socket_path}"); return 0
+        print(f"No daemon running on {socket_path}"); return 1
+    _resident_key_map["enabled"] = True
+    daemon = DependencyDaemon(socket_path, project_root, _run_command,
+                              warm=lambda: _warm_resident_state(args.preload_model), drop_state=_drop_resident_state)
+    return daemon.serve_forever()
+
+def handle_watch(args: argparse.Namespace) -> int:
+    """Handle the watch command: poll code/doc roots and keep trackers fresh incrementally."""
+    from cline_utils.dependency_system.watcher import watch
+    from cline_utils.dependency_system.analysis.project_analyzer import analyze_changed_files, analyze_project
+    project_root = get_project_root(); config = ConfigManager()
+    roots = [normalize_path(os.path.join(project_root, r)) for r in sorted(set(config.get_code_root_directories() + config.get_doc_directories()))]
+    if not roots: print("Error: No code or doc roots configured."); return 1
+
+    def on_changes(changes) -> None:
+        if changes.added or changes.removed:
+            print(f"{len(changes.added)} added, {len(changes.removed)} removed, {len(changes.modified)} modified: running full analysis...", flush=True)
+            results = analyze_project()
+        else:
+            print(f"{len(changes.modified)} modified: updating incrementally...", flush=True)
+            results = analyze_changed_files(sorted(changes.modified))
+        rewritten = results.get("tracker_update", {}).get("rewritten", 0)
+        print(f"Update {results.get('status', 'unknown')} ({results.get('mode', 'full')}): {rewritten} trackers rewritten.", flush=True)
+
+    print(f"Watching {', '.join(roots)} (Ctrl+C to stop)", flush=True)
+    try: watch(roots, project_root, on_changes, interval=args.interval, debounce=args.debounce, stat_batch=args.stat_batch)
+    except KeyboardInterrupt: print("Stopped watching.")
+    return 0
+
 def handle_compress(args: argparse.Namespace) -> int:
     """Handle the compress command."""
     try: result = compress(args.string); print(f"Compressed string: {result}"); return 0
@@ -913,9 +1098,11 @@ def handle_visualize_dependencies(args: argparse.Namespace) -> int:
 # <<< END NEW COMMAND HANDLER >>>
 
 
-def main():
-    """Parse arguments and dispatch to handlers."""
+def _build_parser() -> argparse.ArgumentParser:
+    """Builds the CLI argument parser (shared by main() and the serve daemon)."""
     parser = argparse.ArgumentParser(description="Dependency tracking system CLI")
+    parser.add_argument("--no-daemon", action="store_true", help="Run locally even if a 'serve' daemon is running")
+    parser.add_argument("--stats", action="store_true", help="Print per-cache statistics (hits, misses, evictions, ...) after the command")
     subparsers = parser.add_subparsers(dest="command", help="Available commands", required=True)
 
     # --- Analysis Commands ---
@@ -929,8 +1116,32 @@ def main():
     analyze_project_parser.add_argument("--output", help="Save analysis summary to JSON file")
     analyze_project_parser.add_argument("--force-embeddings", action="store_true", help="Force regeneration of embeddings")
     analyze_project_parser.add_argument("--force-analysis", action="store_true", help="Force re-analysis and bypass cache")
+    analyze_project_parser.add_argument("--profile-out", help="Write a JSON profile (per-phase timings, files/sec, cache hit rates, peak RSS) to this file")
+    analyze_project_parser.add_argument("--profile-pstats", help="Dump cProfile statistics of the run to this file (view with pstats or snakeviz)")
     analyze_project_parser.set_defaults(func=command_handler_analyze_project)
 
+    similarity_pairs_parser = subparsers.add_parser("similarity-pairs", help="Stream file pairs above the similarity threshold (blocked exact kernel)")
+    similarity_pairs_parser.add_argument("--threshold", type=float, help="Minimum similarity (default: each semantic policy's threshold)")
+    similarity_pairs_parser.add_argument("--top-k", type=int, help="Max targets per source file (default: compute.semantic_top_k; 0 = all)")
+    similarity_pairs_parser.add_argument("--tile-size", type=int, help="Rows/columns scored per tile (default: compute.semantic_block_size)")
+    similarity_pairs_parser.add_argument("--output", "-o", help="Write TSV to this file instead of stdout")
+    similarity_pairs_parser.set_defaults(func=handle_similarity_pairs)
+
+    validate_quant_parser = subparsers.add_parser("validate-quantization", help="Report S/s suggestion changes of float16/int8 embeddings vs float32")
+    validate_quant_parser.add_argument("--dtypes", nargs='+', choices=["float16", "int8"], help="Storage dtypes to compare (default: both)")
+    validate_quant_parser.set_defaults(func=handle_validate_quantization)
+
+    check_backend_parser = subparsers.add_parser("check-embedding-backend", help="Compare vectors of a CPU inference backend against the torch model")
+    check_backend_parser.add_argument("--backend", choices=["torch-quantized", "onnx"], default="onnx", help="Backend to check (default: onnx)")
+    check_backend_parser.add_argument("--samples", type=int, default=32, help="Tracked files to encode (default: 32)")
+    check_backend_parser.add_argument("--min-cosine", type=float, default=0.99, help="Fail if any sample's cosine falls below this (default: 0.99)")
+    check_backend_parser.set_defaults(func=handle_check_embedding_backend)
+
+    verify_models_parser = subparsers.add_parser("verify-models", help="Show where the code/doc models resolve and verify local checksums")
+    verify_models_parser.add_argument("--no-checksum", action="store_true", help="Skip hashing local model folders")
+    verify_models_parser.add_argument("--require-local", action="store_true", help="Fail if an offline model has no local folder")
+    verify_models_parser.set_defaults(func=handle_verify_models)
+
     # --- Grid Manipulation Commands ---
     compress_parser = subparsers.add_parser("compress", help="Compress RLE string")
     compress_parser.add_argument("string", help="String to compress")
@@ -1006,9 +1217,39 @@ def main():
     visualize_parser.set_defaults(func=handle_visualize_dependencies)
     # <<< END NEW PARSER >>>
 
+    watch_parser = subparsers.add_parser("watch", help="Watch code/doc roots and incrementally update trackers for changed files")
+    watch_parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls (default: 1.0)")
+    watch_parser.add_argument("--debounce", type=float, default=1.5, help="Quiet seconds before a burst of edits is processed (default: 1.5)")
+    watch_parser.add_argument("--stat-batch", type=int, default=5000, help="Max files stat'ed per poll; larger trees are swept over several polls (default: 5000)")
+    watch_parser.set_defaults(func=handle_watch)
+
+    serve_parser = subparsers.add_parser("serve", help="Run a daemon on a Unix socket that keeps the key map, trackers, indexes and model warm")
+    serve_parser.add_argument("--socket", help="Socket path (default: $CLINE_DEPENDENCY_SOCKET or a per-project path in the temp dir)")
+    serve_parser.add_argument("--preload-model", action="store_true", help="Load the embedding model at startup instead of on first use")
+    serve_parser.add_argument("--stop", action="store_true", help="Stop the daemon running on the socket")
+    serve_parser.set_defaults(func=handle_serve)
+
+    cache_stats_parser = subparsers.add_parser("cache-stats", help="Show hits, misses, evictions, expirations, invalidations, entry size and maintenance time per cache")
+    cache_stats_parser.add_argument("--json", action="store_true", help="Print the statistics as JSON")
+    cache_stats_parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them")
+    cache_stats_parser.set_defaults(func=handle_cache_stats)
 
+    return parser
+
+def main():
+    """Parse arguments and dispatch to handlers."""
+    parser = _build_parser()
     args = parser.parse_args()
 
+    # --- Thin client: hand the command to a running 'serve' daemon if there is one ---
+    from cline_utils.dependency_system.daemon import FORWARDED_COMMANDS, forward_to_daemon, get_socket_path
+    if args.command in FORWARDED_COMMANDS and not args.no_daemon:
+        forwarded = forward_to_daemon([a for a in sys.argv[1:] if a != "--no-daemon"], get_socket_path(get_project_root()))
+        if forwarded is not None:
+            exit_code, out, err = forwarded
+            sys.stdout.write(out); sys.stderr.write(err)
+            sys.exit(exit_code)
+
     # --- Setup Logging ---
     log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     root_logger = logging.getLogger(); root_logger.setLevel(logging.DEBUG)
@@ -1027,7 +1268,7 @@ def main():
 
     # Execute command
     if hasattr(args, 'func'):
-        exit_code = args.func(args)
+        exit_code = _execute(args)
         sys.exit(exit_code)
     else:
         parser.print_help()
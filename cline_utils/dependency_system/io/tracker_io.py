@@ -5,14 +5,20 @@ IO module for tracker file operations using contextual keys.
 Handles reading, writing, merging and exporting tracker files.
 """
 
+from array import array
 from collections import defaultdict
 import datetime
+import hashlib
 import io
 import json
 import os
 import re
 import shutil
-from typing import Dict, List, Tuple, Any, Optional, Set
+import struct
+import tempfile
+import threading
+import zlib
+from typing import Callable, Dict, List, Tuple, Any, Optional, Set
 from cline_utils.dependency_system.core.key_manager import (
     KeyInfo,
     load_global_key_map,
@@ -28,6 +34,7 @@ from cline_utils.dependency_system.io.update_doc_tracker import doc_tracker_data
 from cline_utils.dependency_system.io.update_mini_tracker import get_mini_tracker_data
 from cline_utils.dependency_system.io.update_main_tracker import main_tracker_data
 from cline_utils.dependency_system.utils.cache_manager import cached, check_file_modified, invalidate_dependent_entries
+from cline_utils.dependency_system.utils.profiler import profile_phase
 from cline_utils.dependency_system.core.dependency_grid import compress, create_initial_grid, decompress, validate_grid, PLACEHOLDER_CHAR, EMPTY_CHAR, DIAGONAL_CHAR
 
 import logging
@@ -71,6 +78,160 @@ def get_tracker_path(project_root: str, tracker_type: str = "main", module_path:
     else:
         raise ValueError(f"Unknown tracker type: {tracker_type}")
 
+def _build_key_string_lookup(path_to_key_info: Dict[str, KeyInfo]) -> Dict[str, KeyInfo]:
+    """
+    Builds a key string -> KeyInfo map in one pass over path_to_key_info.
+    Keeps the FIRST KeyInfo for duplicate key strings, matching the previous linear-scan lookups.
+    """
+    lookup: Dict[str, KeyInfo] = {}
+    for info in path_to_key_info.values(): lookup.setdefault(info.key_string, info)
+    return lookup
+
+# --- Sidecar Index ---
+# Binary companion file (<tracker>.idx) holding the parsed tracker so reads can skip markdown parsing.
+# Layout: header (magic, md size, md mtime_ns, md sha256, payload length) + zlib payload.
+# Payload: JSON meta (sorted keys, paths, edit stamps, row offsets) + packed grid blob of compressed rows.
+SIDECAR_EXTENSION = ".idx"
+_SIDECAR_MAGIC = b"CLTIDX01"
+_SIDECAR_HEADER = struct.Struct("<8sQq32sI")
+
+def get_sidecar_path(tracker_path: str) -> str:
+    """Returns the sidecar index path for a tracker file."""
+    return normalize_path(tracker_path) + SIDECAR_EXTENSION
+
+def _sidecar_enabled() -> bool:
+    return bool(ConfigManager().get_compute_setting("tracker_sidecar_index", True))
+
+def _file_sha256(file_path: str) -> bytes:
+    with open(file_path, 'rb') as f: return hashlib.sha256(f.read()).digest()
+
+def _write_tracker_sidecar(tracker_path: str, keys: Dict[str, str], grid: Dict[str, str],
+                           last_key_edit: str, last_grid_edit: str) -> bool:
+    """
+    Writes the sidecar index for a tracker that has just been written to disk.
+    The header records the markdown file's size, mtime and hash so stale sidecars are detected.
+
+    Args:
+        tracker_path: Path to the (already written) markdown tracker
+        keys: Key string -> path map, as read_tracker_file would return it
+        grid: Key string -> compressed row map
+        last_key_edit: Last key edit identifier
+        last_grid_edit: Last grid edit identifier
+    Returns:
+        True if the sidecar was written, False otherwise
+    """
+    if not _sidecar_enabled(): return False
+    sidecar_path = get_sidecar_path(tracker_path)
+    try:
+        sorted_keys_list = sort_key_strings_hierarchically(list(keys.keys()))
+        grid_keys = [k for k in sorted_keys_list if k in grid] + sort_key_strings_hierarchically([k for k in grid if k not in keys])
+        row_blob = bytearray(); offsets = array('I', [0])
+        for k in grid_keys: row_blob += grid[k].encode('utf-8'); offsets.append(len(row_blob))
+        meta = {"sorted_keys": sorted_keys_list, "paths": [keys[k] for k in sorted_keys_list], "grid_keys": grid_keys,
+                "last_key_edit": last_key_edit, "last_grid_edit": last_grid_edit}
+        meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf-8'); offsets_bytes = offsets.tobytes()
+        payload = zlib.compress(struct.pack("<II", len(meta_bytes), len(offsets_bytes)) + meta_bytes + offsets_bytes + bytes(row_blob))
+        st = os.stat(tracker_path)
+        header = _SIDECAR_HEADER.pack(_SIDECAR_MAGIC, st.st_size, st.st_mtime_ns, _file_sha256(tracker_path), len(payload))
+        with open(sidecar_path, 'wb') as f: f.write(header); f.write(payload)
+        logger.debug(f"Wrote sidecar index: {sidecar_path}")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not write sidecar index for {tracker_path}: {e}")
+        try:
+            if os.path.exists(sidecar_path): os.remove(sidecar_path) # Never leave a half-written sidecar behind
+        except OSError: pass
+        return False
+
+def _read_tracker_sidecar(tracker_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Reads the sidecar index for a tracker if it is fresh.
+    Fresh means size matches and either mtime matches or the markdown content hash matches.
+
+    Returns:
+        Parsed tracker structure (same shape as read_tracker_file) or None if missing/stale/corrupt.
+    """
+    sidecar_path = get_sidecar_path(tracker_path)
+    if not _sidecar_enabled() or not os.path.exists(sidecar_path): return None
+    try:
+        with open(sidecar_path, 'rb') as f: data = f.read()
+        if len(data) < _SIDECAR_HEADER.size: return None
+        magic, md_size, md_mtime_ns, md_hash, payload_len = _SIDECAR_HEADER.unpack_from(data)
+        if magic != _SIDECAR_MAGIC or len(data) != _SIDECAR_HEADER.size + payload_len: return None
+        st = os.stat(tracker_path)
+        if st.st_size != md_size: return None
+        if st.st_mtime_ns != md_mtime_ns and _file_sha256(tracker_path) != md_hash:
+            logger.debug(f"Sidecar index stale for {tracker_path}; falling back to markdown parsing.")
+            return None
+        payload = zlib.decompress(data[_SIDECAR_HEADER.size:])
+        meta_len, offsets_len = struct.unpack_from("<II", payload); pos = 8
+        meta = json.loads(payload[pos:pos + meta_len].decode('utf-8')); pos += meta_len
+        offsets = array('I'); offsets.frombytes(payload[pos:pos + offsets_len]); pos += offsets_len
+        row_blob = payload[pos:]
+        keys = dict(zip(meta["sorted_keys"], meta["paths"]))
+        grid = {k: row_blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i, k in enumerate(meta["grid_keys"])}
+        return {"keys": keys, "grid": grid, "last_key_edit": meta.get("last_key_edit", ""), "last_grid_edit": meta.get("last_grid_edit", "")}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable sidecar index {sidecar_path}: {e}")
+        return None
+
+# --- Atomic Writes ---
+_tracker_write_stats: Dict[str, Set[str]] = {"rewritten": set(), "unchanged": set()} # Distinct paths, so create-then-update counts once
+_tracker_write_stats_lock = threading.Lock()
+_UMASK = os.umask(0); os.umask(_UMASK) # Read once at import: os.umask can only be queried by setting it, which is not thread-safe
+
+def get_tracker_write_stats() -> Dict[str, int]:
+    """Returns the number of distinct tracker files rewritten vs. left unchanged since the last reset."""
+    with _tracker_write_stats_lock:
+        rewritten = _tracker_write_stats["rewritten"]
+        return {"rewritten": len(rewritten), "unchanged": len(_tracker_write_stats["unchanged"] - rewritten)}
+
+def reset_tracker_write_stats() -> None:
+    """Resets the rewritten/unchanged tracker counters (call at the start of a run)."""
+    with _tracker_write_stats_lock: _tracker_write_stats["rewritten"].clear(); _tracker_write_stats["unchanged"].clear()
+
+def _write_text_atomic(file_path: str, content: str, before_replace: Optional[Callable[[], Any]] = None) -> bool:
+    """
+    Writes content to file_path atomically (temp file + fsync + os.replace).
+    Skips the write entirely when the existing file already has identical content,
+    which keeps its mtime (and the mtime-keyed tracker_data cache) intact.
+    The replacement keeps the existing file's permissions (new files get 0o666 minus the umask).
+
+    Args:
+        file_path: Destination path
+        content: Full text content to write
+        before_replace: Called only when the file is about to be rewritten (e.g. to back it up)
+    Returns:
+        True if the file was rewritten, False if it was unchanged
+    Raises:
+        OSError: If the temp file cannot be written or moved into place
+    """
+    data = content.encode('utf-8')
+    if os.path.isfile(file_path):
+        try:
+            if os.path.getsize(file_path) == len(data):
+                with open(file_path, 'rb') as f: existing_hash = hashlib.sha256(f.read()).digest()
+                if existing_hash == hashlib.sha256(data).digest():
+                    with _tracker_write_stats_lock: _tracker_write_stats["unchanged"].add(normalize_path(file_path))
+                    logger.debug(f"Content unchanged, skipping write: {file_path}")
+                    return False
+        except OSError as e: logger.debug(f"Could not compare existing content of {file_path}: {e}")
+    if before_replace: before_replace()
+    try: mode = os.stat(file_path).st_mode & 0o7777
+    except OSError: mode = 0o666 & ~_UMASK
+    dirname = os.path.dirname(file_path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=dirname)
+    try:
+        with os.fdopen(fd, 'wb') as f: f.write(data); f.flush(); os.fsync(f.fileno())
+        os.chmod(tmp_path, mode) # mkstemp creates 0o600
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+    with _tracker_write_stats_lock: _tracker_write_stats["rewritten"].add(normalize_path(file_path))
+    return True
+
 # --- File Reading ---
 # Caching for read_tracker_file based on path and modification time.
 @cached("tracker_data",
@@ -79,6 +240,7 @@ def get_tracker_path(project_root: str, tracker_type: str = "main", module_path:
 def read_tracker_file(tracker_path: str) -> Dict[str, Any]:
     """
     Read a tracker file and parse its contents. Caches based on path and mtime.
+    Uses the sidecar index (<tracker>.idx) when it is fresh, otherwise parses the markdown.
     Args:
         tracker_path: Path to the tracker file
     Returns:
@@ -88,6 +250,14 @@ def read_tracker_file(tracker_path: str) -> Dict[str, Any]:
     if not os.path.exists(tracker_path):
         logger.debug(f"Tracker file not found: {tracker_path}. Returning empty structure.")
         return {"keys": {}, "grid": {}, "last_key_edit": "", "last_grid_edit": ""}
+    sidecar_data = _read_tracker_sidecar(tracker_path)
+    if sidecar_data is not None:
+        logger.debug(f"Read tracker '{os.path.basename(tracker_path)}' from sidecar index: {len(sidecar_data['keys'])} keys, {len(sidecar_data['grid'])} grid rows")
+        return sidecar_data
+    return _parse_tracker_markdown(tracker_path)
+
+def _parse_tracker_markdown(tracker_path: str) -> Dict[str, Any]:
+    """Parses a markdown tracker file. Returns an empty structure on failure."""
     try:
         with open(tracker_path, 'r', encoding='utf-8') as f: content = f.read()
         keys = {}; grid = {}; last_key_edit = ""; last_grid_edit = ""
@@ -179,27 +349,31 @@ def write_tracker_file(tracker_path: str,
                 else: logger.error(f"Key '{row_key}' not found in index map during grid rebuild!")
             final_grid[row_key] = compress("".join(row_list))
 
-        # --- Write Content ---
-        with open(tracker_path, 'w', encoding='utf-8', newline='\n') as f:
-            # Write key definitions using the provided map and sorted list
-            f.write("---KEY_DEFINITIONS_START---\n"); f.write("Key Definitions:\n")
-            for key in sorted_keys_list:
-                f.write(f"{key}: {normalize_path(key_defs_to_write[key])}\n") # Ensure path uses forward slashes
-            f.write("---KEY_DEFINITIONS_END---\n\n")
-
-            # Write metadata
-            f.write(f"last_KEY_edit: {last_key_edit}\n"); f.write(f"last_GRID_edit: {last_grid_edit}\n\n")
-
-            # Write grid using the validated/rebuilt grid
-            f.write("---GRID_START---\n")
-            if sorted_keys_list:
-                f.write(f"X {' '.join(sorted_keys_list)}\n")
-                for key in sorted_keys_list:
-                    f.write(f"{key} = {final_grid.get(key, '')}\n") # Use final_grid
-            else: f.write("X \n")
-            f.write("---GRID_END---\n")
+        # --- Build Content ---
+        # Key definitions using the provided map and sorted list (paths use forward slashes)
+        parts = ["---KEY_DEFINITIONS_START---\n", "Key Definitions:\n"]
+        parts.extend(f"{key}: {normalize_path(key_defs_to_write[key])}\n" for key in sorted_keys_list)
+        parts.append("---KEY_DEFINITIONS_END---\n\n")
+        parts.append(f"last_KEY_edit: {last_key_edit}\n"); parts.append(f"last_GRID_edit: {last_grid_edit}\n\n")
+        # Grid using the validated/rebuilt grid
+        parts.append("---GRID_START---\n")
+        if sorted_keys_list:
+            parts.append(f"X {' '.join(sorted_keys_list)}\n")
+            parts.extend(f"{key} = {final_grid.get(key, '')}\n" for key in sorted_keys_list)
+        else: parts.append("X \n")
+        parts.append("---GRID_END---\n")
+
+        # --- Write Content (atomic, skipped if identical) ---
+        if not _write_text_atomic(tracker_path, "".join(parts)):
+            logger.info(f"Tracker file unchanged, not rewritten: {tracker_path}")
+            if not os.path.exists(get_sidecar_path(tracker_path)):
+                _write_tracker_sidecar(tracker_path, {k: normalize_path(key_defs_to_write[k]) for k in sorted_keys_list if validate_key(k)},
+                                       {k: v for k, v in final_grid.items() if validate_key(k)}, last_key_edit, last_grid_edit)
+            return True
 
         logger.info(f"Successfully wrote tracker file: {tracker_path} with {len(sorted_keys_list)} keys.")
+        _write_tracker_sidecar(tracker_path, {k: normalize_path(key_defs_to_write[k]) for k in sorted_keys_list if validate_key(k)},
+                               {k: v for k, v in final_grid.items() if validate_key(k)}, last_key_edit, last_grid_edit)
         # Invalidate cache for this specific tracker file after writing
         invalidate_dependent_entries('tracker_data', f"tracker_data:{tracker_path}:.*")
         return True
@@ -466,11 +640,10 @@ def create_mini_tracker(module_path: str,
     # Definitions include keys relevant to the grid, get paths from global map
     # <<< *** MODIFIED LOGIC *** >>>
     keys_to_write_defs: Dict[str, str] = {}
+    key_string_to_info = _build_key_string_lookup(path_to_key_info)
     for k_str in relevant_keys_for_grid:
          # Find the KeyInfo object associated with this key string
-         # This is inefficient - ideally caller provides KeyInfo for relevant keys
-         # For now, search the global map (can be slow for large projects)
-         found_info = next((info for info in path_to_key_info.values() if info.key_string == k_str), None)
+         found_info = key_string_to_info.get(k_str)
          if found_info:
               keys_to_write_defs[k_str] = found_info.norm_path
          else:
@@ -491,23 +664,24 @@ def create_mini_tracker(module_path: str,
     sorted_relevant_keys_list = relevant_keys_for_grid # Use directly
     try:
         dirname = os.path.dirname(output_file); os.makedirs(dirname, exist_ok=True)
-        with open(output_file, "w", encoding="utf-8", newline='\n') as f:
-            try: f.write(template.format(module_name=module_name))
-            except KeyError: f.write(template)
-            if marker_start not in template: f.write("\n" + marker_start + "\n")
-            f.write("\n")
-            # --- Write the tracker data section ---
-            _write_key_definitions(f, keys_to_write_defs, sorted_relevant_keys_list)
-            f.write("\n")
-            # <<< *** MODIFIED metadata message *** >>>
-            last_key_edit_msg = f"Assigned keys: {', '.join(new_key_strings_for_this_tracker)}" if new_key_strings_for_this_tracker else (f"Initial key: {module_key_string}" if module_key_string else "Initial creation")
-            f.write(f"last_KEY_edit: {last_key_edit_msg}\n")
-            f.write(f"last_GRID_edit: Initial creation\n\n")
-            # Write the grid using the relevant keys and an initial empty grid
-            initial_grid = create_initial_grid(sorted_relevant_keys_list)
-            _write_grid(f, sorted_relevant_keys_list, initial_grid)
-            f.write("\n")
-            if marker_end not in template: f.write(marker_end + "\n")
+        f = io.StringIO() # Build in memory, then write atomically
+        try: f.write(template.format(module_name=module_name))
+        except KeyError: f.write(template)
+        if marker_start not in template: f.write("\n" + marker_start + "\n")
+        f.write("\n")
+        # --- Write the tracker data section ---
+        _write_key_definitions(f, keys_to_write_defs, sorted_relevant_keys_list)
+        f.write("\n")
+        # <<< *** MODIFIED metadata message *** >>>
+        last_key_edit_msg = f"Assigned keys: {', '.join(new_key_strings_for_this_tracker)}" if new_key_strings_for_this_tracker else (f"Initial key: {module_key_string}" if module_key_string else "Initial creation")
+        f.write(f"last_KEY_edit: {last_key_edit_msg}\n")
+        f.write(f"last_GRID_edit: Initial creation\n\n")
+        # Write the grid using the relevant keys and an initial empty grid
+        initial_grid = create_initial_grid(sorted_relevant_keys_list)
+        _write_grid(f, sorted_relevant_keys_list, initial_grid)
+        f.write("\n")
+        if marker_end not in template: f.write(marker_end + "\n")
+        _write_text_atomic(output_file, f.getvalue())
         logger.info(f"Created new mini tracker: {output_file}")
         return True
     except IOError as e: logger.error(f"I/O Error creating mini tracker {output_file}: {e}", exc_info=True); return False
@@ -562,9 +736,11 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
             # Run aggregation ONLY if not forcing (i.e., called from analyze-project)
             logger.debug("Performing main tracker aggregation...")
             try:
-                aggregated_result_paths = main_tracker_data["dependency_aggregation"](
-                    project_root, path_to_key_info, filtered_modules_info, file_to_module
-                )
+                with profile_phase("aggregation") as aggregation_phase:
+                    aggregated_result_paths = main_tracker_data["dependency_aggregation"](
+                        project_root, path_to_key_info, filtered_modules_info, file_to_module
+                    )
+                    aggregation_phase.stop(items=len(filtered_modules_info))
                 logger.debug("Converting aggregated path results to key string suggestions...")
                 for src_path, targets in aggregated_result_paths.items():
                      # ... (aggregation result conversion - unchanged) ...
@@ -635,6 +811,7 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
 
         module_path = potential_module_path
         module_key_string = module_key_info.key_string
+        key_string_to_info = _build_key_string_lookup(path_to_key_info) # O(1) lookups instead of scanning the map per key
         output_file = get_mini_tracker_path(module_path) # Get correct path here
         # Read existing grid data NOW, as it's needed for key determination
         existing_key_defs_mini = {}; existing_grid_mini = {}
@@ -712,24 +889,27 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
                     # relevant_keys_strings_set.add(src_key_str)
                     for target_key_str, dep_char in deps:
                         if get_priority(dep_char) >= min_positive_priority: # Only consider meaningful suggestions
-                            target_info = next((info for info in path_to_key_info.values() if info.key_string == target_key_str), None)
+                            target_info = key_string_to_info.get(target_key_str)
                             if target_info and target_info.norm_path not in all_excluded_abs:
                                 if target_key_str not in relevant_keys_strings_set:
                                     logger.debug(f"  Adding suggested foreign key '{target_key_str}' linked from internal '{src_key_str}'")
                                     relevant_keys_strings_set.add(target_key_str)
 
-            all_target_keys_in_suggestions = {tgt for deps in raw_suggestions.values() for tgt, dep in deps if get_priority(dep) >= min_positive_priority}
-            for target_key_str in all_target_keys_in_suggestions:
+            # Reverse index: target key -> sources with a meaningful suggestion to it (built once, not rescanned per target)
+            sources_by_target: Dict[str, List[str]] = defaultdict(list)
+            for src_key_str, deps in raw_suggestions.items():
+                for tgt, dep in deps:
+                    if get_priority(dep) >= min_positive_priority and (not sources_by_target[tgt] or sources_by_target[tgt][-1] != src_key_str): sources_by_target[tgt].append(src_key_str)
+            for target_key_str, linked_sources in sources_by_target.items():
                 if target_key_str in internal_keys_set:
                     target_path = final_key_defs_internal.get(target_key_str)
                     if target_path and target_path in all_excluded_abs: continue
-                    for src_key_str, deps in raw_suggestions.items():
-                        if any(t == target_key_str and get_priority(c) >= min_positive_priority for t, c in deps):
-                            source_info = next((info for info in path_to_key_info.values() if info.key_string == src_key_str), None)
-                            if source_info and source_info.norm_path not in all_excluded_abs:
-                                if src_key_str not in relevant_keys_strings_set:
-                                     logger.debug(f"  Adding suggested foreign key '{src_key_str}' linked to internal '{target_key_str}'")
-                                     relevant_keys_strings_set.add(src_key_str)
+                    for src_key_str in linked_sources:
+                        source_info = key_string_to_info.get(src_key_str)
+                        if source_info and source_info.norm_path not in all_excluded_abs:
+                            if src_key_str not in relevant_keys_strings_set:
+                                 logger.debug(f"  Adding suggested foreign key '{src_key_str}' linked to internal '{target_key_str}'")
+                                 relevant_keys_strings_set.add(src_key_str)
 
             logger.debug(f"Mini Tracker ({module_key_string}): Relevant keys after processing suggestions: {len(relevant_keys_strings_set)}")
 
@@ -739,9 +919,7 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
         logger.debug(f"Validating {len(relevant_keys_strings_set)} relevant keys against provided path_to_key_info map...")
         for k_str in relevant_keys_strings_set:
             # Check if key exists in the *input* path_to_key_info map
-            # Using a generator expression for potentially better memory efficiency
-            info = next((info for path, info in path_to_key_info.items() if info.key_string == k_str), None)
-            if info:
+            if k_str in key_string_to_info:
                 validated_relevant_keys_set.add(k_str)
             else:
                 invalid_keys_found.add(k_str)
@@ -767,7 +945,7 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
         final_key_defs = {} # Definitions map for THIS tracker (internal + relevant VALID foreign)
         for k_str in relevant_keys_for_grid: # Iterate only validated keys
              # We know the key exists in the input map now, find its info again
-             info = next((info for path, info in path_to_key_info.items() if info.key_string == k_str), None)
+             info = key_string_to_info.get(k_str)
              if info: # Should always find info here now
                   final_key_defs[k_str] = info.norm_path
              # else: # This case should no longer happen
@@ -786,7 +964,7 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
             filtered_suggestions_for_apply = defaultdict(list) # Create a new dict for filtered suggestions
             for src_key_str, deps in raw_suggestions.items():
                  # Check if source is valid and not excluded
-                 source_info = next((info for info in path_to_key_info.values() if info.key_string == src_key_str), None)
+                 source_info = key_string_to_info.get(src_key_str)
                  if not source_info or source_info.norm_path in all_excluded_abs: continue
                  # Add source to final_suggestions_to_apply only if it's in the final grid keys
                  if src_key_str not in relevant_keys_for_grid: continue
@@ -796,7 +974,7 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
                      # Check if target is valid for the final grid and not excluded
                      if target_key_str not in relevant_keys_for_grid: continue
                      if src_key_str == target_key_str or dep_char == PLACEHOLDER_CHAR: continue
-                     target_info = next((info for info in path_to_key_info.values() if info.key_string == target_key_str), None)
+                     target_info = key_string_to_info.get(target_key_str)
                      # Path should exist if key is in relevant_keys_for_grid, but check defensively
                      if not target_info or target_info.norm_path in all_excluded_abs: continue
                      valid_targets_for_source.append((target_key_str, dep_char))
@@ -877,11 +1055,14 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
              current_last_key_edit = last_key_edit_msg # Use message generated in else block
         current_last_grid_edit = "Initial creation"
         tracker_exists = True # Mark as existing now
+        if tracker_type == "mini": # Re-read the template so its markers (and content around them) are kept on this write
+            try:
+                with open(output_file, 'r', encoding='utf-8') as f: lines = f.readlines()
+            except OSError as e: logger.warning(f"Could not re-read new mini tracker {output_file}: {e}")
 
     # --- Update Existing Tracker ---
     logger.debug(f"Updating tracker: {output_file}")
-    # Backup existing file (use the output_file determined correctly earlier)
-    if tracker_exists: backup_tracker_file(output_file)
+    # The existing file is backed up only when it is actually replaced (see the write below)
 
     # --- Key Definition Update & Sorting ---
     # Use hierarchical sort for the final list of keys determined for this tracker
@@ -1224,6 +1405,12 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
 
             # temp_decomp_grid[row_key] = current_decomp_row # Update the row in the temp grid
 
+    # --- Compress the final grid state
+    final_grid = {key: compress("".join(row_list)) for key, row_list in temp_decomp_grid.items()}
+    # Re-applying the same suggestions (e.g. reciprocal '<'/'>' onto existing cells) leaves the grid as it was;
+    # the timestamp only moves when the grid really changed, so unchanged trackers are not rewritten
+    grid_changed = final_grid != existing_grid
+
     # --- Update Grid Edit Timestamp (REVISED LOGIC ORDER) ---
     # Start with the current value read from the file (or the creation message)
     final_last_grid_edit = current_last_grid_edit
@@ -1231,14 +1418,14 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
     # 1. Check if specific manual dependencies were applied FIRST
     # Ensure suggestion_applied is True to confirm *some* change happened via suggestions
     # Use the captured details: applied_manual_source, applied_manual_targets, applied_manual_dep_type
-    if force_apply_suggestions and suggestion_applied and applied_manual_source and applied_manual_targets and applied_manual_dep_type:
+    if force_apply_suggestions and suggestion_applied and grid_changed and applied_manual_source and applied_manual_targets and applied_manual_dep_type:
         # Use the captured details for the specific message
         sorted_targets = sort_key_strings_hierarchically(list(set(applied_manual_targets))) # Use set to remove duplicates before sort
         final_last_grid_edit = f"Manual dependency update {applied_manual_source} -> {sorted_targets} ({applied_manual_dep_type}) ({datetime.datetime.now().isoformat()})"
         logger.debug(f"Setting last_GRID_edit to detailed manual message: {final_last_grid_edit}")
 
     # 2. Else if suggestions were applied (but not the specific manual case above, or details weren't captured)
-    elif suggestion_applied:
+    elif suggestion_applied and grid_changed:
         # This covers non-forced suggestion application and forced applies where details weren't fully captured
         final_last_grid_edit = f"Applied suggestions ({datetime.datetime.now().isoformat()})"
         logger.debug(f"Setting last_GRID_edit to generic suggestions message: {final_last_grid_edit}")
@@ -1252,9 +1439,6 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
     else:
          logger.debug(f"Keeping existing last_GRID_edit message: {final_last_grid_edit}")
 
-    # --- Compress the final grid state
-    final_grid = {key: compress("".join(row_list)) for key, row_list in temp_decomp_grid.items()}
-
     # --- Write updated content to file ---
     try:
         is_mini = tracker_type == "mini"; mini_tracker_start_index = -1; mini_tracker_end_index = -1; marker_start, marker_end = "", ""
@@ -1266,22 +1450,32 @@ def update_tracker(output_file_suggestion: str, # Path suggestion (may be ignore
                 if mini_tracker_start_index >= mini_tracker_end_index: raise ValueError("Start marker after end marker.")
             except (StopIteration, ValueError) as e: logger.warning(f"Mini markers invalid in {output_file}: {e}. Overwriting."); mini_tracker_start_index = -1
 
-        with open(output_file, "w", encoding="utf-8", newline='\n') as f:
-            # Preserve content before start marker
-            if is_mini and mini_tracker_start_index != -1:
-                for i in range(mini_tracker_start_index + 1): f.write(lines[i])
-                if not lines[mini_tracker_start_index].endswith('\n'): f.write('\n')
-                f.write("\n") # Add newline after start marker content
-            _write_key_definitions(f, final_key_defs, final_sorted_keys_list) # Write DEFINITIONS using final set of keys
-            f.write("\n"); f.write(f"last_KEY_edit: {final_last_key_edit}\n"); f.write(f"last_GRID_edit: {final_last_grid_edit}\n\n")
-            _write_grid(f, final_sorted_keys_list, final_grid) # Write GRID using final set of keys
-            if is_mini and mini_tracker_end_index != -1 and mini_tracker_start_index != -1: # Preserve content after
-                 f.write("\n")
-                 for i in range(mini_tracker_end_index, len(lines)): f.write(lines[i])
-                 if not lines[-1].endswith('\n'): f.write('\n') # Ensure final newline if needed
-            elif is_mini and mini_tracker_start_index == -1: # Write end marker if overwriting
-                 f.write("\n" + marker_end + "\n")
+        f = io.StringIO() # Build the whole file in memory, then write it atomically
+        # Preserve content before start marker
+        if is_mini and mini_tracker_start_index != -1:
+            for i in range(mini_tracker_start_index + 1): f.write(lines[i])
+            if not lines[mini_tracker_start_index].endswith('\n'): f.write('\n')
+            f.write("\n") # Add newline after start marker content
+        _write_key_definitions(f, final_key_defs, final_sorted_keys_list) # Write DEFINITIONS using final set of keys
+        f.write("\n"); f.write(f"last_KEY_edit: {final_last_key_edit}\n"); f.write(f"last_GRID_edit: {final_last_grid_edit}\n\n")
+        _write_grid(f, final_sorted_keys_list, final_grid) # Write GRID using final set of keys
+        if is_mini and mini_tracker_end_index != -1 and mini_tracker_start_index != -1: # Preserve content after
+             f.write("\n")
+             for i in range(mini_tracker_end_index, len(lines)): f.write(lines[i])
+             if not lines[-1].endswith('\n'): f.write('\n') # Ensure final newline if needed
+        elif is_mini and mini_tracker_start_index == -1: # Write end marker if overwriting
+             f.write("\n" + marker_end + "\n")
+        if not _write_text_atomic(output_file, f.getvalue(), before_replace=(lambda: backup_tracker_file(output_file)) if tracker_exists else None):
+            logger.info(f"Tracker unchanged, not rewritten: {output_file}")
+            if _sidecar_enabled() and not os.path.exists(get_sidecar_path(output_file)):
+                written_data = _parse_tracker_markdown(output_file)
+                _write_tracker_sidecar(output_file, written_data["keys"], written_data["grid"], written_data["last_key_edit"], written_data["last_grid_edit"])
+            return
         logger.info(f"Successfully updated tracker: {output_file}")
+        # Sidecar is built from a re-parse so it matches exactly what markdown parsing would yield (mini trackers carry extra content)
+        if _sidecar_enabled():
+            written_data = _parse_tracker_markdown(output_file)
+            _write_tracker_sidecar(output_file, written_data["keys"], written_data["grid"], written_data["last_key_edit"], written_data["last_grid_edit"])
         # Invalidate caches
         invalidate_dependent_entries('tracker_data', f"tracker_data:{output_file}:.*")
         invalidate_dependent_entries('grid_decompress', '.*'); invalidate_dependent_entries('grid_validation', '.*'); invalidate_dependent_entries('grid_dependencies', '.*')
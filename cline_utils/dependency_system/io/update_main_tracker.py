@@ -7,6 +7,7 @@ import os
 from collections import defaultdict
 from typing import Dict, List, Optional, Set, Tuple
 import logging
+import numpy as np
 
 # Import necessary functions from other modules
 from cline_utils.dependency_system.core.dependency_grid import decompress, PLACEHOLDER_CHAR, DIAGONAL_CHAR
@@ -70,24 +71,40 @@ def main_key_filter(project_root: str, path_to_key_info: Dict[str, KeyInfo]) ->
     # logger.debug(f"Sample main tracker keys: {sample_keys}")
     return filtered_modules
 
-# --- Hierarchical Helper (Adapted for Paths) ---
-def _get_descendants_paths(parent_path: str, hierarchy: Dict[str, List[str]]) -> Set[str]:
-    """Helper to get all descendant paths (INCLUDING self) for hierarchical check."""
-    # Ensure paths are normalized from the start if not guaranteed by caller
-    norm_parent_path = normalize_path(parent_path)
-    descendants = {norm_parent_path}
-    # Use a proper queue/stack for BFS/DFS
-    queue = [normalize_path(p) for p in hierarchy.get(norm_parent_path, [])]
-    processed = {norm_parent_path}
-    while queue:
-        child_path = queue.pop(0) # BFS style
-        if child_path not in processed:
-            descendants.add(child_path)
-            processed.add(child_path)
-            # Add grandchildren (normalized) to the queue
-            grandchildren = [normalize_path(p) for p in hierarchy.get(child_path, [])]
-            queue.extend(grandchildren)
-    return descendants
+# --- Hierarchical Rollup Helpers ---
+def _build_module_dfs_order(filtered_modules: Dict[str, KeyInfo]) -> Tuple[List[str], List[int], List[int]]:
+    """
+    Orders modules by DFS preorder using KeyInfo.parent_path (O(M)).
+    In this order every module's subtree (self + descendants) is the contiguous range [i, subtree_end[i]).
+
+    Returns:
+        Tuple of (ordered module paths, parent index per position (-1 for roots), subtree end per position)
+    """
+    children: Dict[str, List[str]] = defaultdict(list); roots: List[str] = []
+    for path, info in filtered_modules.items():
+        if info.parent_path and info.parent_path in filtered_modules and info.parent_path != path: children[info.parent_path].append(path)
+        else: roots.append(path)
+    order: List[str] = []; parent_idx: List[int] = []; subtree_end: List[int] = []
+    # Iterative DFS; an exit marker closes the subtree interval once all children are emitted
+    stack: List[Tuple[str, int, bool]] = [(root, -1, False) for root in sorted(roots, reverse=True)]
+    while stack:
+        path, parent_pos, is_exit = stack.pop()
+        if is_exit: subtree_end[parent_pos] = len(order); continue
+        pos = len(order); order.append(path); parent_idx.append(parent_pos); subtree_end.append(pos + 1)
+        stack.append((path, pos, True))
+        stack.extend((child, pos, False) for child in sorted(children.get(path, []), reverse=True))
+    return order, parent_idx, subtree_end
+
+def _merge_dependency_rows(dst_prio: np.ndarray, dst_char: np.ndarray, src_prio: np.ndarray, src_char: np.ndarray,
+                           lt_code: int, gt_code: int, x_code: int) -> None:
+    """
+    Priority-max merge of src into dst (in place). Stronger src cells win; equal-priority '<'/'>' pairs merge to 'x';
+    other equal-priority conflicts keep dst. Priorities are stored +1 so 0 means "no dependency".
+    """
+    stronger = src_prio > dst_prio
+    dst_prio[stronger] = src_prio[stronger]; dst_char[stronger] = src_char[stronger]
+    mutual = (src_prio == dst_prio) & (src_prio > 0) & (((src_char == lt_code) & (dst_char == gt_code)) | ((src_char == gt_code) & (dst_char == lt_code)))
+    dst_char[mutual] = x_code
 
 # --- Dependency Aggregation Logic (Adapted for Paths & Contextual Keys) ---
 def aggregate_dependencies_contextual(
@@ -126,87 +143,62 @@ def aggregate_dependencies_contextual(
     config = ConfigManager()
     get_priority = config.get_char_priority
 
-    # Stores module_path -> target_module_path -> (highest_priority_char, highest_priority)
-    aggregated_deps_prio = defaultdict(lambda: defaultdict(lambda: (PLACEHOLDER_CHAR, -1)))
-    logger.info(f"Starting aggregation for {len(filtered_modules)} main tracker modules...")
+    # Modules in DFS preorder: subtree of position i is [i, subtree_end[i]); parents precede children
+    module_order, parent_idx, subtree_end = _build_module_dfs_order(filtered_modules)
+    module_to_idx = {path: i for i, path in enumerate(module_order)}
+    num_modules = len(module_order)
+    # M x M matrices: (priority + 1) of the strongest dependency, and the code of its character (0 = none)
+    char_table: List[str] = [""]; char_to_code: Dict[str, int] = {}
+    def _code(c: str) -> int:
+        if c not in char_to_code: char_to_code[c] = len(char_table); char_table.append(c)
+        return char_to_code[c]
+    lt_code, gt_code, x_code = _code('<'), _code('>'), _code('x')
+    dep_prio = np.zeros((num_modules, num_modules), dtype=np.uint8)
+    dep_char = np.zeros((num_modules, num_modules), dtype=np.uint8)
+    logger.info(f"Starting aggregation for {num_modules} main tracker modules...")
 
     # --- Step 1: Gather direct foreign dependencies from all relevant mini-trackers ---
     processed_mini_trackers = 0
     # Iterate through the modules designated for the main tracker
-    for source_module_path, _ in filtered_modules.items():
-        # Paths in filtered_modules should already be normalized
-        # norm_source_module_path = normalize_path(source_module_path) # Already normalized
-        norm_source_module_path = source_module_path
+    for norm_source_module_path in module_order:
+        # Paths in filtered_modules are already normalized
         mini_tracker_path = get_any_tracker_path(project_root, tracker_type="mini", module_path=norm_source_module_path)
         if not os.path.exists(mini_tracker_path): continue
 
         processed_mini_trackers += 1
+        source_idx = module_to_idx[norm_source_module_path]
         try:
             # read_tracker_file returns data based on the *file content*, keys are strings
             mini_data = read_tracker_file(mini_tracker_path)
             mini_grid = mini_data.get("grid", {})
-            # Key definitions LOCAL to this mini-tracker: {key_string: path_string (might not be normalized)}
-            mini_keys_defined_raw = mini_data.get("keys", {})
-            # Normalize paths defined in the mini-tracker for consistent lookup
-            mini_keys_defined = {k: normalize_path(p) for k,p in mini_keys_defined_raw.items()}
-
+            # Key definitions LOCAL to this mini-tracker, normalized for consistent lookup
+            mini_keys_defined = {k: normalize_path(p) for k, p in mini_data.get("keys", {}).items()}
             if not mini_grid or not mini_keys_defined: logger.debug(f"Mini tracker {os.path.basename(mini_tracker_path)} grid/keys empty."); continue
-            # Get the list of key strings defined in this mini-tracker and sort them simply
             mini_grid_key_strings = sort_key_strings_hierarchically(list(mini_keys_defined.keys()))
-            # Note: If natural sort order (like key_manager.sort_keys) is TRULY needed
-            # for string keys here, a separate natural sort utility would be required.
-            # Standard sort is usually sufficient for grid consistency.
-
+            # Column index -> main-tracker module index of the target (-1 if the target is not a main tracker module)
+            col_module_idx = [module_to_idx.get(file_to_module.get(mini_keys_defined[k], ""), -1) for k in mini_grid_key_strings]
             key_string_to_idx_mini = {k: i for i, k in enumerate(mini_grid_key_strings)}
 
             # Iterate through rows (sources) of the mini-tracker grid using key strings
             for mini_source_key_string, compressed_row in mini_grid.items():
                  if mini_source_key_string not in key_string_to_idx_mini: continue
-                 # Find the path corresponding to the key string *within this mini-tracker*
                  mini_source_path = mini_keys_defined.get(mini_source_key_string)
-                 if not mini_source_path: continue # Path must be defined locally
-                 # Determine the module the source path belongs to using the global map
-                 # mini_source_path should already be normalized from mini_keys_defined creation
-                 actual_source_module_path = file_to_module.get(mini_source_path)
-                 if not actual_source_module_path:
-                      # Log if a file/dir defined in a mini-tracker isn't in the file_to_module map
-                      # logger.warning(f"Path '{mini_source_path}' (key '{mini_source_key_string}') from {mini_tracker_path} not found in file_to_module map.")
-                      continue
                  # IMPORTANT CHECK: Aggregate only if the source's module *is* the module this mini-tracker represents.
-                 if actual_source_module_path != norm_source_module_path:
-                     # logger.debug(...)
-                     continue
-                 # Process the columns (targets) for this valid source row
+                 if not mini_source_path or file_to_module.get(mini_source_path) != norm_source_module_path: continue
                  try:
-                     decompressed_row = list(decompress(compressed_row))
+                     decompressed_row = decompress(compressed_row)
                      if len(decompressed_row) != len(mini_grid_key_strings): logger.warning(f"Row length mismatch for '{mini_source_key_string}' in {mini_tracker_path}."); continue
-                     for col_idx, dep_char in enumerate(decompressed_row):
-                         if dep_char in (PLACEHOLDER_CHAR, DIAGONAL_CHAR): continue
-                         mini_target_key_string = mini_grid_key_strings[col_idx]
-                         # Find the path for the target key string defined locally
-                         target_path = mini_keys_defined.get(mini_target_key_string)
-                         if not target_path: continue # Target path must be defined locally
-                         # Find the module the target path belongs to using the global map
-                         # target_path should already be normalized
-                         target_module_path = file_to_module.get(target_path)
-                         if not target_module_path:
-                              # logger.warning(f"Target path '{target_path}' (key '{mini_target_key_string}') from {mini_tracker_path} not found in file_to_module map.")
-                              continue
-                         # --- Check for FOREIGN relationship (source module != target module) ---
-                         if target_module_path != actual_source_module_path:
-                             # Use module paths as keys in aggregated_deps_prio
-                             current_priority = get_priority(dep_char)
-                             _stored_char, stored_priority = aggregated_deps_prio[actual_source_module_path][target_module_path]
-                             if current_priority > stored_priority:
-                                 # logger.debug(...) # Log using paths
-                                 aggregated_deps_prio[actual_source_module_path][target_module_path] = (dep_char, current_priority)
-                             elif current_priority == stored_priority and current_priority > -1:
-                                  # Handle equal priority conflicts (<> -> x)
-                                  if {dep_char, _stored_char} == {'<', '>'}:
-                                       if aggregated_deps_prio[actual_source_module_path][target_module_path][0] != 'x':
-                                           # logger.debug(...) # Log using paths
-                                           aggregated_deps_prio[actual_source_module_path][target_module_path] = ('x', current_priority)
-                                  # else: Keep existing on other equal priority conflicts
+                     for col_idx, dep_char_value in enumerate(decompressed_row):
+                         if dep_char_value in (PLACEHOLDER_CHAR, DIAGONAL_CHAR): continue
+                         target_idx = col_module_idx[col_idx]
+                         # --- FOREIGN relationship only (source module != target module) ---
+                         if target_idx < 0 or target_idx == source_idx: continue
+                         current_priority = get_priority(dep_char_value) + 1
+                         stored_priority = dep_prio[source_idx, target_idx]
+                         if current_priority > stored_priority:
+                             dep_prio[source_idx, target_idx] = current_priority; dep_char[source_idx, target_idx] = _code(dep_char_value)
+                         elif current_priority == stored_priority and {dep_char_value, char_table[dep_char[source_idx, target_idx]]} == {'<', '>'}:
+                             dep_char[source_idx, target_idx] = x_code # Equal priority '<' + '>' -> 'x'
                  except Exception as decomp_err:
                       logger.warning(f"Error decompressing/processing row for '{mini_source_key_string}' in {mini_tracker_path}: {decomp_err}")
         except Exception as read_err:
@@ -214,74 +206,26 @@ def aggregate_dependencies_contextual(
 
     logger.info(f"Processed {processed_mini_trackers} mini-trackers for direct dependencies.")
 
-    # --- Step 2: Perform Hierarchical Rollup (Using Paths) ---
+    # --- Step 2: Hierarchical Rollup (single post-order pass) ---
+    # Reverse preorder visits every child before its parent, so each row is final when it is merged upward.
+    # A parent inherits a child's dependencies except those pointing into the parent's own subtree.
     logger.info("Performing hierarchical rollup...")
-    # Build parent -> direct children map using normalized paths from filtered_modules
-    hierarchy: Dict[str, List[str]] = defaultdict(list)
-    module_paths_list = sorted(list(filtered_modules.keys())) # Use paths from filtered_modules
-    for p_path in module_paths_list:
-        # p_path is already normalized
-        for c_path in module_paths_list:
-            # c_path is already normalized
-            if p_path == c_path: continue
-            # Check if c_path is DIRECTLY inside p_path
-            # Ensure trailing slash consistency might be needed if paths mix formats, but normalize_path should handle this.
-            if c_path.startswith(p_path + os.sep) and normalize_path(os.path.dirname(c_path)) == p_path:
-                 hierarchy[p_path].append(c_path)
-
-    # Iteratively propagate dependencies up the hierarchy
-    changed_in_pass = True
-    max_passes = len(module_paths_list) # Safety break
-    current_pass = 0
-    while changed_in_pass and current_pass < max_passes:
-        changed_in_pass = False; current_pass += 1
-        logger.debug(f"Hierarchy Rollup Pass {current_pass}")
-        for parent_path in module_paths_list: # Iterate through all potential parents
-             # Calculate all descendants ONCE per parent per pass
-             all_descendants_paths = _get_descendants_paths(parent_path, hierarchy) # Use the path-based helper
-             # Check direct children for inheritance
-             for child_path in hierarchy.get(parent_path, []):
-                 # Inherit dependencies *from* the child
-                 child_deps = list(aggregated_deps_prio.get(child_path, {}).items())
-                 for target_path, (dep_char, priority) in child_deps:
-                      # Inherit if:
-                      # 1. Dependency is meaningful (priority > -1)
-                      # 2. Target is NOT the parent itself
-                      # 3. Target is NOT another descendant of the parent
-                      if priority > -1 and target_path != parent_path and target_path not in all_descendants_paths:
-                          _parent_stored_char, parent_stored_priority = aggregated_deps_prio[parent_path][target_path]
-                          if priority > parent_stored_priority:
-                               aggregated_deps_prio[parent_path][target_path] = (dep_char, priority); changed_in_pass = True
-                          elif priority == parent_stored_priority and priority > -1:
-                               # Merge < > to x on equal priority during rollup
-                               if {_parent_stored_char, dep_char} == {'<', '>'}:
-                                   if aggregated_deps_prio[parent_path][target_path][0] != 'x':
-                                       # logger.debug(...) # Log using paths
-                                       aggregated_deps_prio[parent_path][target_path] = ('x', priority)
-                                       changed_in_pass = True
-                               # else: keep existing if priorities equal and not < > conflict
-
-    if current_pass == max_passes and changed_in_pass:
-        logger.warning("Hierarchical rollup reached max passes, potentially indicating a cycle or very deep nesting.")
+    children_pos: List[List[int]] = [[] for _ in range(num_modules)]
+    for child_pos, parent_pos in enumerate(parent_idx): # Ascending positions = sorted child order
+        if parent_pos >= 0: children_pos[parent_pos].append(child_pos)
+    for parent_pos in range(num_modules - 1, -1, -1):
+        for child_pos in children_pos[parent_pos]:
+            child_prio = dep_prio[child_pos].copy()
+            child_prio[parent_pos:subtree_end[parent_pos]] = 0 # Mask parent + all its descendants
+            _merge_dependency_rows(dep_prio[parent_pos], dep_char[parent_pos], child_prio, dep_char[child_pos], lt_code, gt_code, x_code)
 
     # --- Step 3: Convert to final output format (Using Paths) ---
     final_suggestions = defaultdict(list)
-    # Sort source paths for deterministic output order
-    sorted_source_paths = sorted(aggregated_deps_prio.keys())
-    for source_path in sorted_source_paths:
-        # Ensure source_path is actually a module path we care about (should be by construction, but check is safe)
-        if source_path not in filtered_modules: continue
-
-        targets = aggregated_deps_prio[source_path]
-        # Sort target paths for deterministic order within each source
-        sorted_target_paths = sorted(targets.keys())
-        for target_path in sorted_target_paths:
-            dep_char, _priority = targets[target_path]
-            # Ensure target path is also a module path and dependency is not placeholder
-            if target_path in filtered_modules and dep_char != PLACEHOLDER_CHAR:
-                final_suggestions[source_path].append((target_path, dep_char))
-        # Sorting of tuples (target_path, dep_char) was implicitly handled by iterating sorted target paths
-        # If explicit sort by tuple needed: final_suggestions[source_path].sort()
+    for source_path in sorted(module_order): # Deterministic output order
+        row_idx = module_to_idx[source_path]
+        targets = [(module_order[t], char_table[dep_char[row_idx, t]]) for t in np.flatnonzero(dep_prio[row_idx])]
+        for target_path, char_value in sorted(targets):
+            if char_value != PLACEHOLDER_CHAR: final_suggestions[source_path].append((target_path, char_value))
 
     logger.info("Main tracker aggregation finished.")
     return dict(final_suggestions)
@@ -4,10 +4,13 @@ Supports on-demand cache creation, automatic expiration, and granular invalidati
 """
 
 import functools
+import itertools
 import os
+import sys
 import time
 import re
 import json
+import threading
 from typing import Dict, Any, Callable, TypeVar, Optional, List, Tuple
 import logging
 
@@ -26,6 +29,19 @@ CACHE_SIZES = {
     "key_generation": 5000,        # Larger for key maps
     "default": DEFAULT_MAX_SIZE
 }
+STAT_COUNTERS = ("hits", "misses", "evictions", "expirations", "invalidations", "maintenance_seconds")
+_SIZE_SAMPLE = 100 # Entries (and container items) measured when estimating the average entry size
+
+def _estimate_size(value: Any, depth: int = 0) -> int:
+    """Approximate deep size in bytes: containers are sampled and scaled, nesting is followed 3 levels deep."""
+    size = sys.getsizeof(value)
+    if depth >= 3 or isinstance(value, (str, bytes)): return size
+    if isinstance(value, dict): items = list(itertools.islice(value.items(), _SIZE_SAMPLE)); count = len(value)
+    elif isinstance(value, (list, tuple, set, frozenset)): items = list(itertools.islice(value, _SIZE_SAMPLE)); count = len(value)
+    else: return size
+    if not items: return size
+    sampled = sum(_estimate_size(item, depth + 1) for item in items)
+    return size + sampled * count // len(items)
 
 class Cache:
     """A single cache instance with LRU eviction, per-entry TTL, and dependency tracking."""
@@ -39,8 +55,16 @@ class Cache:
         self.max_size = CACHE_SIZES.get(name, max_size)
         self.hits = 0
         self.misses = 0
+        self.evictions = 0 # Entries dropped because the cache was full (LRU)
+        self.expirations = 0 # Entries dropped because their TTL passed
+        self.invalidations = 0 # Entries dropped by invalidate() (including dependents)
+        self.maintenance_seconds = 0.0 # Time in eviction, expiry sweeps and invalidation
+        self._lock = threading.RLock() # Caches are shared by worker threads (batch analysis, tracker updates)
 
     def get(self, key: str) -> Any:
+        with self._lock: return self._get(key)
+
+    def _get(self, key: str) -> Any:
         if key in self.data:
             value, _, expiry = self.data[key]
             if expiry is None or time.time() < expiry:
@@ -51,12 +75,16 @@ class Cache:
                 del self.data[key]
                 if key in self.reverse_deps:
                     del self.reverse_deps[key]
+                self.expirations += 1
         self.misses += 1
         return None
 
     def set(self, key: str, value: Any, dependencies: Optional[List[str]] = None, ttl: Optional[int] = None) -> None:
-        if len(self.data) >= self.max_size:
-            self._evict_lru()
+        with self._lock: self._set(key, value, dependencies, ttl)
+
+    def _set(self, key: str, value: Any, dependencies: Optional[List[str]] = None, ttl: Optional[int] = None) -> None:
+        if key not in self.data and len(self.data) >= self.max_size: # Overwriting a key never needs room
+            start = time.perf_counter(); self._evict_lru(); self.maintenance_seconds += time.perf_counter() - start
         expiry = time.time() + (ttl if ttl is not None else self.default_ttl) if ttl != 0 else None
         self.data[key] = (value, time.time(), expiry)
         if dependencies:
@@ -72,10 +100,12 @@ class Cache:
         if not self.data:
             return
         lru_key = min(self.data, key=lambda k: self.data[k][1])
-        self._remove_key(lru_key)
+        self._remove_key(lru_key); self.evictions += 1
 
-    def _remove_key(self, key: str) -> None:
-        if key in self.data:
+    def _remove_key(self, key: str) -> bool:
+        """Removes an entry and its reverse dependencies. Returns whether the entry was present."""
+        present = key in self.data
+        if present:
             del self.data[key]
         if key in self.reverse_deps:
             for dep in self.reverse_deps[key]:
@@ -84,12 +114,16 @@ class Cache:
                 if dep in self.dependencies and not self.dependencies[dep]:
                     del self.dependencies[dep]
             del self.reverse_deps[key]
+        return present
 
     def cleanup_expired(self) -> None:
         """Remove all expired entries."""
-        expired_keys = [k for k, (_, _, expiry) in self.data.items() if expiry and time.time() > expiry]
-        for key in expired_keys:
-            self._remove_key(key)
+        with self._lock:
+            start = time.perf_counter()
+            expired_keys = [k for k, (_, _, expiry) in self.data.items() if expiry and time.time() > expiry]
+            for key in expired_keys:
+                self._remove_key(key)
+            self.expirations += len(expired_keys); self.maintenance_seconds += time.perf_counter() - start
 
     def is_expired(self) -> bool:
         return (time.time() - self.creation_time) > self.default_ttl and not self.data
@@ -97,51 +131,93 @@ class Cache:
     def invalidate(self, key_pattern: str) -> None:
         """Invalidate entries matching a key pattern (supports regex)."""
         compiled_pattern = re.compile(key_pattern)
-        keys_to_remove = [k for k in self.data if compiled_pattern.match(k)]
-        for key in keys_to_remove:
-            self._remove_key(key)
-            if key in self.dependencies:
-                dependent_keys = self.dependencies.pop(key)
-                for dep_key in dependent_keys:
-                    self._remove_key(dep_key)
+        with self._lock:
+            start = time.perf_counter()
+            keys_to_remove = [k for k in self.data if compiled_pattern.match(k)]
+            for key in keys_to_remove:
+                self.invalidations += self._remove_key(key)
+                if key in self.dependencies:
+                    dependent_keys = self.dependencies.pop(key)
+                    for dep_key in dependent_keys:
+                        self.invalidations += self._remove_key(dep_key)
+            self.maintenance_seconds += time.perf_counter() - start
 
-    def stats(self) -> Dict[str, int]:
-        return {"hits": self.hits, "misses": self.misses, "size": len(self.data)}
+    def stats(self) -> Dict[str, Any]:
+        """Counters (see STAT_COUNTERS) plus size, max_size, ttl and the estimated average entry size in bytes."""
+        with self._lock:
+            sample = list(itertools.islice(self.data.items(), _SIZE_SAMPLE))
+            avg_entry_bytes = sum(_estimate_size(k) + _estimate_size(v[0]) for k, v in sample) // len(sample) if sample else 0
+            return {**{name: getattr(self, name) for name in STAT_COUNTERS},
+                    "size": len(self.data), "max_size": self.max_size, "ttl": self.default_ttl, "avg_entry_bytes": avg_entry_bytes}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for name in STAT_COUNTERS: setattr(self, name, 0.0 if name == "maintenance_seconds" else 0)
 
 class CacheManager:
     """Manages multiple caches with persistence and cleanup."""
     def __init__(self, persist: bool = False):
         self.caches: Dict[str, Cache] = {}
+        self.retired_stats: Dict[str, Dict[str, float]] = {} # Counters of caches dropped or replaced, so totals survive recreation
         self.persist = persist
+        self._lock = threading.RLock()
         if persist:
             os.makedirs(CACHE_DIR, exist_ok=True)
             self._load_persistent_caches()
 
     def get_cache(self, cache_name: str, ttl: int = DEFAULT_TTL) -> Cache:
         """Retrieve or create a cache by name."""
-        if cache_name not in self.caches or self.caches[cache_name].is_expired():
-            self.caches[cache_name] = Cache(cache_name, ttl)
-            logger.debug(f"Spun up new cache: {cache_name} with TTL {ttl}s")
-        return self.caches[cache_name]
+        with self._lock:
+            if cache_name not in self.caches or self.caches[cache_name].is_expired():
+                if cache_name in self.caches: self._retire(self.caches[cache_name])
+                self.caches[cache_name] = Cache(cache_name, ttl)
+                logger.debug(f"Spun up new cache: {cache_name} with TTL {ttl}s")
+            return self.caches[cache_name]
 
     def cleanup(self) -> None:
         """Remove expired caches."""
-        expired = [name for name, cache in self.caches.items() if cache.is_expired()]
-        for name in expired:
-            if self.persist:
-                self._save_cache(name)
-            del self.caches[name]
-            logger.debug(f"Spun down expired cache: {name}")
-        for cache in self.caches.values():
-            cache.cleanup_expired()
+        with self._lock:
+            expired = [name for name, cache in self.caches.items() if cache.is_expired()]
+            for name in expired:
+                if self.persist:
+                    self._save_cache(name)
+                self._retire(self.caches.pop(name))
+                logger.debug(f"Spun down expired cache: {name}")
+            for cache in list(self.caches.values()):
+                cache.cleanup_expired()
 
     def clear_all(self) -> None:
-        if self.persist:
-            for name in self.caches:
-                self._save_cache(name)
-        self.caches.clear()
+        with self._lock:
+            if self.persist:
+                for name in self.caches:
+                    self._save_cache(name)
+            for cache in self.caches.values(): self._retire(cache)
+            self.caches.clear()
         logger.info("All caches cleared.")
 
+    def _retire(self, cache: Cache) -> None:
+        retired = self.retired_stats.setdefault(cache.name, dict.fromkeys(STAT_COUNTERS, 0))
+        for name in STAT_COUNTERS: retired[name] += getattr(cache, name)
+
+    def get_stats(self, cache_name: str) -> Optional[Dict[str, Any]]:
+        """Statistics of a named cache with counters totalled over its recreations, or None if it was never created."""
+        with self._lock:
+            cache = self.caches.get(cache_name); retired = self.retired_stats.get(cache_name)
+            if cache is None and retired is None: return None
+            stats = cache.stats() if cache is not None else {**dict.fromkeys(STAT_COUNTERS, 0), "size": 0, "max_size": CACHE_SIZES.get(cache_name, DEFAULT_MAX_SIZE), "ttl": None, "avg_entry_bytes": 0}
+            for name in STAT_COUNTERS: stats[name] = stats.get(name, 0) + (retired or {}).get(name, 0)
+            return stats
+
+    def cache_names(self) -> List[str]:
+        """Names of all live and retired caches."""
+        with self._lock: return sorted(set(self.caches) | set(self.retired_stats))
+
+    def reset_stats(self) -> None:
+        """Zeroes all counters (live and retired); entries are kept."""
+        with self._lock:
+            self.retired_stats.clear()
+            for cache in self.caches.values(): cache.reset_stats()
+
     def _save_cache(self, cache_name: str) -> None:
         if cache_name in self.caches:
             cache_file = os.path.join(CACHE_DIR, f"{cache_name}.json")
@@ -190,7 +266,7 @@ def file_modified(file_path: str, project_root: str, cache_type: str = "all") ->
     norm_path = normalize_path(file_path)
     norm_root = normalize_path(project_root)
     key = f".*:{norm_path}:.*" if cache_type == "all" else f"{cache_type}:{norm_path}:.*"
-    for cache_name in cache_manager.caches:
+    for cache_name in list(cache_manager.caches):
         invalidate_dependent_entries(cache_name, key)
 
 def tracker_modified(tracker_path: str, tracker_type: str, project_root: str, cache_type: str = "all") -> None:
@@ -251,7 +327,14 @@ def get_file_type_cached(file_path: str) -> str:
     from .path_utils import get_file_type
     return get_file_type(file_path)
 
-def get_cache_stats(cache_name: str) -> Dict[str, int]:
-    """Get hit/miss stats for a cache."""
-    cache = cache_manager.get_cache(cache_name)
-    return cache.stats()
\ No newline at end of file
+def get_cache_stats(cache_name: str) -> Dict[str, Any]:
+    """Get hit/miss/eviction/expiration/invalidation counters, size and maintenance time for a cache (without creating it)."""
+    return cache_manager.get_stats(cache_name) or {**dict.fromkeys(STAT_COUNTERS, 0), "size": 0, "max_size": CACHE_SIZES.get(cache_name, DEFAULT_MAX_SIZE), "ttl": None, "avg_entry_bytes": 0}
+
+def get_all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """get_cache_stats for every cache created in this process, by name."""
+    return {name: get_cache_stats(name) for name in cache_manager.cache_names()}
+
+def reset_cache_stats() -> None:
+    """Zeroes the counters of all caches."""
+    cache_manager.reset_stats()
\ No newline at end of file
@@ -94,15 +94,44 @@ DEFAULT_CONFIG = {
         ".old",
         ".orig",
         ".embedding",
-        ".npy"
+        ".npy",
+        ".idx"
     ],  
     "thresholds": {"doc_similarity": 0.65, "code_similarity": 0.7},
+    # Optional "semantic_policies" section (not set by default): minimum similarity for a semantic suggestion
+    # per compared pair of embedding spaces, e.g. {"code_code": 0.7, "doc_doc": 0.6, "doc_code": null}
+    # (doc = files under the doc directories, code = everything else). A missing pair uses
+    # thresholds.doc_similarity; null disables that comparison (see get_semantic_policy).
     "models": {
         "doc_model_name": "all-mpnet-base-v2",
         "code_model_name": "all-mpnet-base-v2",
+        "model_dir": "",  # Directory of local model folders (relative to project root), checked before the hub
+        "offline": False,  # Never contact the model hub; models must resolve to a local folder or the HF cache
+        "checksums": {},  # Model id -> sha256 of its local folder (see 'verify-models'); verified before loading
     },
     "compute": {
-        "embedding_device": "auto"  # Options: "auto", "cuda", "mps", "cpu"
+        "embedding_device": "auto",  # Options: "auto", "cuda", "mps", "cpu"
+        "embedding_backend": "torch",  # Inference backend: "torch", "torch-quantized" (int8, CPU) or "onnx" (onnxruntime, CPU)
+        "embedding_threads": 0,  # CPU threads for inference (0 = library default)
+        "tracker_sidecar_index": True,  # Write/read binary <tracker>.idx files to skip markdown parsing
+        "embedding_dtype": "float32",  # Embedding storage: "float32", "float16" or "int8" (per-vector scaled)
+        "embedding_chunking": True,  # Split long files into token windows and pool the chunk vectors
+        "embedding_chunk_tokens": 0,  # Tokens per window (0 = model max sequence length)
+        "embedding_chunk_overlap": 32,  # Tokens shared by consecutive windows
+        "embedding_max_chunks": 16,  # Max windows per file (evenly spaced over the file when exceeded)
+        "embedding_pooling": "mean",  # "mean" (token-weighted) or "max"
+        "embedding_keep_chunks": False,  # Also save per-chunk vectors as <file>.chunks.npy
+        "embedding_batch_size": 64,  # Chunks per model.encode batch
+        "embedding_reader_workers": 0,  # Threads reading/preprocessing files ahead of the encoder (0 = min(8, CPUs))
+        "embedding_queue_size": 256,  # Max preprocessed files waiting for the encoder
+        "file_cache_budget_mb": 256,  # Decoded file text kept per analysis run, shared by analyzer and embedder (LRU)
+        "file_cache_mmap_threshold_kb": 1024,  # Files at least this large are memory-mapped when read (0 = never)
+        "semantic_backend": "exact",  # Nearest-neighbour backend for semantic suggestions: "exact" or "ivf" (approximate)
+        "semantic_top_k": 0,  # Opt-in cap on semantic neighbours per file (0 = all above the policy threshold; a cap drops weaker ones)
+        "semantic_block_size": 1024,  # Tile size of the blocked similarity kernel (bounds each tile x tile score matrix)
+        "semantic_ann_nlist": 0,  # IVF lists (0 = 4 * sqrt(N))
+        "semantic_ann_nprobe": 8,  # IVF lists scanned per query
+        "semantic_ann_retrain_fraction": 0.25  # Retrain IVF centroids when more than this fraction of rows changed (else re-assign only)
     },
     "paths": {
         "doc_dir": "docs",
@@ -344,6 +373,22 @@ class ConfigManager:
         thresholds = self.config.get("thresholds", DEFAULT_CONFIG["thresholds"])
         return thresholds.get(threshold_type, 0.7)
     
+    def get_semantic_policy(self, policy: str) -> Optional[float]:
+        """
+        Get the threshold of a semantic comparison policy.
+
+        Args:
+            policy: 'code_code', 'doc_doc' or 'doc_code'
+
+        Returns:
+            Minimum similarity for suggestions between those spaces (doc_similarity if unset),
+            or None if the spaces are not compared
+        """
+        policies = self.config.get("semantic_policies", {})
+        if policy not in policies: return float(self.get_threshold("doc_similarity"))
+        value = policies[policy]
+        return None if value is None or value is False else float(value)
+
     def get_model_name(self, model_type: str) -> str:
         """
         Get model name.
@@ -357,6 +402,11 @@ class ConfigManager:
         models = self.config.get("models", DEFAULT_CONFIG["models"])
         return models.get(model_type, "all-mpnet-base-v2")
 
+    def get_model_setting(self, setting_name: str, default: Any = None) -> Any:
+        """Gets a setting from the 'models' section of the config."""
+        model_settings = self.config.get("models", {})
+        return model_settings.get(setting_name, default)
+
     def get_path(self, path_type: str, default_path: Optional[str] = None) -> str:
         """
         Get path from configuration.
@@ -0,0 +1,147 @@
+# utils/file_content_cache.py
+
+"""
+Per-run file content cache: each file is read once (memory-mapped above a size threshold),
+checked for binary content and decoded to text once, and the result is shared by the analyzer
+(analyze_file) and the embedder (generate_embeddings) within one analysis run.
+
+A cache is only active inside a file_content_scope / @with_file_content_cache call (e.g. one
+analyze-project run); outside of it, get_file_content reads straight from disk, so long-lived
+processes (serve, watch) never hold stale text. Entries are validated against (mtime_ns, size)
+and evicted least-recently-used once the decoded text exceeds the memory budget
+(compute.file_cache_budget_mb); an evicted file is simply read again on its next use.
+"""
+
+import contextlib
+import functools
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+from .config_manager import ConfigManager
+from .path_utils import normalize_path
+
+import logging
+logger = logging.getLogger(__name__)
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+BINARY_SNIFF_BYTES = 1024 # A NUL byte in this prefix marks a file as binary
+
+class FileContent:
+    """One file's content as read by the cache."""
+    __slots__ = ("path", "stamp", "text", "is_binary", "error")
+
+    def __init__(self, path: str, stamp: Tuple[int, int], text: Optional[str] = None, is_binary: bool = False, error: Optional[Exception] = None):
+        self.path = path; self.stamp = stamp # (mtime_ns, size)
+        self.text = text # Decoded UTF-8 (universal newlines, like open(..., 'r')); None if undecodable or unreadable
+        self.is_binary = is_binary; self.error = error
+
+    @property
+    def size(self) -> int:
+        return self.stamp[1]
+
+def _read_file(norm_path: str, mmap_threshold: int) -> FileContent:
+    try:
+        stat = os.stat(norm_path); stamp = (stat.st_mtime_ns, stat.st_size)
+        with open(norm_path, 'rb') as f:
+            if stat.st_size >= mmap_threshold > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    is_binary = b'\0' in mapped[:BINARY_SNIFF_BYTES]
+                    try: text = str(mapped, 'utf-8') # Decodes straight from the mapping, no intermediate bytes copy
+                    except UnicodeDecodeError as e: return FileContent(norm_path, stamp, None, is_binary, e)
+            else:
+                data = f.read(); is_binary = b'\0' in data[:BINARY_SNIFF_BYTES]
+                try: text = data.decode('utf-8')
+                except UnicodeDecodeError as e: return FileContent(norm_path, stamp, None, is_binary, e)
+    except (OSError, ValueError) as e: return FileContent(norm_path, (0, 0), None, False, e)
+    if '\r' in text: text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return FileContent(norm_path, stamp, text, is_binary)
+
+class FileContentCache:
+    """
+    LRU cache of FileContent, bounded by the total length of the cached text.
+
+    Args:
+        budget_bytes: Max characters of decoded text kept (about one byte each for source files).
+        mmap_threshold: Files at least this large are memory-mapped instead of read (0 disables mmap).
+    """
+    def __init__(self, budget_bytes: int, mmap_threshold: int):
+        self.budget_bytes = max(0, budget_bytes); self.mmap_threshold = mmap_threshold
+        self._entries: "OrderedDict[str, FileContent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.used_bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "stale": 0, "bytes_read": 0, "peak_bytes": 0}
+
+    def get(self, file_path: str) -> FileContent:
+        """Returns the content of 'file_path', reading it only if it is not cached or changed on disk."""
+        norm_path = normalize_path(file_path)
+        try: stat = os.stat(norm_path); stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError: stamp = None
+        with self._lock:
+            entry = self._entries.get(norm_path)
+            if entry is not None and entry.stamp == stamp:
+                self._entries.move_to_end(norm_path); self.stats["hits"] += 1
+                return entry
+            if entry is not None: self._discard(norm_path); self.stats["stale"] += 1
+            self.stats["misses"] += 1
+        entry = _read_file(norm_path, self.mmap_threshold) # Outside the lock: reader threads read in parallel
+        with self._lock:
+            self.stats["bytes_read"] += entry.size
+            if entry.error is None or isinstance(entry.error, UnicodeDecodeError): self._store(norm_path, entry)
+        return entry
+
+    def _store(self, norm_path: str, entry: FileContent) -> None:
+        if norm_path in self._entries: self._discard(norm_path)
+        cost = len(entry.text or "")
+        if cost > self.budget_bytes: return # Larger than the whole budget: hand it out uncached
+        self._entries[norm_path] = entry; self.used_bytes += cost
+        while self.used_bytes > self.budget_bytes and self._entries:
+            self._discard(next(iter(self._entries))); self.stats["evictions"] += 1
+        self.stats["peak_bytes"] = max(self.stats["peak_bytes"], self.used_bytes)
+
+    def _discard(self, norm_path: str) -> None:
+        entry = self._entries.pop(norm_path); self.used_bytes -= len(entry.text or "")
+
+_active_lock = threading.Lock()
+_active: Dict[str, Any] = {"cache": None, "depth": 0, "last_stats": {}}
+
+def get_file_content(file_path: str) -> FileContent:
+    """Content of 'file_path' from the active run's cache, or read directly when no run is active."""
+    cache = _active["cache"]
+    if cache is None: return _read_file(normalize_path(file_path), int(ConfigManager().get_compute_setting("file_cache_mmap_threshold_kb", 1024)) * 1024)
+    return cache.get(file_path)
+
+def get_file_content_stats() -> Dict[str, int]:
+    """Counters of the active cache, or of the last finished run if none is active."""
+    cache = _active["cache"]
+    return dict(cache.stats) if cache is not None else dict(_active["last_stats"])
+
+@contextlib.contextmanager
+def file_content_scope() -> Iterator[FileContentCache]:
+    """Activates a file content cache for the duration of the block (nested scopes share the outer cache)."""
+    with _active_lock:
+        if _active["cache"] is None:
+            config = ConfigManager()
+            _active["cache"] = FileContentCache(int(config.get_compute_setting("file_cache_budget_mb", 256)) * 1024 * 1024,
+                                                int(config.get_compute_setting("file_cache_mmap_threshold_kb", 1024)) * 1024)
+        _active["depth"] += 1; cache = _active["cache"]
+    try: yield cache
+    finally:
+        with _active_lock:
+            _active["depth"] -= 1
+            if _active["depth"] == 0:
+                _active["last_stats"] = dict(cache.stats); _active["cache"] = None
+                logger.info(f"File content cache: {cache.stats['misses']} reads ({cache.stats['bytes_read'] / 1048576:.1f} MB), "
+                            f"{cache.stats['hits']} hits, {cache.stats['evictions']} evictions, peak {cache.stats['peak_bytes'] / 1048576:.1f} MB.")
+
+def with_file_content_cache(func: F) -> F:
+    """Decorator: runs 'func' inside a file_content_scope."""
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with file_content_scope(): return func(*args, **kwargs)
+    return wrapper # type: ignore
+
+# --- End of file_content_cache.py ---
@@ -0,0 +1,169 @@
+# utils/profiler.py
+
+"""
+Run instrumentation for analyze-project (--profile-out / --profile-pstats).
+
+Instrumented code calls profile_phase / profile_detail / profile_count / profile_section
+unconditionally; they only record something while a profile_run block is active, so a normal
+run pays one dict lookup per call. A report holds, per phase: calls, wall and CPU seconds,
+items processed and items/sec; per-item details (e.g. the time of each tracker update);
+free-form counters; sections attached by the instrumented code (embedding pipeline, file
+content cache); the counter deltas (hits, misses, evictions, ...) of every named cache; and the process's peak RSS.
+The JSON layout is versioned (REPORT_VERSION) so reports from different releases can be diffed.
+"""
+
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from .cache_manager import STAT_COUNTERS, get_all_cache_stats
+
+import logging
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 1
+
+def get_peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None where the resource module is unavailable (Windows)."""
+    try: import resource
+    except ImportError: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1048576 if sys.platform == "darwin" else 1024), 1) # Bytes on macOS, KB elsewhere
+
+class PhaseTimer:
+    """Times one call of a phase; stop() (or leaving the 'with' block) records it."""
+    __slots__ = ("profiler", "name", "_wall", "_cpu", "_stopped")
+
+    def __init__(self, profiler: Optional["RunProfiler"], name: str):
+        self.profiler = profiler; self.name = name; self._stopped = profiler is None
+        self._wall = time.perf_counter(); self._cpu = time.process_time()
+
+    def stop(self, items: Optional[int] = None) -> float:
+        """Records the phase (with the number of items it processed, if given). Returns the elapsed seconds."""
+        elapsed = time.perf_counter() - self._wall
+        if not self._stopped:
+            self._stopped = True
+            self.profiler.add_phase(self.name, elapsed, time.process_time() - self._cpu, items) # type: ignore
+        return elapsed
+
+    def __enter__(self) -> "PhaseTimer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+class RunProfiler:
+    """Collects phases, details, counters and sections of one profiled run (thread-safe)."""
+    def __init__(self, label: str):
+        self.label = label
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self._wall = time.perf_counter(); self._cpu = time.process_time()
+        self._lock = threading.Lock()
+        self.phases: Dict[str, Dict[str, float]] = {} # Insertion order = order phases first ran
+        self.details: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.sections: Dict[str, Any] = {}
+        self._cache_baseline = get_all_cache_stats()
+
+    def add_phase(self, name: str, seconds: float, cpu_seconds: float, items: Optional[int] = None) -> None:
+        with self._lock:
+            phase = self.phases.setdefault(name, {"calls": 0, "seconds": 0.0, "cpu_seconds": 0.0, "items": 0})
+            phase["calls"] += 1; phase["seconds"] += seconds; phase["cpu_seconds"] += cpu_seconds
+            if items is not None: phase["items"] += items
+
+    def add_detail(self, group: str, name: str, seconds: float) -> None:
+        with self._lock:
+            entries = self.details.setdefault(group, {}); entries[name] = entries.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock: self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _cache_report(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for name, stats in get_all_cache_stats().items():
+            baseline = self._cache_baseline.get(name, {})
+            entry: Dict[str, Any] = {counter: stats[counter] - baseline.get(counter, 0) for counter in STAT_COUNTERS} # Counters survive cache recreation
+            entry["maintenance_seconds"] = round(entry["maintenance_seconds"], 4)
+            lookups = entry["hits"] + entry["misses"]
+            entry.update(hit_rate=round(entry["hits"] / lookups, 4) if lookups else None, size=stats["size"], avg_entry_bytes=stats["avg_entry_bytes"])
+            report[name] = entry
+        return report
+
+    def report(self) -> Dict[str, Any]:
+        """The report as a JSON-serialisable dict."""
+        with self._lock:
+            phases = {}
+            for name, phase in self.phases.items():
+                seconds = phase["seconds"]; items = int(phase["items"])
+                phases[name] = {"calls": int(phase["calls"]), "seconds": round(seconds, 4), "cpu_seconds": round(phase["cpu_seconds"], 4),
+                                "items": items, "items_per_second": round(items / seconds, 1) if items and seconds > 0 else None}
+            details = {group: {name: round(seconds, 4) for name, seconds in sorted(entries.items(), key=lambda e: -e[1])}
+                       for group, entries in self.details.items()}
+            return {"report_version": REPORT_VERSION, "label": self.label, "started_at": self.started_at,
+                    "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+                    "wall_seconds": round(time.perf_counter() - self._wall, 4), "cpu_seconds": round(time.process_time() - self._cpu, 4),
+                    "peak_rss_mb": get_peak_rss_mb(), "phases": phases, "details": details, "counters": dict(self.counters),
+                    "sections": dict(self.sections), "caches": self._cache_report()}
+
+_active: Dict[str, Optional[RunProfiler]] = {"profiler": None}
+
+def get_active_profiler() -> Optional[RunProfiler]:
+    return _active["profiler"]
+
+def profile_phase(name: str) -> PhaseTimer:
+    """Starts timing a phase; call .stop(items=...) or use as a context manager. A no-op outside profile_run."""
+    return PhaseTimer(_active["profiler"], name)
+
+def profile_detail(group: str, name: str, seconds: float) -> None:
+    """Records the time spent on one item of a phase (e.g. group 'tracker_update', name = tracker path)."""
+    profiler = _active["profiler"]
+    if profiler is not None: profiler.add_detail(group, name, seconds)
+
+def profile_count(name: str, amount: int = 1) -> None:
+    """Adds 'amount' to a counter."""
+    profiler = _active["profiler"]
+    if profiler is not None: profiler.count(name, amount)
+
+def profile_section(name: str, data: Dict[str, Any]) -> None:
+    """Attaches a dict of statistics (e.g. get_last_embedding_stats()) to the report."""
+    profiler = _active["profiler"]
+    if profiler is not None: profiler.sections[name] = dict(data)
+
+@contextlib.contextmanager
+def profile_run(label: str, report_path: Optional[str] = None, pstats_path: Optional[str] = None) -> Iterator[Optional[RunProfiler]]:
+    """
+    Profiles the block. Does nothing if neither output path is given.
+
+    Args:
+        label: Name of the profiled command (stored in the report).
+        report_path: Where to write the JSON report.
+        pstats_path: Where to dump cProfile statistics (readable with pstats / snakeviz).
+    Yields:
+        The active RunProfiler, or None when profiling is off.
+    """
+    if not report_path and not pstats_path: yield None; return
+    if _active["profiler"] is not None: yield _active["profiler"]; return # Nested run: record into the outer one
+    profiler = RunProfiler(label); _active["profiler"] = profiler
+    c_profile = cProfile.Profile() if pstats_path else None
+    if c_profile: c_profile.enable()
+    try: yield profiler
+    finally:
+        if c_profile:
+            c_profile.disable()
+            try: c_profile.dump_stats(pstats_path); logger.info(f"Wrote cProfile statistics to {pstats_path}")
+            except OSError as e: logger.error(f"Could not write cProfile statistics to {pstats_path}: {e}")
+        _active["profiler"] = None
+        if report_path:
+            try:
+                with open(report_path, 'w', encoding='utf-8') as f: json.dump(profiler.report(), f, indent=2)
+                logger.info(f"Wrote profile report to {report_path}")
+            except (OSError, TypeError, ValueError) as e: logger.error(f"Could not write profile report to {report_path}: {e}")
+
+# --- End of profiler.py ---
@@ -0,0 +1,134 @@
+# watcher.py
+
+"""
+Filesystem watch mode: polls the code and doc roots, debounces bursts of edits and runs
+incremental analysis (analyze_changed_files) for just the changed files.
+
+Polling is used instead of inotify/FSEvents so there is no extra dependency and it behaves the
+same on every platform. Each poll tick stats at most 'stat_batch' entries via os.scandir, so on
+big trees a full sweep is spread over several ticks instead of stalling on one huge rescan.
+"""
+
+import fnmatch
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from cline_utils.dependency_system.utils.config_manager import ConfigManager
+from cline_utils.dependency_system.utils.path_utils import normalize_path
+
+import logging
+logger = logging.getLogger(__name__)
+
+FileStamp = Tuple[int, int] # (mtime_ns, size)
+
+class ChangeSet:
+    """Paths modified, added and removed since the last flush."""
+    __slots__ = ("modified", "added", "removed")
+
+    def __init__(self):
+        self.modified: Set[str] = set(); self.added: Set[str] = set(); self.removed: Set[str] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.modified or self.added or self.removed)
+
+    def __len__(self) -> int:
+        return len(self.modified) + len(self.added) + len(self.removed)
+
+class PollingScanner:
+    """
+    Incremental stat scanner over a set of root directories, applying the same exclusions as
+    analyze_project (excluded dir names, excluded paths, extensions and file patterns).
+    """
+    def __init__(self, roots: List[str], project_root: str, config: Optional[ConfigManager] = None):
+        config = config or ConfigManager()
+        self.roots = [r for r in roots if os.path.isdir(r)]
+        self.excluded_dir_names = set(config.get_excluded_dirs())
+        self.excluded_paths = {normalize_path(os.path.join(project_root, p)) for p in config.get_excluded_dirs() + config.get_excluded_paths()}
+        self.excluded_extensions = {e.lower() for e in config.get_excluded_extensions()}
+        self.excluded_file_patterns = list(config.config.get("excluded_file_patterns", []))
+        self.snapshot: Dict[str, FileStamp] = {}
+        self._sweep: Optional[Iterator[Tuple[str, FileStamp]]] = None
+        self._seen: Dict[str, FileStamp] = {}
+
+    def _is_excluded_path(self, norm_path: str) -> bool:
+        return any(norm_path == p or norm_path.startswith(p + "/") for p in self.excluded_paths)
+
+    def _is_excluded_file(self, norm_path: str, name: str) -> bool:
+        return (os.path.splitext(name)[1].lower() in self.excluded_extensions or self._is_excluded_path(norm_path)
+                or any(fnmatch.fnmatch(name, pattern) for pattern in self.excluded_file_patterns))
+
+    def _walk(self) -> Iterator[Tuple[str, FileStamp]]:
+        stack = list(self.roots)
+        while stack:
+            directory = stack.pop()
+            try: entries = list(os.scandir(directory))
+            except OSError: continue # Directory vanished or is unreadable
+            for entry in entries:
+                norm_path = normalize_path(entry.path)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.excluded_dir_names and not self._is_excluded_path(norm_path): stack.append(entry.path)
+                    elif entry.is_file() and not self._is_excluded_file(norm_path, entry.name):
+                        stat = entry.stat(); yield norm_path, (stat.st_mtime_ns, stat.st_size)
+                except OSError: continue
+
+    def prime(self) -> None:
+        """Takes the initial snapshot in one full sweep."""
+        self.snapshot = dict(self._walk()); self._sweep = None
+
+    def poll(self, stat_batch: int) -> Tuple[ChangeSet, bool]:
+        """
+        Advances the current sweep by up to stat_batch files.
+
+        Returns:
+            (changes found, whether a full sweep just completed). Modified files are reported as soon
+            as they are stat'ed; added/removed files once the sweep that establishes them completes.
+        """
+        changes = ChangeSet()
+        if self._sweep is None: self._sweep = self._walk(); self._seen = {}
+        for _ in range(max(1, stat_batch)):
+            item = next(self._sweep, None)
+            if item is None:
+                changes.removed = set(self.snapshot) - set(self._seen)
+                changes.added = {p for p in self._seen if p not in self.snapshot}
+                self.snapshot = self._seen; self._sweep = None
+                return changes, True
+            path, stamp = item; self._seen[path] = stamp
+            previous = self.snapshot.get(path)
+            if previous is not None and previous != stamp:
+                changes.modified.add(path); self.snapshot[path] = stamp
+        return changes, False
+
+def watch(roots: List[str], project_root: str, on_changes: Callable[[ChangeSet], None], interval: float = 1.0,
+          debounce: float = 1.5, stat_batch: int = 5000, max_iterations: Optional[int] = None) -> None:
+    """
+    Polls 'roots' and calls on_changes with the accumulated ChangeSet once no new change has been
+    seen for 'debounce' seconds.
+
+    Args:
+        roots: Absolute directories to watch.
+        project_root: Project root (for path exclusions).
+        on_changes: Called with each debounced batch of changes.
+        interval: Seconds between poll ticks.
+        debounce: Quiet period before a batch is flushed.
+        stat_batch: Max files stat'ed per tick.
+        max_iterations: Stop after this many ticks (None = until interrupted).
+    """
+    scanner = PollingScanner(roots, project_root); scanner.prime()
+    logger.info(f"Watching {len(scanner.snapshot)} files under {len(scanner.roots)} roots.")
+    pending = ChangeSet(); last_change = 0.0; iteration = 0
+    while max_iterations is None or iteration < max_iterations:
+        iteration += 1
+        changes, _ = scanner.poll(stat_batch)
+        if changes:
+            pending.modified |= changes.modified; pending.added |= changes.added; pending.removed |= changes.removed
+            pending.modified -= pending.added | pending.removed # A file both edited and re-created counts as added
+            last_change = time.monotonic()
+        if pending and time.monotonic() - last_change >= debounce:
+            batch, pending = pending, ChangeSet()
+            try: on_changes(batch)
+            except Exception as e: logger.exception(f"Watch update failed: {e}")
+        time.sleep(interval)
+
+# --- End of watcher.py ---